@@ -16,10 +16,14 @@ import type {
 import type * as auth from "../auth.js";
 import type * as chat from "../chat.js";
 import type * as documents from "../documents.js";
+import type * as embeddingConfig from "../embeddingConfig.js";
 import type * as index from "../index.js";
+import type * as lexicalIndex from "../lexicalIndex.js";
 import type * as migrations from "../migrations.js";
+import type * as retrievalCache from "../retrievalCache.js";
 import type * as search from "../search.js";
 import type * as session from "../session.js";
+import type * as stopwords from "../stopwords.js";
 import type * as textToSpeech from "../textToSpeech.js";
 
 /**
@@ -34,10 +38,14 @@ declare const fullApi: ApiFromModules<{
   auth: typeof auth;
   chat: typeof chat;
   documents: typeof documents;
+  embeddingConfig: typeof embeddingConfig;
   index: typeof index;
+  lexicalIndex: typeof lexicalIndex;
   migrations: typeof migrations;
+  retrievalCache: typeof retrievalCache;
   search: typeof search;
   session: typeof session;
+  stopwords: typeof stopwords;
   textToSpeech: typeof textToSpeech;
 }>;
 export declare const api: FilterApi<
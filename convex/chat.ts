@@ -2,9 +2,8 @@ import { mutation, query, action } from "./_generated/server";
 import { v } from "convex/values";
 import OpenAI from "openai";
 import { CohereClient } from "cohere-ai";
-import { api } from "./_generated/api";
-import { hybridSearch } from "./search";
-import { Id } from "./_generated/dataModel";
+import { api, internal } from "./_generated/api";
+import { RetrievedDoc, retrieveRelevantDocs } from "./search";
 
 // Initialize OpenAI with error handling
 let openai: OpenAI;
@@ -72,107 +71,17 @@ export const generateAnswer = action({
     
     try {
       // Get relevant content from documents
-      let relevantDocs: Array<{ text: string; id: Id<"documents">; score: number; }> = [];
+      let relevantDocs: RetrievedDoc[] = [];
       try {
-        // First, try a direct search with the current question
-        relevantDocs = await ctx.runAction(api.search.hybridSearch, {
-          query: args.content
+        // Suggested questions are answered from the precomputed retrieval cache
+        const cached = await ctx.runQuery(internal.retrievalCache.lookup, {
+          question: args.content
         });
-        console.log("Direct search found documents:", relevantDocs.length);
-        
-        // If we didn't find enough results, try enhanced search with broader terms
-        if (relevantDocs.length < 5) {
-          const enhancedQuery = `${args.content} resume experience work project achievement`;
-          const enhancedResults = await ctx.runAction(api.search.hybridSearch, {
-            query: enhancedQuery
-          });
-          
-          // Merge results, avoiding duplicates
-          const existingIds = new Set(relevantDocs.map(doc => doc.id));
-          const newResults = enhancedResults.filter(doc => !existingIds.has(doc.id));
-          relevantDocs = [...relevantDocs, ...newResults];
-          console.log("Enhanced search added documents:", newResults.length);
-        }
-        
-        // For specific company/technology names, do additional targeted searches
-        const companyTechTerms = ['rocket', 'sap', 'successfactors', 'unify', 'ai', 'machine learning', 'python', 'react', 'typescript'];
-        const queryLower = args.content.toLowerCase();
-        const detectedTerms = companyTechTerms.filter(term => queryLower.includes(term.toLowerCase()));
-        
-        // Add project-specific terms
-        const projectTerms = ['ai skills', 'unify data model', 'unified data model', 'project unify', 'skills project'];
-        const detectedProjectTerms = projectTerms.filter(term => queryLower.includes(term.toLowerCase()));
-        
-        // Combine all detected terms
-        const allDetectedTerms = [...detectedTerms, ...detectedProjectTerms];
-        
-        if (allDetectedTerms.length > 0 && relevantDocs.length < 15) {
-          console.log("Detected specific terms:", allDetectedTerms);
-          for (const term of allDetectedTerms) {
-            try {
-              const termResults = await ctx.runAction(api.search.hybridSearch, {
-                query: term
-              });
-              // Add unique results
-              const existingIds = new Set(relevantDocs.map(doc => doc.id));
-              const newTermResults = termResults.filter(doc => !existingIds.has(doc.id));
-              relevantDocs = [...relevantDocs, ...newTermResults];
-              console.log(`Added ${newTermResults.length} documents for term: ${term}`);
-            } catch (error) {
-              console.error(`Error searching for term ${term}:`, error);
-            }
-          }
-        }
-        
-        // Special handling for percentage/achievement queries
-        const achievementTerms = ['220%', '200%', 'adoption', 'increase', 'improve', 'boost', 'drive'];
-        const hasAchievementTerms = achievementTerms.some(term => queryLower.includes(term.toLowerCase()));
-        
-        if (hasAchievementTerms && relevantDocs.length < 15) {
-          console.log("Detected achievement terms, searching for metrics");
-          try {
-            const achievementResults = await ctx.runAction(api.search.hybridSearch, {
-              query: "220% adoption unified data model webinar migration"
-            });
-            const existingIds = new Set(relevantDocs.map(doc => doc.id));
-            const newAchievementResults = achievementResults.filter(doc => !existingIds.has(doc.id));
-            relevantDocs = [...relevantDocs, ...newAchievementResults];
-            console.log(`Added ${newAchievementResults.length} achievement documents`);
-          } catch (error) {
-            console.error("Achievement search error:", error);
-          }
-        }
-        
-        // Final fallback: if we still don't have enough context, get more resume chunks
-        if (relevantDocs.length < 8) {
-          console.log("Getting additional resume chunks as fallback");
-          try {
-            const fallbackResults = await ctx.runAction(api.search.hybridSearch, {
-              query: "resume experience work project achievement skills education"
-            });
-            const existingIds = new Set(relevantDocs.map(doc => doc.id));
-            const newFallbackResults = fallbackResults.filter(doc => !existingIds.has(doc.id));
-            relevantDocs = [...relevantDocs, ...newFallbackResults.slice(0, 10)]; // Limit to avoid too much context
-            console.log(`Added ${newFallbackResults.slice(0, 10).length} fallback documents`);
-          } catch (error) {
-            console.error("Fallback search error:", error);
-          }
-        }
-        
-        // Company-specific fallback: ensure we have company context when discussing company projects
-        if (queryLower.includes('sap') && relevantDocs.length < 12) {
-          console.log("SAP query detected, ensuring SAP context");
-          try {
-            const sapResults = await ctx.runAction(api.search.hybridSearch, {
-              query: "SAP SuccessFactors product manager AI skills unify data model"
-            });
-            const existingIds = new Set(relevantDocs.map(doc => doc.id));
-            const newSapResults = sapResults.filter(doc => !existingIds.has(doc.id));
-            relevantDocs = [...relevantDocs, ...newSapResults.slice(0, 8)];
-            console.log(`Added ${newSapResults.slice(0, 8).length} SAP-specific documents`);
-          } catch (error) {
-            console.error("SAP fallback search error:", error);
-          }
+        if (cached) {
+          relevantDocs = cached;
+          console.log("Retrieval cache hit, documents:", relevantDocs.length);
+        } else {
+          relevantDocs = await retrieveRelevantDocs(ctx, args.content);
         }
         
       } catch (error) {
@@ -1,6 +1,9 @@
-import { mutation, query } from "./_generated/server";
+import { paginationOptsValidator } from "convex/server";
+import { MutationCtx, mutation, query } from "./_generated/server";
 import { v } from "convex/values";
+import { api } from "./_generated/api";
 import { generateQueryEmbedding } from "./search";
+import { addDocumentPostings, deleteIndexedRows, removeDocumentPostings } from "./lexicalIndex";
 
 export const store = mutation({
   args: {
@@ -20,29 +23,170 @@ export const store = mutation({
 
 export default store;
 
+export const storeBatch = mutation({
+  args: {
+    documents: v.array(
+      v.object({
+        name: v.string(),
+        content: v.string(),
+        embedding: v.array(v.float64()),
+      })
+    ),
+  },
+  handler: async (ctx, args) => {
+    // All rows of a batch commit in one transaction
+    const ids = [];
+    for (const doc of args.documents) {
+      ids.push(
+        await ctx.db.insert("documents", {
+          name: doc.name,
+          content: doc.content,
+          embedding: doc.embedding,
+        })
+      );
+    }
+    return ids;
+  },
+});
+
+// Replace a source's rows in one transaction: insert and index the new rows,
+// rename the kept ones and delete the outdated ones with their postings, so
+// vector and keyword searches see either the old version of the file or the
+// new one.
+export const swapRows = mutation({
+  args: {
+    insert: v.array(
+      v.object({
+        name: v.string(),
+        content: v.string(),
+        embedding: v.array(v.float64()),
+      })
+    ),
+    rename: v.array(v.object({ id: v.id("documents"), name: v.string() })),
+    deleteIds: v.array(v.id("documents")),
+  },
+  handler: async (ctx, args) => {
+    const ids = [];
+    for (const doc of args.insert) {
+      ids.push(
+        await ctx.db.insert("documents", {
+          name: doc.name,
+          content: doc.content,
+          embedding: doc.embedding,
+        })
+      );
+    }
+    await addDocumentPostings(
+      ctx,
+      args.insert.map((doc, i) => ({ docId: ids[i], content: doc.content }))
+    );
+    for (const { id, name } of args.rename) {
+      await ctx.db.patch(id, { name });
+    }
+    await removeDocumentPostings(ctx, args.deleteIds);
+    for (const id of args.deleteIds) {
+      // Skip rows another writer already removed; deleting them would throw
+      if ((await ctx.db.get(id)) !== null) {
+        await ctx.db.delete(id);
+      }
+    }
+    return ids;
+  },
+});
+
 export const listDocuments = query({
   handler: async (ctx) => {
     return await ctx.db.query("documents").collect();
   },
 });
 
+// One page of document metadata, without the embedding vectors unless asked
+// for (snapshot export). Page through the table with the returned
+// continueCursor until isDone.
+export const listMetadata = query({
+  args: {
+    paginationOpts: paginationOptsValidator,
+    previewLength: v.optional(v.number()),
+    includeContent: v.optional(v.boolean()),
+    includeEmbedding: v.optional(v.boolean()),
+  },
+  handler: async (ctx, args) => {
+    const result = await ctx.db.query("documents").paginate(args.paginationOpts);
+    return {
+      ...result,
+      page: result.page.map((doc) => ({
+        _id: doc._id,
+        _creationTime: doc._creationTime,
+        name: doc.name,
+        contentLength: doc.content.length,
+        embeddingDimensions: doc.embedding.length,
+        preview: doc.content.slice(0, args.previewLength ?? 0),
+        ...(args.includeContent ? { content: doc.content } : {}),
+        ...(args.includeEmbedding ? { embedding: doc.embedding } : {}),
+      })),
+    };
+  },
+});
+
 export const deleteDocument = mutation({
   args: {
     id: v.id("documents"),
   },
   handler: async (ctx, args) => {
-    await ctx.db.delete(args.id);
+    await deleteIndexedRows(ctx, [args.id], 1);
+    return { success: true };
+  },
+});
+
+export const rename = mutation({
+  args: {
+    id: v.id("documents"),
+    name: v.string(),
+  },
+  handler: async (ctx, args) => {
+    await ctx.db.patch(args.id, { name: args.name });
     return { success: true };
   },
 });
 
+// Rows deleted per transaction, well inside Convex's per-mutation limits
+const DELETE_BATCH_SIZE = 500;
+
+// Rows plus lexical postings deleted per transaction; a batch of indexed
+// rows stops early once their postings reach this
+const DELETE_WRITE_BUDGET = 4000;
+
+// Delete up to batchSize rows and their postings; not done while any are left.
+async function deleteRows(ctx: MutationCtx, batchSize: number) {
+  const documents = await ctx.db.query("documents").take(batchSize);
+  const deleted = await deleteIndexedRows(
+    ctx,
+    documents.map((doc) => doc._id),
+    DELETE_WRITE_BUDGET
+  );
+  return { deleted, isDone: deleted === documents.length && documents.length < batchSize };
+}
+
+// Delete one page of rows with their postings; call again until isDone.
+export const deleteBatch = mutation({
+  args: {
+    batchSize: v.optional(v.number()),
+  },
+  handler: async (ctx, args) => {
+    return await deleteRows(ctx, args.batchSize ?? DELETE_BATCH_SIZE);
+  },
+});
+
+// Deletes the first page and schedules itself for the rest, so the table can
+// be cleared whatever its size. `deleted` only counts this first page.
 export const clearAllDocuments = mutation({
-  handler: async (ctx) => {
-    const documents = await ctx.db.query("documents").collect();
-    for (const doc of documents) {
-      await ctx.db.delete(doc._id);
+  // Explicit return type: the self-reference below would otherwise make inference circular
+  handler: async (ctx): Promise<{ deleted: number; isDone: boolean }> => {
+    const result = await deleteRows(ctx, DELETE_BATCH_SIZE);
+    if (!result.isDone) {
+      await ctx.scheduler.runAfter(0, api.documents.clearAllDocuments, {});
     }
-    return { deleted: documents.length };
+    return result;
   },
 });
 
@@ -0,0 +1,9 @@
+// Size of the stored document embeddings. text-embedding-3-small can return
+// shorter vectors (e.g. 256 or 512) through its `dimensions` parameter; when
+// this changes, re-ingest with the same EMBEDDING_DIMENSIONS so every row
+// matches the vector index.
+export const EMBEDDING_DIMENSIONS = 1536;
+
+// Queries must be embedded in the same vector space as the stored rows, so
+// this is the model scripts/process_documents.py ingests with, at every size
+export const QUERY_EMBEDDING_MODEL = "text-embedding-3-small";
@@ -0,0 +1,256 @@
+import { MutationCtx, QueryCtx, mutation, query } from "./_generated/server";
+import { v } from "convex/values";
+import { Id } from "./_generated/dataModel";
+import { STOPWORDS } from "./stopwords";
+
+// Okapi BM25 parameters, the same as BM25Index in scripts/local_search.py
+const BM25_K1 = 1.2;
+const BM25_B = 0.75;
+
+// Postings deleted per lexicalIndex:clear call
+const CLEAR_BATCH_SIZE = 4000;
+
+// Same tokens as index_terms in scripts/lexical_index.py, which builds the index
+const TOKEN_PATTERN = /[a-z0-9]+(?:\.[0-9]+)?%?/g;
+
+export function indexTerms(text: string): string[] {
+  return (text.toLowerCase().match(TOKEN_PATTERN) ?? []).filter((term) => !STOPWORDS.has(term));
+}
+
+async function getStats(ctx: QueryCtx) {
+  return await ctx.db.query("lexicalStats").first();
+}
+
+async function postingsOf(ctx: QueryCtx, docId: Id<"documents">) {
+  return await ctx.db
+    .query("lexicalPostings")
+    .withIndex("by_doc", (q) => q.eq("docId", docId))
+    .collect();
+}
+
+// Delete a row's postings; returns its indexed length and posting count, or null if it had none.
+async function removePostings(ctx: MutationCtx, docId: Id<"documents">) {
+  const postings = await postingsOf(ctx, docId);
+  if (postings.length === 0) {
+    return null;
+  }
+  for (const posting of postings) {
+    await ctx.db.delete(posting._id);
+  }
+  return { length: postings[0].docLength, postings: postings.length };
+}
+
+async function updateStats(ctx: MutationCtx, docs: number, length: number, postings: number) {
+  const stats = await getStats(ctx);
+  if (stats === null) {
+    await ctx.db.insert("lexicalStats", { docCount: docs, totalLength: length, postingCount: postings });
+  } else {
+    await ctx.db.patch(stats._id, {
+      docCount: stats.docCount + docs,
+      totalLength: stats.totalLength + length,
+      postingCount: stats.postingCount + postings,
+    });
+  }
+}
+
+type DocumentPostings = {
+  docId: Id<"documents">;
+  length: number;
+  terms: Array<{ term: string; tf: number }>;
+};
+
+// A row's length and term frequencies, as document_postings in scripts/lexical_index.py builds them
+function documentPostings(docId: Id<"documents">, text: string): DocumentPostings {
+  const counts = new Map<string, number>();
+  for (const term of indexTerms(text)) {
+    counts.set(term, (counts.get(term) ?? 0) + 1);
+  }
+  let length = 0;
+  const terms: DocumentPostings["terms"] = [];
+  for (const [term, tf] of counts) {
+    length += tf;
+    terms.push({ term, tf });
+  }
+  return { docId, length, terms };
+}
+
+// Write the postings of rows, replacing any they already had, and update the statistics.
+async function addPostings(ctx: MutationCtx, documents: DocumentPostings[]) {
+  let docs = 0;
+  let length = 0;
+  let postings = 0;
+  for (const doc of documents) {
+    const previous = await removePostings(ctx, doc.docId);
+    if (previous !== null) {
+      docs--;
+      length -= previous.length;
+      postings -= previous.postings;
+    }
+    for (const { term, tf } of doc.terms) {
+      await ctx.db.insert("lexicalPostings", { term, docId: doc.docId, tf, docLength: doc.length });
+    }
+    docs++;
+    length += doc.length;
+    postings += doc.terms.length;
+  }
+  await updateStats(ctx, docs, length, postings);
+}
+
+// Postings built by scripts/lexical_index.py as it stores rows. Re-indexing
+// a row replaces its postings, so retries and resumed ingestions are safe.
+export const addDocuments = mutation({
+  args: {
+    documents: v.array(
+      v.object({
+        docId: v.id("documents"),
+        length: v.number(),
+        terms: v.array(v.object({ term: v.string(), tf: v.number() })),
+      })
+    ),
+  },
+  handler: async (ctx, args) => {
+    await addPostings(ctx, args.documents);
+    return { indexed: args.documents.length };
+  },
+});
+
+// Index rows inserted in the same transaction; used by documents:swapRows.
+// Until the index has been built there is nothing to keep up to date (the
+// build indexes every row), so this returns 0.
+export async function addDocumentPostings(
+  ctx: MutationCtx,
+  documents: Array<{ docId: Id<"documents">; content: string }>
+) {
+  if ((await getStats(ctx)) === null) {
+    return 0;
+  }
+  await addPostings(ctx, documents.map((doc) => documentPostings(doc.docId, doc.content)));
+  return documents.length;
+}
+
+// Drop the postings of rows being deleted and update the statistics; returns
+// how many of the rows were indexed. Also used by documents:swapRows.
+export async function removeDocumentPostings(ctx: MutationCtx, ids: Id<"documents">[]) {
+  let removed = 0;
+  let length = 0;
+  let postings = 0;
+  for (const id of ids) {
+    const previous = await removePostings(ctx, id);
+    if (previous !== null) {
+      removed++;
+      length += previous.length;
+      postings += previous.postings;
+    }
+  }
+  if (removed > 0) {
+    await updateStats(ctx, -removed, -length, -postings);
+  }
+  return removed;
+}
+
+// Delete rows together with their postings, keeping the statistics in step.
+// Stops before a row whose postings would take the transaction past
+// maxWrites (the first row always goes); returns how many rows were deleted.
+export async function deleteIndexedRows(ctx: MutationCtx, ids: Id<"documents">[], maxWrites: number) {
+  let deleted = 0;
+  let writes = 0;
+  let indexed = 0;
+  let length = 0;
+  let postingCount = 0;
+  for (const id of ids) {
+    const postings = await postingsOf(ctx, id);
+    if (deleted > 0 && writes + 1 + postings.length > maxWrites) {
+      break;
+    }
+    for (const posting of postings) {
+      await ctx.db.delete(posting._id);
+    }
+    if (postings.length > 0) {
+      indexed++;
+      length += postings[0].docLength;
+      postingCount += postings.length;
+    }
+    // Skip rows another writer already removed; deleting them would throw
+    if ((await ctx.db.get(id)) !== null) {
+      await ctx.db.delete(id);
+    }
+    deleted++;
+    writes += 1 + postings.length;
+  }
+  if (indexed > 0) {
+    await updateStats(ctx, -indexed, -length, -postingCount);
+  }
+  return deleted;
+}
+
+export const removeDocuments = mutation({
+  args: { ids: v.array(v.id("documents")) },
+  handler: async (ctx, args) => {
+    return { removed: await removeDocumentPostings(ctx, args.ids) };
+  },
+});
+
+// Delete one batch of postings; call again until isDone. The statistics go
+// with the last batch, which marks the index as not built.
+export const clear = mutation({
+  args: {},
+  handler: async (ctx) => {
+    const postings = await ctx.db.query("lexicalPostings").take(CLEAR_BATCH_SIZE);
+    for (const posting of postings) {
+      await ctx.db.delete(posting._id);
+    }
+    const isDone = postings.length < CLEAR_BATCH_SIZE;
+    if (isDone) {
+      const stats = await getStats(ctx);
+      if (stats !== null) {
+        await ctx.db.delete(stats._id);
+      }
+    }
+    return { deleted: postings.length, isDone };
+  },
+});
+
+// Collection statistics, or null when the index has not been built.
+export const stats = query({
+  args: {},
+  handler: async (ctx) => {
+    const row = await getStats(ctx);
+    return row === null
+      ? null
+      : { docCount: row.docCount, totalLength: row.totalLength, postingCount: row.postingCount };
+  },
+});
+
+// BM25 scores for a query from the postings of its terms only, best first
+// and scaled so the top match scores 1. Returns null when there is no index.
+export async function bm25Search(
+  ctx: QueryCtx,
+  queryText: string,
+  limit: number
+): Promise<Array<{ id: Id<"documents">; score: number }> | null> {
+  const stats = await getStats(ctx);
+  if (stats === null) {
+    return null;
+  }
+  const avgLength = stats.docCount > 0 ? stats.totalLength / stats.docCount : 0;
+  const scores = new Map<Id<"documents">, number>();
+  for (const term of new Set(indexTerms(queryText))) {
+    const postings = await ctx.db
+      .query("lexicalPostings")
+      .withIndex("by_term", (q) => q.eq("term", term))
+      .collect();
+    const df = postings.length;
+    if (df === 0) {
+      continue;
+    }
+    const idf = Math.log(1 + (stats.docCount - df + 0.5) / (df + 0.5));
+    for (const posting of postings) {
+      const norm = BM25_K1 * (1 - BM25_B + (BM25_B * posting.docLength) / Math.max(avgLength, 1e-9));
+      const score = (idf * posting.tf * (BM25_K1 + 1)) / (posting.tf + norm);
+      scores.set(posting.docId, (scores.get(posting.docId) ?? 0) + score);
+    }
+  }
+  const ranked = [...scores.entries()].sort((a, b) => b[1] - a[1]).slice(0, limit);
+  const best = ranked.length > 0 ? ranked[0][1] : 1;
+  return ranked.map(([id, score]) => ({ id, score: score / best }));
+}
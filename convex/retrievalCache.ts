@@ -0,0 +1,93 @@
+import { internalAction, internalMutation, internalQuery } from "./_generated/server";
+import { v } from "convex/values";
+import { internal } from "./_generated/api";
+import { RetrievedDoc, retrieveRelevantDocs } from "./search";
+
+// Case, punctuation and spacing differences should still hit the cache
+export function normalizeQuestion(question: string): string {
+  return question.toLowerCase().replace(/[^a-z0-9%]+/g, " ").trim();
+}
+
+// Cached results for a question, or null when there are none, the cached
+// search found nothing (a live search may do better once documents are
+// added) or a cached row has since been deleted (the cache is stale until
+// the next rebuild).
+export const lookup = internalQuery({
+  args: { question: v.string() },
+  handler: async (ctx, args): Promise<RetrievedDoc[] | null> => {
+    const entry = await ctx.db
+      .query("retrievalCache")
+      .withIndex("by_question", (q) => q.eq("question", normalizeQuestion(args.question)))
+      .unique();
+    if (entry === null || entry.results.length === 0) {
+      return null;
+    }
+    const results: RetrievedDoc[] = [];
+    for (const result of entry.results) {
+      const doc = await ctx.db.get(result.id);
+      if (doc === null) {
+        return null;
+      }
+      results.push({ text: doc.content, id: result.id, score: result.score });
+    }
+    return results;
+  },
+});
+
+export const put = internalMutation({
+  args: {
+    question: v.string(),
+    results: v.array(v.object({ id: v.id("documents"), score: v.number() })),
+  },
+  handler: async (ctx, args) => {
+    const question = normalizeQuestion(args.question);
+    const existing = await ctx.db
+      .query("retrievalCache")
+      .withIndex("by_question", (q) => q.eq("question", question))
+      .unique();
+    const entry = {
+      question,
+      originalQuestion: args.question,
+      results: args.results,
+      builtAt: Date.now(),
+    };
+    if (existing) {
+      await ctx.db.replace(existing._id, entry);
+    } else {
+      await ctx.db.insert("retrievalCache", entry);
+    }
+  },
+});
+
+// Run the chat's retrieval for each question and cache the ranked results.
+// Internal, so only scripts/build_retrieval_cache.py (with the deploy key)
+// can run it, in small batches.
+export const rebuild = internalAction({
+  args: { questions: v.array(v.string()) },
+  handler: async (ctx, args) => {
+    for (const question of args.questions) {
+      const results = await retrieveRelevantDocs(ctx, question);
+      await ctx.runMutation(internal.retrievalCache.put, {
+        question,
+        results: results.map((doc) => ({ id: doc.id, score: doc.score })),
+      });
+    }
+    return { cached: args.questions.length };
+  },
+});
+
+// Drop entries for questions that are no longer suggested.
+export const prune = internalMutation({
+  args: { keep: v.array(v.string()) },
+  handler: async (ctx, args) => {
+    const keep = new Set(args.keep.map(normalizeQuestion));
+    let deleted = 0;
+    for (const entry of await ctx.db.query("retrievalCache").collect()) {
+      if (!keep.has(entry.question)) {
+        await ctx.db.delete(entry._id);
+        deleted++;
+      }
+    }
+    return { deleted };
+  },
+});
@@ -1,5 +1,6 @@
 import { defineSchema, defineTable } from "convex/server";
 import { v } from "convex/values";
+import { EMBEDDING_DIMENSIONS } from "./embeddingConfig";
 
 export default defineSchema({
   documents: defineTable({
@@ -9,11 +10,38 @@ export default defineSchema({
   })
     .vectorIndex("by_embedding", {
       vectorField: "embedding",
-      dimensions: 1536,
+      dimensions: EMBEDDING_DIMENSIONS,
     })
     .searchIndex("content", {
       searchField: "content",
     }),
+  // Inverted index for the lexical fallback, built by scripts/lexical_index.py:
+  // one row per (term, document) with the term's frequency in that document
+  lexicalPostings: defineTable({
+    term: v.string(),
+    docId: v.id("documents"),
+    tf: v.number(),
+    docLength: v.number(),
+  })
+    .index("by_term", ["term"])
+    .index("by_doc", ["docId"]),
+  // Single row of BM25 collection statistics; absent until the index is built
+  lexicalStats: defineTable({
+    docCount: v.number(),
+    totalLength: v.number(),
+    postingCount: v.number(),
+  }),
+  retrievalCache: defineTable({
+    question: v.string(),
+    originalQuestion: v.string(),
+    results: v.array(
+      v.object({
+        id: v.id("documents"),
+        score: v.number(),
+      })
+    ),
+    builtAt: v.number(),
+  }).index("by_question", ["question"]),
   messages: defineTable({
     content: v.string(),
     role: v.string(),
@@ -1,8 +1,10 @@
-import { action, internalAction, internalQuery, query } from "./_generated/server";
+import { ActionCtx, action, internalAction, internalQuery, query } from "./_generated/server";
 import { v } from "convex/values";
 import { OpenAI } from "openai";
-import { internal } from "./_generated/api";
+import { api, internal } from "./_generated/api";
 import { Doc, Id } from "./_generated/dataModel";
+import { EMBEDDING_DIMENSIONS, QUERY_EMBEDDING_MODEL } from "./embeddingConfig";
+import { bm25Search } from "./lexicalIndex";
 
 export async function generateQueryEmbedding(question: string) {
     const apiKey = process.env.OPENAI_API_KEY;
@@ -12,8 +14,9 @@ export async function generateQueryEmbedding(question: string) {
 
     const openai = new OpenAI({ apiKey });
     const response = await openai.embeddings.create({
-        model: "text-embedding-ada-002",
-        input: question
+        model: QUERY_EMBEDDING_MODEL,
+        input: question,
+        ...(EMBEDDING_DIMENSIONS === 1536 ? {} : { dimensions: EMBEDDING_DIMENSIONS })
     });
     const embedding = response.data[0].embedding;
     return embedding;
@@ -56,13 +59,31 @@ export const chunkEmbeddingsRetriever = internalAction({
     }
 });
 
+// Rows returned by the lexical fallback, like the vector search's limit
+const KEYWORD_LIMIT = 50;
+
 export const keywordRetriever = internalQuery({
     args: { query: v.string() },
     handler: async (ctx, args) => {
         console.log("Starting keyword search with query:", args.query);
         
         try {
-            // Get all documents and filter them based on content
+            // BM25 over the postings of the query's terms, when the index has been built
+            const ranked = await bm25Search(ctx, args.query, KEYWORD_LIMIT);
+            if (ranked !== null) {
+                const results = [];
+                for (const { id, score } of ranked) {
+                    const doc = await ctx.db.get(id);
+                    // Postings can briefly outlive a deleted row
+                    if (doc !== null) {
+                        results.push({ text: doc.content, id: doc._id, score });
+                    }
+                }
+                console.log("BM25 matches found:", results.length);
+                return results;
+            }
+
+            // No index yet: get all documents and filter them based on content
             const allDocuments = await ctx.db.query("documents").collect();
             console.log("Total documents found:", allDocuments.length);
             
@@ -170,6 +191,122 @@ export const hybridSearch = action({
     }
 });
 
+export type RetrievedDoc = {
+    text: string;
+    id: Id<"documents">;
+    score: number;
+};
+
+// Everything generateAnswer retrieves for a question: the direct hybrid
+// search plus the broader, term-specific and fallback searches it adds when
+// the first one finds too little. Shared with retrievalCache:rebuild so the
+// cached results for suggested questions match what a live search returns.
+export async function retrieveRelevantDocs(ctx: ActionCtx, question: string): Promise<RetrievedDoc[]> {
+    let relevantDocs: RetrievedDoc[] = [];
+    // First, try a direct search with the current question
+    relevantDocs = await ctx.runAction(api.search.hybridSearch, {
+        query: question
+    });
+    console.log("Direct search found documents:", relevantDocs.length);
+
+    // If we didn't find enough results, try enhanced search with broader terms
+    if (relevantDocs.length < 5) {
+        const enhancedQuery = `${question} resume experience work project achievement`;
+        const enhancedResults = await ctx.runAction(api.search.hybridSearch, {
+            query: enhancedQuery
+        });
+
+        // Merge results, avoiding duplicates
+        const existingIds = new Set(relevantDocs.map(doc => doc.id));
+        const newResults = enhancedResults.filter(doc => !existingIds.has(doc.id));
+        relevantDocs = [...relevantDocs, ...newResults];
+        console.log("Enhanced search added documents:", newResults.length);
+    }
+
+    // For specific company/technology names, do additional targeted searches
+    const companyTechTerms = ['rocket', 'sap', 'successfactors', 'unify', 'ai', 'machine learning', 'python', 'react', 'typescript'];
+    const queryLower = question.toLowerCase();
+    const detectedTerms = companyTechTerms.filter(term => queryLower.includes(term.toLowerCase()));
+
+    // Add project-specific terms
+    const projectTerms = ['ai skills', 'unify data model', 'unified data model', 'project unify', 'skills project'];
+    const detectedProjectTerms = projectTerms.filter(term => queryLower.includes(term.toLowerCase()));
+
+    // Combine all detected terms
+    const allDetectedTerms = [...detectedTerms, ...detectedProjectTerms];
+
+    if (allDetectedTerms.length > 0 && relevantDocs.length < 15) {
+        console.log("Detected specific terms:", allDetectedTerms);
+        for (const term of allDetectedTerms) {
+            try {
+                const termResults = await ctx.runAction(api.search.hybridSearch, {
+                    query: term
+                });
+                // Add unique results
+                const existingIds = new Set(relevantDocs.map(doc => doc.id));
+                const newTermResults = termResults.filter(doc => !existingIds.has(doc.id));
+                relevantDocs = [...relevantDocs, ...newTermResults];
+                console.log(`Added ${newTermResults.length} documents for term: ${term}`);
+            } catch (error) {
+                console.error(`Error searching for term ${term}:`, error);
+            }
+        }
+    }
+
+    // Special handling for percentage/achievement queries
+    const achievementTerms = ['220%', '200%', 'adoption', 'increase', 'improve', 'boost', 'drive'];
+    const hasAchievementTerms = achievementTerms.some(term => queryLower.includes(term.toLowerCase()));
+
+    if (hasAchievementTerms && relevantDocs.length < 15) {
+        console.log("Detected achievement terms, searching for metrics");
+        try {
+            const achievementResults = await ctx.runAction(api.search.hybridSearch, {
+                query: "220% adoption unified data model webinar migration"
+            });
+            const existingIds = new Set(relevantDocs.map(doc => doc.id));
+            const newAchievementResults = achievementResults.filter(doc => !existingIds.has(doc.id));
+            relevantDocs = [...relevantDocs, ...newAchievementResults];
+            console.log(`Added ${newAchievementResults.length} achievement documents`);
+        } catch (error) {
+            console.error("Achievement search error:", error);
+        }
+    }
+
+    // Final fallback: if we still don't have enough context, get more resume chunks
+    if (relevantDocs.length < 8) {
+        console.log("Getting additional resume chunks as fallback");
+        try {
+            const fallbackResults = await ctx.runAction(api.search.hybridSearch, {
+                query: "resume experience work project achievement skills education"
+            });
+            const existingIds = new Set(relevantDocs.map(doc => doc.id));
+            const newFallbackResults = fallbackResults.filter(doc => !existingIds.has(doc.id));
+            relevantDocs = [...relevantDocs, ...newFallbackResults.slice(0, 10)]; // Limit to avoid too much context
+            console.log(`Added ${newFallbackResults.slice(0, 10).length} fallback documents`);
+        } catch (error) {
+            console.error("Fallback search error:", error);
+        }
+    }
+
+    // Company-specific fallback: ensure we have company context when discussing company projects
+    if (queryLower.includes('sap') && relevantDocs.length < 12) {
+        console.log("SAP query detected, ensuring SAP context");
+        try {
+            const sapResults = await ctx.runAction(api.search.hybridSearch, {
+                query: "SAP SuccessFactors product manager AI skills unify data model"
+            });
+            const existingIds = new Set(relevantDocs.map(doc => doc.id));
+            const newSapResults = sapResults.filter(doc => !existingIds.has(doc.id));
+            relevantDocs = [...relevantDocs, ...newSapResults.slice(0, 8)];
+            console.log(`Added ${newSapResults.slice(0, 8).length} SAP-specific documents`);
+        } catch (error) {
+            console.error("SAP fallback search error:", error);
+        }
+    }
+
+    return relevantDocs;
+}
+
 export const listMessages = internalQuery({
     handler: async (ctx) => {
         return await ctx.db.query("messages").order("desc").take(100);
@@ -0,0 +1,624 @@
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from batch_writer import DEFAULT_MAX_BATCH_BYTES, iter_payload_batches, payload_size
+from profiling import Profiler
+from request_packer import MAX_TOKENS_PER_REQUEST, RequestPacker, embed_packed_async
+from semantic_chunker import StreamingChunker, iter_batches, similarities_from_embeddings, split_sentences
+
+# OpenAI tier-1 limits for text-embedding-3-small
+DEFAULT_REQUESTS_PER_MINUTE = 3000
+DEFAULT_TOKENS_PER_MINUTE = 1_000_000
+
+
+# Error codes and messages of Convex failures worth retrying: backend
+# faults, overload and optimistic-concurrency conflicts. Not "Server Error",
+# which prefixes every uncaught function error, validation failures included
+TRANSIENT_CONVEX_MESSAGES = (
+    "InternalServerError", "Overloaded", "ServiceUnavailable",
+    "changed while this mutation was being run",
+)
+
+
+class RetryableError(Exception):
+    """A transient failure (rate limit, timeout, 5xx) that is worth retrying."""
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count, using the same 4-characters-per-token rule as the chat action."""
+    return len(text) // 4 + 1
+
+
+class TokenBucket:
+    """Async token bucket refilled continuously at a per-minute rate."""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """Take ``amount`` tokens, sleeping until they are available; returns seconds waited."""
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = (amount - self.tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute buckets for one API."""
+
+    def __init__(self, requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: float = DEFAULT_TOKENS_PER_MINUTE):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.waited = 0.0
+
+    async def acquire(self, tokens: int = 0) -> None:
+        self.waited += await self.requests.acquire(1)
+        if tokens:
+            self.waited += await self.tokens.acquire(tokens)
+
+
+class Turnstile:
+    """Lets coroutines through one at a time in sequence order.
+
+    ``async with turnstile.turn(i)`` waits until turns 0..i-1 have been
+    taken, so work that finishes in any order is applied in a fixed one.
+    """
+
+    def __init__(self):
+        self.next = 0
+        self._condition: Optional[asyncio.Condition] = None
+
+    @contextlib.asynccontextmanager
+    async def turn(self, sequence: int) -> AsyncIterator[None]:
+        if self._condition is None:
+            # Made here so it belongs to the running event loop
+            self._condition = asyncio.Condition()
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.next == sequence)
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self.next += 1
+                self._condition.notify_all()
+
+
+async def with_retries(
+    call: Callable[[], Awaitable[Any]],
+    retries: int = 5,
+    base_delay: float = 0.5,
+    max_delay: float = 20.0,
+    on_retry: Optional[Callable[[int, Exception], None]] = None,
+) -> Any:
+    """Await ``call()``, retrying RetryableError with full-jitter exponential backoff."""
+    attempt = 0
+    while True:
+        try:
+            return await call()
+        except RetryableError as e:
+            if attempt >= retries:
+                raise
+            if on_retry:
+                on_retry(attempt, e)
+            await asyncio.sleep(random.uniform(0, min(max_delay, base_delay * 2 ** attempt)))
+            attempt += 1
+
+
+def is_transient_convex_error(error: Exception) -> bool:
+    """Dropped connections, timeouts, 5xx/429 responses, overload and write conflicts of a Convex call.
+
+    A ConvexError thrown by the function itself is not transient, nor is
+    any other function error (a bad argument or an oversized value fails
+    the same way on every attempt). Convex
+    rolls back a mutation that failed on the server, so retrying it cannot
+    write rows twice.
+    """
+    if isinstance(error, OSError):
+        # Includes TimeoutError and requests' ConnectionError and Timeout
+        return True
+    convex_error = getattr(sys.modules.get("convex"), "ConvexError", None)
+    if convex_error is not None and isinstance(error, convex_error):
+        return False
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    if status is not None:
+        return status >= 500 or status == 429
+    message = str(error)
+    return any(marker in message for marker in TRANSIENT_CONVEX_MESSAGES)
+
+
+def is_transient_openai_error(error: Exception) -> bool:
+    """Rate limits, timeouts and 5xx from the OpenAI SDK (which local backends don't need installed)."""
+    try:
+        import openai
+    except ImportError:
+        return False
+    return isinstance(error, (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError,
+                              openai.InternalServerError))
+
+
+class OpenAIEmbedder:
+    """Async OpenAI embeddings client that reports rate limits as RetryableError.
+
+    Texts go through a RequestPacker, so inputs over the model's token limit
+    are split and averaged and a large batch becomes as few requests as the
+    endpoint's limits allow. With a ``limiter``, each of those requests is
+    paced through it, so the request budget counts what is actually sent.
+    """
+
+    def __init__(self, client: Any, model: str, dimensions: Optional[int] = None,
+                 profiler: Optional[Profiler] = None, packer: Optional[RequestPacker] = None,
+                 limiter: Optional[RateLimiter] = None):
+        self.client = client
+        self.model = model
+        self.dimensions = dimensions
+        self.profiler = profiler or Profiler(enabled=False)
+        self.packer = packer or RequestPacker()
+        self.limiter = limiter
+        # Embedding requests that succeeded, after packing
+        self.requests = 0
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        return await embed_packed_async(texts, self._create, self.packer)
+
+    async def _create(self, texts: List[str]) -> List[List[float]]:
+        options = {"dimensions": self.dimensions} if self.dimensions else {}
+        if self.limiter is not None:
+            with self.profiler.span("rate_limit", "wait"):
+                await self.limiter.acquire(sum(map(estimate_tokens, texts)))
+        try:
+            with self.profiler.span("openai_embeddings", "api", inputs=len(texts)):
+                response = await self.client.embeddings.create(input=texts, model=self.model, **options)
+        except Exception as e:
+            if is_transient_openai_error(e):
+                raise RetryableError(str(e)) from e
+            raise
+        self.requests += 1
+        self.profiler.count("openai_requests")
+        self.profiler.count("openai_inputs", len(texts))
+        usage = getattr(response, "usage", None)
+        self.profiler.count("openai_tokens", getattr(usage, "total_tokens", None) or sum(map(estimate_tokens, texts)))
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+
+class CachedEmbedder:
+    """Serves embeddings from an EmbeddingCache and only forwards misses."""
+
+    def __init__(self, inner: Any, cache: Any, model: str):
+        self.inner = inner
+        self.cache = cache
+        self.model = model
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        cached = self.cache.get_many(self.model, texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
+        fetched: Dict[str, List[float]] = {}
+        if missing:
+            vectors = await self.inner.embed(missing)
+            self.cache.put_many(self.model, missing, vectors)
+            fetched = dict(zip(missing, vectors))
+        return [vector.tolist() if vector is not None else fetched[text] for text, vector in zip(texts, cached)]
+
+
+class ConvexStore:
+    """Runs blocking ConvexClient mutations on worker threads, reporting
+    transient failures as RetryableError."""
+
+    def __init__(self, convex: Any):
+        self.convex = convex
+
+    async def store(self, name: str, content: str, embedding: List[float]) -> Any:
+        return await self._mutation("documents:store", {
+            "name": name,
+            "content": content,
+            "embedding": embedding
+        })
+
+    async def store_batch(self, documents: List[Dict[str, Any]]) -> List[Any]:
+        return await self._mutation("documents:storeBatch", {"documents": documents})
+
+    async def _mutation(self, name: str, args: Dict[str, Any]) -> Any:
+        try:
+            return await asyncio.to_thread(self.convex.mutation, name, args)
+        except Exception as e:
+            if is_transient_convex_error(e):
+                raise RetryableError(str(e)) from e
+            raise
+
+
+class LocalEmbedder:
+    """Deterministic stand-in for the embeddings API with simulated latency."""
+
+    def __init__(self, dimensions: int = 1536, latency: float = 0.2, limiter: Optional[RateLimiter] = None):
+        self.dimensions = dimensions
+        self.latency = latency
+        self.limiter = limiter
+        self.calls = 0
+
+    def vector(self, text: str) -> List[float]:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        return np.random.default_rng(seed).standard_normal(self.dimensions).astype(np.float32).tolist()
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        if self.limiter is not None:
+            await self.limiter.acquire(sum(map(estimate_tokens, texts)))
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return [self.vector(text) for text in texts]
+
+
+class LocalStore:
+    """In-memory stand-in for the documents table with simulated latency."""
+
+    def __init__(self, latency: float = 0.1):
+        self.latency = latency
+        self.documents: Dict[str, Dict[str, Any]] = {}
+
+    async def store(self, name: str, content: str, embedding: List[float]) -> str:
+        await asyncio.sleep(self.latency)
+        doc_id = f"local_{len(self.documents)}"
+        self.documents[doc_id] = {"name": name, "content": content, "embedding": embedding}
+        return doc_id
+
+    async def store_batch(self, documents: List[Dict[str, Any]]) -> List[str]:
+        await asyncio.sleep(self.latency)
+        ids = []
+        for document in documents:
+            doc_id = f"local_{len(self.documents)}"
+            self.documents[doc_id] = dict(document)
+            ids.append(doc_id)
+        return ids
+
+
+async def semantic_chunks_async(
+    sentences: Iterable[str],
+    embedder: Any,
+    similarity_threshold: float = 0.7,
+    min_chunk_size: int = 200,
+    batch_sentences: int = 256,
+    parallel_batches: int = 4,
+    profiler: Optional[Profiler] = None,
+) -> List[Dict[str, Any]]:
+    """Semantic chunks of a sentence stream, embedding several batches concurrently."""
+    chunker = StreamingChunker(similarity_threshold, min_chunk_size, verbose=False)
+    profiler = profiler or Profiler(enabled=False)
+
+    async def embed_batch(texts: List[str]) -> List[List[float]]:
+        async def call():
+            with profiler.span("chunk_embed", "api", texts=len(texts)):
+                return await embedder.embed(texts)
+        return await with_retries(call, on_retry=lambda attempt, error: profiler.count("retries"))
+
+    chunks = []
+    for group in iter_batches(iter_batches(sentences, batch_sentences), parallel_batches):
+        with profiler.span("similarity", "compute"):
+            prepared = [chunker.prepare(batch) for batch in group]
+        embeddings = await asyncio.gather(*(embed_batch(texts) for texts, _, _ in prepared))
+        with profiler.span("similarity", "compute"):
+            for batch, (_, sentence_rows, window_rows), vectors in zip(group, prepared, embeddings):
+                similarities = similarities_from_embeddings(vectors, sentence_rows, window_rows)
+                chunks.extend(chunker.consume(batch, similarities))
+    return chunks + chunker.finish()
+
+
+@dataclass
+class SourceJob:
+    """One source file moving through the pipeline."""
+    source: Dict[str, str]
+    path: Path
+    text: str = ""
+    # Position in submission order, set by IngestPipeline.run
+    sequence: int = 0
+    # (name, content) rows that still need to be embedded and stored
+    rows: List[Tuple[str, str]] = field(default_factory=list)
+    # name -> stored document ID
+    stored: Dict[str, Any] = field(default_factory=dict)
+    # Free-form state owned by the plan and finalize callbacks
+    context: Dict[str, Any] = field(default_factory=dict)
+    pending: int = 0
+
+
+class IngestPipeline:
+    """Staged parse -> chunk -> embed -> store pipeline with bounded concurrency.
+
+    Each stage has its own queue and worker count, so sources are parsed and
+    chunked while earlier rows are still being embedded and written. Jobs
+    reach the chunk stage in the order they were submitted (``job.sequence``),
+    however long each takes to parse. Store
+    workers write every row that is ready through ``store_batch``, split into
+    batches by serialized payload size. The callbacks own the domain logic:
+
+    - ``parse(job)`` (blocking, run on a thread) fills ``job.text``; it may
+      hand the work to a process pool
+    - ``plan(job)`` (async) fills ``job.rows`` with the rows to store
+    - ``finalize(job)`` (blocking, run on a thread) runs once every row of the
+      job is stored; calls are serialized
+    - ``on_storing(rows)`` / ``on_stored(rows)`` (optional, blocking) see each
+      batch just before it is written, as (job, name) pairs, and just after,
+      as (job, name, content, document ID), e.g. to journal progress
+
+    The embedder paces its own requests; ``limiter`` is the one it uses, so
+    the time spent waiting on it can be reported.
+
+    Every stage is timed through ``profiler`` when one is given.
+    """
+
+    def __init__(
+        self,
+        parse: Callable[[SourceJob], None],
+        plan: Callable[[SourceJob], Awaitable[None]],
+        finalize: Callable[[SourceJob], None],
+        embedder: Any,
+        store: Any,
+        limiter: RateLimiter,
+        parse_workers: int = 2,
+        chunk_workers: int = 2,
+        embed_workers: int = 4,
+        store_workers: int = 8,
+        embed_batch_size: int = 256,
+        embed_batch_tokens: int = MAX_TOKENS_PER_REQUEST,
+        max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+        queue_size: int = 256,
+        profiler: Optional[Profiler] = None,
+        on_storing: Optional[Callable[[List[Tuple[SourceJob, str]]], None]] = None,
+        on_stored: Optional[Callable[[List[Tuple[SourceJob, str, str, Any]]], None]] = None,
+    ):
+        self.parse = parse
+        self.plan = plan
+        self.finalize = finalize
+        self.embedder = embedder
+        self.store = store
+        self.limiter = limiter
+        self.workers = {"parse": parse_workers, "chunk": chunk_workers, "embed": embed_workers, "store": store_workers}
+        self.embed_batch_size = embed_batch_size
+        self.embed_batch_tokens = embed_batch_tokens
+        self.max_batch_bytes = max_batch_bytes
+        self.queue_size = queue_size
+        self.profiler = profiler or Profiler(enabled=False)
+        self.on_storing = on_storing
+        self.on_stored = on_stored
+        self.stats = {"sources": 0, "embedded": 0, "stored": 0, "embed_requests": 0, "store_requests": 0, "retries": 0}
+        self._finalize_lock: Optional[asyncio.Lock] = None
+        self._parsed: Optional[Turnstile] = None
+
+    def _count_retry(self, attempt: int, error: Exception) -> None:
+        self.stats["retries"] += 1
+        self.profiler.count("retries")
+        print(f"⏳ Retrying after transient error (attempt {attempt + 1}): {error}")
+
+    async def _finish(self, job: SourceJob) -> None:
+        async with self._finalize_lock:
+            with self.profiler.span("finalize", source=job.path.name):
+                await asyncio.to_thread(self.finalize, job)
+        self.stats["sources"] += 1
+
+    async def _parse_worker(self, inbox: asyncio.Queue, outbox: asyncio.Queue) -> None:
+        while (job := await inbox.get()) is not None:
+            with self.profiler.span("parse", source=job.path.name):
+                await asyncio.to_thread(self.parse, job)
+            async with self._parsed.turn(job.sequence):
+                await outbox.put(job)
+
+    async def _chunk_worker(self, inbox: asyncio.Queue, outbox: asyncio.Queue) -> None:
+        while (job := await inbox.get()) is not None:
+            with self.profiler.span("plan", source=job.path.name):
+                await self.plan(job)
+            job.pending = len(job.rows)
+            if not job.rows:
+                await self._finish(job)
+            for row in job.rows:
+                await outbox.put((job, row))
+
+    async def _embed_worker(self, inbox: asyncio.Queue, outbox: asyncio.Queue) -> None:
+        done = False
+        # A row taken off the queue that did not fit in the previous request
+        carried = None
+        while not done:
+            item = carried if carried is not None else await inbox.get()
+            carried = None
+            if item is None:
+                break
+            batch = [item]
+            tokens = estimate_tokens(item[1][1])
+            # Opportunistically fill the request with rows already waiting, up to its token budget
+            while len(batch) < self.embed_batch_size and not inbox.empty():
+                item = inbox.get_nowait()
+                if item is None:
+                    done = True
+                    break
+                row_tokens = estimate_tokens(item[1][1])
+                if tokens + row_tokens > self.embed_batch_tokens:
+                    carried = item
+                    break
+                batch.append(item)
+                tokens += row_tokens
+            texts = [content for _, (_, content) in batch]
+
+            async def call():
+                self.stats["embed_requests"] += 1
+                self.profiler.count("embed_tokens_estimated", tokens)
+                with self.profiler.span("embed", "api", texts=len(texts)):
+                    return await self.embedder.embed(texts)
+
+            vectors = await with_retries(call, on_retry=self._count_retry)
+            self.stats["embedded"] += len(batch)
+            for (job, row), vector in zip(batch, vectors):
+                await outbox.put((job, row, vector))
+
+    async def _store_worker(self, inbox: asyncio.Queue) -> None:
+        done = False
+        while not done:
+            item = await inbox.get()
+            if item is None:
+                break
+            items = [item]
+            # Take every embedded row already waiting, then split by payload size
+            while not inbox.empty():
+                item = inbox.get_nowait()
+                if item is None:
+                    done = True
+                    break
+                items.append(item)
+
+            documents = [
+                {"name": name, "content": content, "embedding": vector}
+                for _, (name, content), vector in items
+            ]
+            position = 0
+            for batch in iter_payload_batches(documents, self.max_batch_bytes):
+                # Re-serializing to measure costs about as much as the write; only do it when profiling
+                size = sum(map(payload_size, batch)) if self.profiler.enabled else 0
+
+                async def call():
+                    with self.profiler.span("store_batch", "api", documents=len(batch), bytes=size):
+                        return await self.store.store_batch(batch)
+
+                batch_items = items[position:position + len(batch)]
+                if self.on_storing:
+                    self.on_storing([(job, name) for job, (name, _), _ in batch_items])
+                ids = await with_retries(call, on_retry=self._count_retry)
+                if self.on_stored:
+                    self.on_stored([(job, name, content, doc_id)
+                                    for (job, (name, content), _), doc_id in zip(batch_items, ids)])
+                self.stats["store_requests"] += 1
+                self.profiler.count("convex_mutations")
+                self.profiler.count("bytes_uploaded", size)
+                for (job, (name, _), _), doc_id in zip(batch_items, ids):
+                    job.stored[name] = doc_id
+                    self.stats["stored"] += 1
+                    job.pending -= 1
+                    if job.pending == 0:
+                        await self._finish(job)
+                position += len(batch)
+
+    async def run(self, jobs: Iterable[SourceJob]) -> Dict[str, Any]:
+        """Push every job through all stages; returns counters and elapsed time."""
+        started = time.perf_counter()
+        self._finalize_lock = asyncio.Lock()
+        self._parsed = Turnstile()
+        # Whole documents wait in the first two queues, so keep those short
+        queues = [
+            asyncio.Queue(2 * self.workers["parse"]),
+            asyncio.Queue(2 * self.workers["chunk"]),
+            asyncio.Queue(self.queue_size),
+            asyncio.Queue(self.queue_size),
+        ]
+        stages = {
+            "parse": [self._parse_worker(queues[0], queues[1]) for _ in range(self.workers["parse"])],
+            "chunk": [self._chunk_worker(queues[1], queues[2]) for _ in range(self.workers["chunk"])],
+            "embed": [self._embed_worker(queues[2], queues[3]) for _ in range(self.workers["embed"])],
+            "store": [self._store_worker(queues[3]) for _ in range(self.workers["store"])],
+        }
+        # Named tasks give each worker its own row in the profiler's trace
+        tasks = [
+            [asyncio.create_task(worker, name=f"{stage}-{i}") for i, worker in enumerate(workers)]
+            for stage, workers in stages.items()
+        ]
+
+        async def drain() -> None:
+            for sequence, job in enumerate(jobs):
+                job.sequence = sequence
+                await queues[0].put(job)
+            # Shut stages down in order: each one stops once its inbox is exhausted
+            for inbox, stage in zip(queues, tasks):
+                for _ in stage:
+                    await inbox.put(None)
+                await asyncio.gather(*stage)
+
+        everything = [task for stage in tasks for task in stage]
+        feeder = asyncio.create_task(drain())
+        try:
+            # A failing worker would otherwise leave upstream stages blocked on full queues
+            done, _ = await asyncio.wait([feeder, *everything], return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                if not task.cancelled() and task.exception():
+                    raise task.exception()
+        finally:
+            for task in [feeder, *everything]:
+                task.cancel()
+            await asyncio.gather(feeder, *everything, return_exceptions=True)
+
+        self.stats["elapsed_seconds"] = time.perf_counter() - started
+        self.stats["rate_limit_wait_seconds"] = self.limiter.waited
+        return self.stats
+
+
+def _demo_text(sentences: int) -> str:
+    rng = random.Random(0)
+    words = ("product data model skills search platform adoption resume project "
+             "customers latency enterprise growth recruiting matching").split()
+    return ". ".join(" ".join(rng.choice(words) for _ in range(rng.randint(8, 24))) for _ in range(sentences))
+
+
+async def _run_demo(sources: int, sentences: int, embed_latency: float, store_latency: float) -> None:
+    texts = [_demo_text(sentences + i) for i in range(sources)]
+
+    # Baseline: the old loop, one embed + one mutation per chunk, paced by the
+    # same limiter as the pipeline rather than the old fixed sleep
+    limiter = RateLimiter()
+    embedder = LocalEmbedder(latency=embed_latency, limiter=limiter)
+    store = LocalStore(latency=store_latency)
+    started = time.perf_counter()
+    for i, text in enumerate(texts):
+        chunks = await semantic_chunks_async(split_sentences(text), embedder)
+        for j, chunk in enumerate(chunks):
+            embedding = (await embedder.embed([chunk["content"]]))[0]
+            await store.store(f"demo_{i}_semantic_chunk_{j}", chunk["content"], embedding)
+    sequential = time.perf_counter() - started
+    print(f"🐢 Sequential: {len(store.documents)} chunks in {sequential:.2f}s")
+
+    limiter = RateLimiter()
+    embedder = LocalEmbedder(latency=embed_latency, limiter=limiter)
+    store = LocalStore(latency=store_latency)
+
+    def parse(job: SourceJob) -> None:
+        job.text = texts[int(job.source["name"].split("_")[1])]
+
+    async def plan(job: SourceJob) -> None:
+        chunks = await semantic_chunks_async(split_sentences(job.text), embedder)
+        job.rows = [(f"{job.source['name']}_semantic_chunk_{j}", c["content"]) for j, c in enumerate(chunks)]
+
+    pipeline = IngestPipeline(parse, plan, lambda job: None, embedder, store, limiter)
+    stats = await pipeline.run(SourceJob({"name": f"demo_{i}"}, Path(f"demo_{i}")) for i in range(sources))
+    print(f"🚀 Pipeline:   {stats['stored']} chunks in {stats['elapsed_seconds']:.2f}s "
+          f"({stats['embed_requests']} embedding requests, {stats['store_requests']} mutations, {sequential / stats['elapsed_seconds']:.1f}x faster)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the sequential loader with the async pipeline on local stand-ins.")
+    parser.add_argument("--sources", type=int, default=4, help="number of synthetic documents")
+    parser.add_argument("--sentences", type=int, default=60, help="sentences per synthetic document")
+    parser.add_argument("--embed-latency", type=float, default=0.2, help="simulated seconds per embeddings request")
+    parser.add_argument("--store-latency", type=float, default=0.1, help="simulated seconds per mutation")
+    args = parser.parse_args()
+    asyncio.run(_run_demo(args.sources, args.sentences, args.embed_latency, args.store_latency))
+
+
+if __name__ == "__main__":
+    main()
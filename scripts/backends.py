@@ -0,0 +1,670 @@
+import functools
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+# numpy and the service SDKs are imported where they are used, so commands
+# that only talk to Convex (row counts, clearing) start quickly
+from embedding_cache import FULL_DIMENSIONS, embedding_key
+
+# Get the absolute path to the script's directory
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+# EMBEDDING_BACKEND picks where embeddings come from, STORAGE_BACKEND where
+# documents:*, search:* and retrievalCache:* calls go:
+#   openai / convex  the live services (the default)
+#   local            deterministic embeddings / a SQLite stand-in for Convex
+#   record           the live services, saving every response as a fixture
+#   replay           the saved fixtures only; no network, no credentials
+EMBEDDING_BACKENDS = ("openai", "local", "record", "replay")
+STORAGE_BACKENDS = ("convex", "local", "record", "replay")
+
+DEFAULT_FIXTURE_DIR = PROJECT_ROOT / "fixtures"
+DEFAULT_LOCAL_STORE_PATH = PROJECT_ROOT / ".cache" / "local_store.sqlite3"
+
+# Recorded embeddings are never evicted
+_FIXTURE_MAX_BYTES = 1 << 40
+
+_FEATURE_PATTERN = re.compile(r"\w+")
+
+
+class FixtureMissingError(LookupError):
+    """A replayed call has no recorded response."""
+
+
+def embedding_backend() -> str:
+    return _choice("EMBEDDING_BACKEND", EMBEDDING_BACKENDS)
+
+
+def storage_backend() -> str:
+    return _choice("STORAGE_BACKEND", STORAGE_BACKENDS)
+
+
+def fixture_dir() -> Path:
+    return Path(os.getenv("BACKEND_FIXTURE_DIR", DEFAULT_FIXTURE_DIR))
+
+
+def _choice(variable: str, choices: Sequence[str]) -> str:
+    value = os.getenv(variable, choices[0]).lower()
+    if value not in choices:
+        raise ValueError(f"{variable} must be one of {', '.join(choices)}, not {value!r}")
+    return value
+
+
+def _require_env(*names: str) -> None:
+    missing = [name for name in names if not os.getenv(name)]
+    if missing:
+        raise ValueError(f"Missing required environment variables: {', '.join(missing)}")
+
+
+# --- Embeddings -------------------------------------------------------------
+
+def hashed_embedding(text: str, dimensions: int = FULL_DIMENSIONS) -> "np.ndarray":
+    """Deterministic unit vector for a text from hashed words and word pairs.
+
+    Texts that share vocabulary get similar vectors, so chunking thresholds
+    and search rankings behave plausibly, unlike random vectors. A reduced
+    size truncates and renormalizes, as text-embedding-3 models do.
+    """
+    import numpy as np
+
+    words = _FEATURE_PATTERN.findall(text.lower())
+    vector = np.zeros(FULL_DIMENSIONS, dtype=np.float32)
+    for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        vector[value % FULL_DIMENSIONS] += 1.0 if value >> 63 else -1.0
+    vector = vector[:dimensions]
+    norm = np.linalg.norm(vector)
+    if norm == 0:
+        # Empty or symbol-only text: any fixed unit vector will do
+        vector[0] = norm = 1.0
+    return vector / norm
+
+
+def _embedding_response(vectors: Sequence[Sequence[float]], model: str, texts: Sequence[str]) -> SimpleNamespace:
+    """An object shaped like the OpenAI SDK's CreateEmbeddingResponse."""
+    tokens = sum(len(text) // 4 + 1 for text in texts)
+    return SimpleNamespace(
+        model=model,
+        data=[SimpleNamespace(index=i, embedding=list(vector)) for i, vector in enumerate(vectors)],
+        usage=SimpleNamespace(prompt_tokens=tokens, total_tokens=tokens),
+    )
+
+
+def _as_list(input: Any) -> List[str]:
+    return [input] if isinstance(input, str) else list(input)
+
+
+class LocalEmbeddings:
+    """``client.embeddings`` of LocalEmbeddingClient."""
+
+    def create(self, input: Any, model: str, dimensions: Optional[int] = None, **kwargs) -> SimpleNamespace:
+        texts = _as_list(input)
+        size = dimensions or FULL_DIMENSIONS
+        return _embedding_response([hashed_embedding(text, size).tolist() for text in texts], model, texts)
+
+
+class LocalEmbeddingClient:
+    """Offline stand-in for ``OpenAI()`` covering ``embeddings.create``."""
+
+    def __init__(self):
+        self.embeddings = LocalEmbeddings()
+
+
+class _AsyncEmbeddings:
+    """Async face of a synchronous ``embeddings`` object, as ``AsyncOpenAI`` has."""
+
+    def __init__(self, embeddings: Any):
+        self._embeddings = embeddings
+
+    async def create(self, **kwargs) -> Any:
+        return self._embeddings.create(**kwargs)
+
+
+class EmbeddingFixtures:
+    """Recorded embeddings, one per (model, size, text) in an EmbeddingCache file.
+
+    Keying by text rather than by request means a replay succeeds however
+    the texts are batched, which varies with pipeline concurrency.
+    """
+
+    def __init__(self, directory: Path):
+        from embedding_cache import EmbeddingCache
+        self.cache = EmbeddingCache(Path(directory) / "embeddings.sqlite3", max_bytes=_FIXTURE_MAX_BYTES)
+        self._lock = threading.Lock()
+
+    def put(self, model: str, dimensions: Optional[int], texts: List[str], vectors: Sequence[Sequence[float]]) -> None:
+        with self._lock:
+            self.cache.put_many(embedding_key(model, dimensions or FULL_DIMENSIONS), texts, vectors)
+
+    def get(self, model: str, dimensions: Optional[int], texts: List[str]) -> List[List[float]]:
+        key = embedding_key(model, dimensions or FULL_DIMENSIONS)
+        with self._lock:
+            vectors = self.cache.get_many(key, texts)
+        missing = [text for text, vector in zip(texts, vectors) if vector is None]
+        if missing:
+            raise FixtureMissingError(f"No recorded {key} embedding for {len(missing)} texts, e.g. "
+                                      f"{missing[0][:60]!r}; record them with EMBEDDING_BACKEND=record")
+        return [vector.tolist() for vector in vectors]
+
+
+class RecordingEmbeddings:
+    """Forwards to a live ``embeddings`` object and saves every vector as a fixture."""
+
+    def __init__(self, embeddings: Any, fixtures: EmbeddingFixtures):
+        self._embeddings = embeddings
+        self.fixtures = fixtures
+
+    def _record(self, response: Any, texts: List[str], model: str, dimensions: Optional[int]) -> SimpleNamespace:
+        vectors = [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+        self.fixtures.put(model, dimensions, texts, vectors)
+        # Hand back the stored float32 values so a replay sees exactly what the recording did
+        return _embedding_response(self.fixtures.get(model, dimensions, texts), model, texts)
+
+    def create(self, input: Any, model: str, dimensions: Optional[int] = None, **kwargs) -> SimpleNamespace:
+        options = {"dimensions": dimensions} if dimensions else {}
+        response = self._embeddings.create(input=input, model=model, **options, **kwargs)
+        return self._record(response, _as_list(input), model, dimensions)
+
+
+class AsyncRecordingEmbeddings(RecordingEmbeddings):
+    async def create(self, input: Any, model: str, dimensions: Optional[int] = None, **kwargs) -> SimpleNamespace:
+        options = {"dimensions": dimensions} if dimensions else {}
+        response = await self._embeddings.create(input=input, model=model, **options, **kwargs)
+        return self._record(response, _as_list(input), model, dimensions)
+
+
+class ReplayEmbeddings:
+    """Answers ``embeddings.create`` from fixtures, raising FixtureMissingError on a miss."""
+
+    def __init__(self, fixtures: EmbeddingFixtures):
+        self.fixtures = fixtures
+
+    def create(self, input: Any, model: str, dimensions: Optional[int] = None, **kwargs) -> SimpleNamespace:
+        texts = _as_list(input)
+        return _embedding_response(self.fixtures.get(model, dimensions, texts), model, texts)
+
+
+def _client(embeddings: Any) -> SimpleNamespace:
+    return SimpleNamespace(embeddings=embeddings)
+
+
+@functools.lru_cache(maxsize=None)
+def _embedding_fixtures(directory: Path) -> EmbeddingFixtures:
+    return EmbeddingFixtures(directory)
+
+
+@functools.lru_cache(maxsize=None)
+def embedding_client(backend: Optional[str] = None) -> Any:
+    """Synchronous client with ``embeddings.create``, like ``OpenAI()``."""
+    backend = backend or embedding_backend()
+    if backend == "local":
+        return LocalEmbeddingClient()
+    if backend == "replay":
+        return _client(ReplayEmbeddings(_embedding_fixtures(fixture_dir())))
+    _require_env("OPENAI_API_KEY")
+    from openai import OpenAI
+    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    if backend == "record":
+        return _client(RecordingEmbeddings(client.embeddings, _embedding_fixtures(fixture_dir())))
+    return client
+
+
+@functools.lru_cache(maxsize=None)
+def async_embedding_client(backend: Optional[str] = None) -> Any:
+    """Async client with ``embeddings.create``, like ``AsyncOpenAI()``."""
+    backend = backend or embedding_backend()
+    if backend in ("local", "replay"):
+        return _client(_AsyncEmbeddings(embedding_client(backend).embeddings))
+    _require_env("OPENAI_API_KEY")
+    from openai import AsyncOpenAI
+    client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    if backend == "record":
+        return _client(AsyncRecordingEmbeddings(client.embeddings, _embedding_fixtures(fixture_dir())))
+    return client
+
+
+# --- Document storage --------------------------------------------------------
+
+class LocalConvexClient:
+    """SQLite stand-in for the Convex deployment, driven through ConvexClient's
+    ``query``/``mutation``/``action`` calls.
+
+    Covers every documents:* and lexicalIndex:* function plus
+    search:hybridSearch (answered by LocalIndex, with queries embedded
+    through ``embedding_client``) and retrievalCache:rebuild/prune. The rebuild caches hybridSearch results,
+    not the chat's multi-search retrieval. Use ":memory:" for a throwaway
+    store.
+    """
+
+    def __init__(self, path: Any = DEFAULT_LOCAL_STORE_PATH, embedding_client: Optional[Any] = None):
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.embedding_client = embedding_client or LocalEmbeddingClient()
+        self._lock = threading.RLock()
+        # Store workers call in from several threads, as they do with ConvexClient
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                row INTEGER PRIMARY KEY AUTOINCREMENT,
+                creation_time REAL NOT NULL,
+                name TEXT NOT NULL,
+                content TEXT NOT NULL,
+                embedding BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS lexical_postings (
+                term TEXT NOT NULL,
+                doc_row INTEGER NOT NULL,
+                tf INTEGER NOT NULL,
+                doc_length INTEGER NOT NULL,
+                PRIMARY KEY (doc_row, term)
+            );
+            CREATE TABLE IF NOT EXISTS lexical_stats (
+                id INTEGER PRIMARY KEY CHECK (id = 0),
+                doc_count INTEGER NOT NULL,
+                total_length INTEGER NOT NULL,
+                posting_count INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS retrieval_cache (
+                question TEXT PRIMARY KEY,
+                original_question TEXT NOT NULL,
+                results TEXT NOT NULL,
+                built_at REAL NOT NULL
+            );
+            """
+        )
+        self._db.commit()
+        self._index = None
+        self._functions = {
+            "documents:store": self._store,
+            "documents:storeBatch": self._store_batch,
+            "documents:listDocuments": self._list_documents,
+            "documents:listMetadata": self._list_metadata,
+            "documents:deleteDocument": self._delete_document,
+            "documents:rename": self._rename,
+            "documents:deleteBatch": self._delete_batch,
+            "documents:clearAllDocuments": self._clear_all,
+            "documents:swapRows": self._swap_rows,
+            "lexicalIndex:addDocuments": self._lexical_add,
+            "lexicalIndex:removeDocuments": self._lexical_remove,
+            "lexicalIndex:clear": self._lexical_clear,
+            "lexicalIndex:stats": self._lexical_stats,
+            "search:hybridSearch": self._hybrid_search,
+            "retrievalCache:rebuild": self._rebuild_retrieval_cache,
+            "retrievalCache:prune": self._prune_retrieval_cache,
+        }
+
+    def _call(self, name: str, args: Optional[Dict[str, Any]] = None) -> Any:
+        if name not in self._functions:
+            raise ValueError(f"{name} is not available in the local store")
+        with self._lock:
+            return self._functions[name](args or {})
+
+    query = mutation = action = _call
+
+    @staticmethod
+    def _id(row: int) -> str:
+        return f"local_{row}"
+
+    @staticmethod
+    def _row(doc_id: str) -> int:
+        return int(str(doc_id).rpartition("_")[2])
+
+    def _insert(self, documents: List[Dict[str, Any]], commit: bool = True) -> List[str]:
+        import numpy as np
+        ids = []
+        for doc in documents:
+            cursor = self._db.execute(
+                "INSERT INTO documents (creation_time, name, content, embedding) VALUES (?, ?, ?, ?)",
+                (time.time() * 1000, doc["name"], doc["content"], np.asarray(doc["embedding"], dtype=np.float32).tobytes()),
+            )
+            ids.append(self._id(cursor.lastrowid))
+        if commit:
+            self._db.commit()
+        self._index = None
+        return ids
+
+    def _store(self, args: Dict[str, Any]) -> str:
+        return self._insert([args])[0]
+
+    def _store_batch(self, args: Dict[str, Any]) -> List[str]:
+        return self._insert(args["documents"])
+
+    def _list_documents(self, args: Dict[str, Any]) -> List[Dict[str, Any]]:
+        import numpy as np
+        rows = self._db.execute("SELECT row, creation_time, name, content, embedding FROM documents ORDER BY row")
+        return [
+            {"_id": self._id(row), "_creationTime": created, "name": name, "content": content,
+             "embedding": np.frombuffer(embedding, dtype=np.float32).tolist()}
+            for row, created, name, content, embedding in rows
+        ]
+
+    def _list_metadata(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        import numpy as np
+        options = args["paginationOpts"]
+        after = int(options.get("cursor") or 0)
+        rows = self._db.execute(
+            "SELECT row, creation_time, name, content, length(embedding) / 4, embedding FROM documents "
+            "WHERE row > ? ORDER BY row LIMIT ?",
+            (after, options["numItems"]),
+        ).fetchall()
+        page = []
+        for row, created, name, content, dimensions, embedding in rows:
+            doc = {"_id": self._id(row), "_creationTime": created, "name": name, "contentLength": len(content),
+                   "embeddingDimensions": dimensions, "preview": content[:args.get("previewLength") or 0]}
+            if args.get("includeContent"):
+                doc["content"] = content
+            if args.get("includeEmbedding"):
+                doc["embedding"] = np.frombuffer(embedding, dtype=np.float32).tolist()
+            page.append(doc)
+        cursor = str(rows[-1][0]) if rows else str(after)
+        return {"page": page, "isDone": len(rows) < options["numItems"], "continueCursor": cursor}
+
+    def _delete_document(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        self._delete_rows([self._row(args["id"])])
+        return {"success": True}
+
+    def _rename(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        self._db.execute("UPDATE documents SET name = ? WHERE row = ?", (args["name"], self._row(args["id"])))
+        self._db.commit()
+        self._index = None
+        return {"success": True}
+
+    def _delete_batch(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        batch_size = args.get("batchSize") or 500
+        rows = [row for (row,) in self._db.execute("SELECT row FROM documents ORDER BY row LIMIT ?", (batch_size,))]
+        self._delete_rows(rows)
+        return {"deleted": len(rows), "isDone": len(rows) < batch_size}
+
+    def _clear_all(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        # No scheduler here, so the whole table goes in one call
+        rows = [row for (row,) in self._db.execute("SELECT row FROM documents")]
+        self._delete_rows(rows)
+        return {"deleted": len(rows), "isDone": True}
+
+    def _delete_rows(self, rows: List[int]) -> None:
+        """Delete rows and their postings in one transaction, like deleteIndexedRows in lexicalIndex.ts."""
+        self._lexical_remove({"ids": [str(row) for row in rows]}, commit=False)
+        self._db.executemany("DELETE FROM documents WHERE row = ?", [(row,) for row in rows])
+        self._db.commit()
+        self._index = None
+
+    def _remove_postings(self, row: int) -> Tuple[int, int]:
+        """Drop a row's postings; returns its indexed length and posting count."""
+        found = self._db.execute(
+            "SELECT MAX(doc_length), COUNT(*) FROM lexical_postings WHERE doc_row = ?", (row,)
+        ).fetchone()
+        self._db.execute("DELETE FROM lexical_postings WHERE doc_row = ?", (row,))
+        return found[0] or 0, found[1]
+
+    def _update_lexical_stats(self, docs: int, length: int, postings: int) -> None:
+        self._db.execute(
+            "INSERT INTO lexical_stats (id, doc_count, total_length, posting_count) VALUES (0, ?, ?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET doc_count = doc_count + excluded.doc_count, "
+            "total_length = total_length + excluded.total_length, "
+            "posting_count = posting_count + excluded.posting_count",
+            (docs, length, postings),
+        )
+
+    def _lexical_add(self, args: Dict[str, Any], commit: bool = True) -> Dict[str, Any]:
+        docs = length = postings = 0
+        for doc in args["documents"]:
+            row = self._row(doc["docId"])
+            previous_length, previous_postings = self._remove_postings(row)
+            if previous_postings:
+                docs, length, postings = docs - 1, length - previous_length, postings - previous_postings
+            self._db.executemany(
+                "INSERT INTO lexical_postings (term, doc_row, tf, doc_length) VALUES (?, ?, ?, ?)",
+                [(term["term"], row, term["tf"], doc["length"]) for term in doc["terms"]],
+            )
+            docs, length, postings = docs + 1, length + doc["length"], postings + len(doc["terms"])
+        self._update_lexical_stats(docs, length, postings)
+        if commit:
+            self._db.commit()
+        self._index = None
+        return {"indexed": len(args["documents"])}
+
+    def _lexical_remove(self, args: Dict[str, Any], commit: bool = True) -> Dict[str, Any]:
+        removed = length = postings = 0
+        for doc_id in args["ids"]:
+            previous_length, previous_postings = self._remove_postings(self._row(doc_id))
+            if previous_postings:
+                removed, length, postings = removed + 1, length + previous_length, postings + previous_postings
+        if removed:
+            self._update_lexical_stats(-removed, -length, -postings)
+        if commit:
+            self._db.commit()
+        self._index = None
+        return {"removed": removed}
+
+    def _lexical_clear(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        cursor = self._db.execute("DELETE FROM lexical_postings")
+        self._db.execute("DELETE FROM lexical_stats")
+        self._db.commit()
+        self._index = None
+        return {"deleted": cursor.rowcount, "isDone": True}
+
+    def _lexical_stats(self, args: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        row = self._db.execute("SELECT doc_count, total_length, posting_count FROM lexical_stats").fetchone()
+        return None if row is None else {"docCount": row[0], "totalLength": row[1], "postingCount": row[2]}
+
+    def _swap_rows(self, args: Dict[str, Any]) -> List[str]:
+        # One SQLite transaction, like the Convex mutation
+        ids = self._insert(args["insert"], commit=False)
+        if self._lexical_stats({}) is not None:
+            from lexical_index import document_postings
+            self._lexical_add({"documents": [document_postings(doc_id, doc["content"])
+                                             for doc_id, doc in zip(ids, args["insert"])]}, commit=False)
+        self._db.executemany("UPDATE documents SET name = ? WHERE row = ?",
+                             [(rename["name"], self._row(rename["id"])) for rename in args["rename"]])
+        self._lexical_remove({"ids": args["deleteIds"]}, commit=False)
+        self._db.executemany("DELETE FROM documents WHERE row = ?", [(self._row(i),) for i in args["deleteIds"]])
+        self._db.commit()
+        self._index = None
+        return ids
+
+    def _search(self, queries: List[str]) -> List[List[Dict[str, Any]]]:
+        from local_search import LocalIndex, query_embedder
+        if self._index is None:
+            # Like keywordRetriever: BM25 once the lexical index is built, substring matching before
+            lexical = "bm25" if self._lexical_stats({}) is not None else "substring"
+            self._index = LocalIndex(self._list_documents({}), lexical=lexical)
+        embed = query_embedder(self.embedding_client, dimensions=self._index.dimensions)
+        return self._index.hybrid_search(queries, embed(queries))
+
+    def _hybrid_search(self, args: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [{"text": doc["text"], "id": doc["id"], "score": doc["score"]} for doc in self._search([args["query"]])[0]]
+
+    def _rebuild_retrieval_cache(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        now = time.time() * 1000
+        for question, results in zip(args["questions"], self._search(args["questions"])):
+            self._db.execute(
+                "INSERT OR REPLACE INTO retrieval_cache (question, original_question, results, built_at) "
+                "VALUES (?, ?, ?, ?)",
+                (normalize_question(question), question,
+                 json.dumps([{"id": doc["id"], "score": doc["score"]} for doc in results]), now),
+            )
+        self._db.commit()
+        return {"cached": len(args["questions"])}
+
+    def _prune_retrieval_cache(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        keep = {normalize_question(question) for question in args["keep"]}
+        doomed = [(question,) for (question,) in self._db.execute("SELECT question FROM retrieval_cache")
+                  if question not in keep]
+        self._db.executemany("DELETE FROM retrieval_cache WHERE question = ?", doomed)
+        self._db.commit()
+        return {"deleted": len(doomed)}
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def normalize_question(question: str) -> str:
+    """Same normalization as normalizeQuestion in convex/retrievalCache.ts."""
+    return re.sub(r"[^a-z0-9%]+", " ", question.lower()).strip()
+
+
+# Calls whose result is a list aligned with one list argument are recorded per
+# item, so a replay succeeds however the pipeline happened to batch the rows
+_PER_ITEM_CALLS = {"documents:storeBatch": "documents"}
+
+
+def _fixture_key(kind: str, name: str, args: Any) -> str:
+    canonical = json.dumps(args, sort_keys=True, separators=(",", ":"))
+    return f"{kind}:{name}:{hashlib.sha256(canonical.encode('utf-8')).hexdigest()}"
+
+
+class ConvexFixtures:
+    """Recorded Convex responses, appended as JSON lines of {"key", "response"}.
+
+    Repeats of an identical call are replayed in the order they were
+    recorded; once exhausted, the last response is returned again.
+    """
+
+    def __init__(self, directory: Path):
+        self.path = Path(directory) / "convex.jsonl"
+        self._lock = threading.Lock()
+        self._responses: Dict[str, Deque[Any]] = {}
+        self._last: Dict[str, Any] = {}
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._responses.setdefault(entry["key"], deque()).append(entry["response"])
+
+    def put(self, entries: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                for entry in entries:
+                    f.write(json.dumps(entry) + "\n")
+
+    def get(self, key: str, description: str) -> Any:
+        with self._lock:
+            queue = self._responses.get(key)
+            if queue:
+                self._last[key] = queue.popleft()
+            elif key not in self._last:
+                raise FixtureMissingError(f"No recorded response for {description}; "
+                                          f"record it with STORAGE_BACKEND=record")
+            return self._last[key]
+
+
+class RecordingConvexClient:
+    """Forwards to a live ConvexClient and saves every response as a fixture."""
+
+    def __init__(self, convex: Any, fixtures: ConvexFixtures):
+        self.convex = convex
+        self.fixtures = fixtures
+
+    def _call(self, kind: str, name: str, args: Optional[Dict[str, Any]] = None) -> Any:
+        response = getattr(self.convex, kind)(name, args) if args is not None else getattr(self.convex, kind)(name)
+        field = _PER_ITEM_CALLS.get(name)
+        if field:
+            self.fixtures.put([{"key": _fixture_key(kind, name, item), "response": result}
+                               for item, result in zip(args[field], response)])
+        else:
+            self.fixtures.put([{"key": _fixture_key(kind, name, args), "response": response}])
+        return response
+
+    def query(self, name: str, args: Optional[Dict[str, Any]] = None) -> Any:
+        return self._call("query", name, args)
+
+    def mutation(self, name: str, args: Optional[Dict[str, Any]] = None) -> Any:
+        return self._call("mutation", name, args)
+
+    def action(self, name: str, args: Optional[Dict[str, Any]] = None) -> Any:
+        return self._call("action", name, args)
+
+
+class ReplayConvexClient:
+    """Answers ConvexClient calls from fixtures, raising FixtureMissingError on a miss."""
+
+    def __init__(self, fixtures: ConvexFixtures):
+        self.fixtures = fixtures
+
+    def _call(self, kind: str, name: str, args: Optional[Dict[str, Any]] = None) -> Any:
+        field = _PER_ITEM_CALLS.get(name)
+        if field:
+            return [self.fixtures.get(_fixture_key(kind, name, item), f"{name} of {item.get('name', 'a row')!r}")
+                    for item in args[field]]
+        return self.fixtures.get(_fixture_key(kind, name, args), f"{kind} {name}")
+
+    def query(self, name: str, args: Optional[Dict[str, Any]] = None) -> Any:
+        return self._call("query", name, args)
+
+    def mutation(self, name: str, args: Optional[Dict[str, Any]] = None) -> Any:
+        return self._call("mutation", name, args)
+
+    def action(self, name: str, args: Optional[Dict[str, Any]] = None) -> Any:
+        return self._call("action", name, args)
+
+
+@functools.lru_cache(maxsize=None)
+def _convex_fixtures(directory: Path) -> ConvexFixtures:
+    return ConvexFixtures(directory)
+
+
+@functools.lru_cache(maxsize=None)
+def convex_client(backend: Optional[str] = None, admin: bool = False) -> Any:
+    """Client with ConvexClient's ``query``/``mutation``/``action`` for the selected backend.
+
+    ``admin`` authenticates with CONVEX_DEPLOY_KEY, which internal functions
+    (retrievalCache:rebuild/prune) require; the local and replay stand-ins
+    need no key.
+    """
+    if admin and (backend or storage_backend()) in ("local", "replay"):
+        # The same cached stand-in every other caller gets
+        return convex_client() if backend is None else convex_client(backend)
+    backend = backend or storage_backend()
+    if backend == "local":
+        path = os.getenv("LOCAL_STORE_PATH", DEFAULT_LOCAL_STORE_PATH)
+        return LocalConvexClient(path, embedding_client())
+    if backend == "replay":
+        return ReplayConvexClient(_convex_fixtures(fixture_dir()))
+    _require_env("NEXT_PUBLIC_CONVEX_URL", *(["CONVEX_DEPLOY_KEY"] if admin else []))
+    from convex import ConvexClient
+    convex = ConvexClient(os.getenv("NEXT_PUBLIC_CONVEX_URL"))
+    if admin:
+        convex.set_admin_auth(os.getenv("CONVEX_DEPLOY_KEY"))
+    if backend == "record":
+        return RecordingConvexClient(convex, _convex_fixtures(fixture_dir()))
+    return convex
+
+
+def has_admin_access(backend: Optional[str] = None) -> bool:
+    """Whether ``convex_client(admin=True)`` can be built for the selected backend."""
+    return (backend or storage_backend()) in ("local", "replay") or bool(os.getenv("CONVEX_DEPLOY_KEY"))
+
+
+def deployment_name(backend: Optional[str] = None) -> str:
+    """Name the ingestion manifest files the selected store's state under."""
+    backend = backend or storage_backend()
+    if backend == "local":
+        return f"local:{Path(os.getenv('LOCAL_STORE_PATH', DEFAULT_LOCAL_STORE_PATH)).resolve()}"
+    if backend == "replay":
+        return f"replay:{fixture_dir().resolve()}"
+    return os.getenv("NEXT_PUBLIC_CONVEX_URL", "")
+
+
+def uses_fixtures() -> bool:
+    """Whether either backend records or replays.
+
+    Such runs should not lean on state outside the fixtures (the embedding
+    cache, the ingestion manifest), or a replay elsewhere would not make the
+    same calls as the recording did.
+    """
+    return embedding_backend() in ("record", "replay") or storage_backend() in ("record", "replay")
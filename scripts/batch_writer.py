@@ -0,0 +1,45 @@
+import json
+from typing import Any, Dict, Iterable, Iterator, List
+
+# Convex rejects function arguments over 8 MiB; stay well clear of it
+DEFAULT_MAX_BATCH_BYTES = 4 * 1024 * 1024
+
+# Convex allows 8192 document writes per transaction
+DEFAULT_MAX_BATCH_DOCUMENTS = 4096
+
+
+def payload_size(document: Dict[str, Any]) -> int:
+    """Bytes a document adds to a mutation's JSON arguments."""
+    return len(json.dumps(document, separators=(",", ":")).encode("utf-8")) + 1
+
+
+def iter_payload_batches(
+    documents: Iterable[Dict[str, Any]],
+    max_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+    max_documents: int = DEFAULT_MAX_BATCH_DOCUMENTS,
+) -> Iterator[List[Dict[str, Any]]]:
+    """Group documents into batches whose serialized size stays under max_bytes.
+
+    Order is preserved. A single document larger than the budget is sent on
+    its own rather than dropped.
+    """
+    batch: List[Dict[str, Any]] = []
+    batch_bytes = 0
+    for document in documents:
+        size = payload_size(document)
+        if batch and (batch_bytes + size > max_bytes or len(batch) >= max_documents):
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append(document)
+        batch_bytes += size
+    if batch:
+        yield batch
+
+
+def store_documents(convex: Any, documents: Iterable[Dict[str, Any]],
+                    max_bytes: int = DEFAULT_MAX_BATCH_BYTES) -> List[str]:
+    """Insert documents through documents:storeBatch; returns their IDs in order."""
+    ids: List[str] = []
+    for batch in iter_payload_batches(documents, max_bytes):
+        ids.extend(convex.mutation("documents:storeBatch", {"documents": batch}))
+    return ids
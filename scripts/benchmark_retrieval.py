@@ -0,0 +1,262 @@
+import argparse
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from build_retrieval_cache import load_suggested_questions
+
+# Get the absolute path to the script's directory
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+DEFAULT_QUERIES_PATH = PROJECT_ROOT / "data" / "retrieval_queries.json"
+DEFAULT_RESULTS_DIR = PROJECT_ROOT / "benchmarks"
+
+RECALL_CUTOFFS = (1, 3, 5, 10)
+
+# Metrics where a lower value is better, for compare
+LOWER_IS_BETTER = ("latency_ms",)
+
+
+def seed_queries(path: Path) -> int:
+    """Add suggested questions missing from the query file, with empty labels to fill in."""
+    data = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {"queries": []}
+    known = {q["query"] for q in data["queries"]}
+    added = [
+        {"query": question, "source": "suggestedQuestions", "expected_names": [], "expected_phrases": []}
+        for question in load_suggested_questions() if question not in known
+    ]
+    data["queries"].extend(added)
+    path.write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    return len(added)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def is_chunk(name: str) -> bool:
+    return "semantic_chunk" in name
+
+
+def label_hits(label: Dict[str, Any], results: Sequence[Dict[str, Any]]) -> List[Optional[int]]:
+    """For each expected name/phrase, the 1-based rank of the first result satisfying it.
+
+    Phrases only match chunk rows: the full-document rows contain every
+    phrase and would make any label trivially satisfied.
+    """
+    names = [r.get("name", "") for r in results]
+    texts = [_normalize(r["text"]) for r in results]
+    hits: List[Optional[int]] = []
+    for expected in label.get("expected_names", []):
+        hits.append(next((i + 1 for i, name in enumerate(names) if name == expected), None))
+    for phrase in label.get("expected_phrases", []):
+        needle = _normalize(phrase)
+        hits.append(next(
+            (i + 1 for i, (name, text) in enumerate(zip(names, texts)) if is_chunk(name) and needle in text),
+            None,
+        ))
+    return hits
+
+
+def score_query(label: Dict[str, Any], results: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """recall@k over the label's expected items and the reciprocal rank of the first hit."""
+    hits = label_hits(label, results)
+    found = [rank for rank in hits if rank is not None]
+    recall = {
+        str(k): (sum(1 for rank in found if rank <= k) / len(hits)) if hits else None
+        for k in RECALL_CUTOFFS
+    }
+    first = min(found) if found else None
+    return {"recall": recall, "first_relevant_rank": first, "reciprocal_rank": 1 / first if first else 0.0}
+
+
+class ConvexBackend:
+    """Calls the deployed search:hybridSearch action."""
+
+    name = "convex"
+
+    def __init__(self, convex: Any):
+        self.convex = convex
+        self._names: Dict[str, str] = {}
+
+    def prepare(self) -> None:
+        # hybridSearch returns IDs only; row names are needed to label chunks
+        from convex_pages import iter_metadata
+        self._names = {doc["_id"]: doc["name"] for page in iter_metadata(self.convex) for doc in page}
+
+    def search(self, query: str) -> List[Dict[str, Any]]:
+        results = self.convex.action("search:hybridSearch", {"query": query})
+        return [dict(result, name=self._names.get(result["id"], "")) for result in results]
+
+
+class LocalBackend:
+    """Answers queries from a LocalIndex, embedding each query on demand."""
+
+    name = "local"
+
+    def __init__(self, index: Any, embed: Callable[[List[str]], List[List[float]]]):
+        self.index = index
+        self.embed = embed
+
+    def prepare(self) -> None:
+        pass
+
+    def search(self, query: str) -> List[Dict[str, Any]]:
+        return self.index.hybrid_search([query], self.embed([query]))[0]
+
+
+def percentiles(samples: Sequence[float]) -> Dict[str, float]:
+    values = np.asarray(samples, dtype=np.float64)
+    if not len(values):
+        return {}
+    return {
+        "p50": float(np.percentile(values, 50)),
+        "p95": float(np.percentile(values, 95)),
+        "p99": float(np.percentile(values, 99)),
+        "mean": float(values.mean()),
+        "max": float(values.max()),
+    }
+
+
+def run_benchmark(backend: Any, labels: List[Dict[str, Any]], clients: int = 1, repeats: int = 1,
+                  warmup: int = 1) -> Dict[str, Any]:
+    """Replay every labelled query ``repeats`` times across ``clients`` concurrent workers."""
+    backend.prepare()
+    for label in labels[:warmup]:
+        backend.search(label["query"])
+
+    def timed(label: Dict[str, Any]):
+        started = time.perf_counter()
+        results = backend.search(label["query"])
+        return label, results, (time.perf_counter() - started) * 1000
+
+    workload = [label for _ in range(repeats) for label in labels]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        outcomes = list(pool.map(timed, workload))
+    wall_seconds = time.perf_counter() - started
+
+    per_query: Dict[str, Dict[str, Any]] = {}
+    for label, results, latency in outcomes:
+        entry = per_query.setdefault(label["query"], {"query": label["query"], "latencies_ms": [], **score_query(label, results)})
+        entry["latencies_ms"].append(latency)
+
+    queries = list(per_query.values())
+    for entry in queries:
+        entry["latency_ms"] = percentiles(entry.pop("latencies_ms"))
+
+    labelled = [q for q in queries if q["recall"]["1"] is not None]
+    recall = {
+        str(k): float(np.mean([q["recall"][str(k)] for q in labelled])) if labelled else None
+        for k in RECALL_CUTOFFS
+    }
+    return {
+        "backend": backend.name,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "params": {"clients": clients, "repeats": repeats, "queries": len(labels)},
+        "latency_ms": percentiles([latency for _, _, latency in outcomes]),
+        "throughput_qps": len(outcomes) / wall_seconds if wall_seconds else 0.0,
+        "recall_at_k": recall,
+        "mrr": float(np.mean([q["reciprocal_rank"] for q in labelled])) if labelled else None,
+        "queries": queries,
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    latency = report["latency_ms"]
+    print(f"\n📊 RETRIEVAL BENCHMARK ({report['backend']}, {report['params']['clients']} clients)")
+    print("=" * 60)
+    print(f"Latency: p50 {latency['p50']:.1f} ms, p95 {latency['p95']:.1f} ms, p99 {latency['p99']:.1f} ms")
+    print(f"Throughput: {report['throughput_qps']:.1f} queries/s")
+    for k, value in report["recall_at_k"].items():
+        if value is not None:
+            print(f"Recall@{k}: {value:.3f}")
+    if report["mrr"] is not None:
+        print(f"MRR: {report['mrr']:.3f}")
+    print("-" * 60)
+    for q in report["queries"]:
+        rank = q["first_relevant_rank"]
+        print(f"{'✅' if rank else '❌'} {q['query'][:50]:<50} first hit: {rank or '-'}")
+
+
+def compare_reports(baseline: Dict[str, Any], candidate: Dict[str, Any]) -> None:
+    """Print metric deltas between two saved runs."""
+    rows = [(f"latency_ms.{p}", baseline["latency_ms"].get(p), candidate["latency_ms"].get(p)) for p in ("p50", "p95", "p99")]
+    rows.append(("throughput_qps", baseline["throughput_qps"], candidate["throughput_qps"]))
+    rows += [(f"recall@{k}", baseline["recall_at_k"].get(k), candidate["recall_at_k"].get(k)) for k in candidate["recall_at_k"]]
+    rows.append(("mrr", baseline["mrr"], candidate["mrr"]))
+    print(f"{'metric':<18}{'baseline':>12}{'candidate':>12}{'delta':>12}")
+    for metric, old, new in rows:
+        if old is None or new is None:
+            continue
+        worse = (new > old) if metric.startswith(LOWER_IS_BETTER) else (new < old)
+        flag = " ⚠️" if worse and abs(new - old) > 1e-9 else ""
+        print(f"{metric:<18}{old:>12.3f}{new:>12.3f}{new - old:>+12.3f}{flag}")
+
+
+def build_backend(args: argparse.Namespace) -> Any:
+    from backends import convex_client, embedding_client
+    from dotenv import load_dotenv
+    load_dotenv(PROJECT_ROOT / ".env")
+    if args.backend == "convex":
+        return ConvexBackend(convex_client())
+
+    from embedding_cache import EmbeddingCache, configured_cache_path
+    from local_search import LocalIndex, load_index, query_embedder
+    if args.snapshot:
+        index = load_index(args.snapshot, lexical=args.lexical)
+    else:
+        index = LocalIndex.from_convex(convex_client(), lexical=args.lexical)
+    return LocalBackend(index, query_embedder(embedding_client(), EmbeddingCache(configured_cache_path()),
+                                              index.dimensions))
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark retrieval latency, throughput, recall@k and MRR.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="replay the labelled queries against a backend")
+    run.add_argument("--backend", choices=["convex", "local"], default="convex")
+    run.add_argument("--snapshot", type=Path,
+                     help="JSON snapshot, compression.py .npz or snapshot.py .rbsnap copy for the local backend")
+    run.add_argument("--lexical", choices=["bm25", "substring"], default="bm25", help="local lexical fallback")
+    run.add_argument("--queries", type=Path, default=DEFAULT_QUERIES_PATH, help="labelled query file")
+    run.add_argument("--clients", type=int, default=1, help="concurrent clients")
+    run.add_argument("--repeats", type=int, default=1, help="times to replay the query set")
+    run.add_argument("--output", type=Path, help="where to write the JSON report")
+
+    seed = commands.add_parser("seed", help="add data/suggestedQuestions.ts questions to the query file")
+    seed.add_argument("--queries", type=Path, default=DEFAULT_QUERIES_PATH)
+
+    compare = commands.add_parser("compare", help="diff two saved reports")
+    compare.add_argument("baseline", type=Path)
+    compare.add_argument("candidate", type=Path)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "seed":
+        print(f"🌱 Added {seed_queries(args.queries)} suggested questions to {args.queries}")
+        return
+    if args.command == "compare":
+        compare_reports(json.loads(args.baseline.read_text()), json.loads(args.candidate.read_text()))
+        return
+
+    labels = json.loads(args.queries.read_text(encoding="utf-8"))["queries"]
+    report = run_benchmark(build_backend(args), labels, clients=args.clients, repeats=args.repeats)
+    print_report(report)
+
+    output = args.output or DEFAULT_RESULTS_DIR / f"{report['backend']}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"\n💾 Wrote report to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import argparse
+import json
+import re
+from pathlib import Path
+from typing import Any, List
+
+# Get the absolute path to the script's directory
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+SUGGESTED_QUESTIONS_PATH = PROJECT_ROOT / "data" / "suggestedQuestions.ts"
+
+# Each question runs several searches; small batches keep actions well under their time limit
+REBUILD_BATCH_SIZE = 4
+
+
+def load_suggested_questions(path: Path = SUGGESTED_QUESTIONS_PATH) -> List[str]:
+    """Pull the question strings out of data/suggestedQuestions.ts."""
+    source = path.read_text(encoding="utf-8")
+    return [json.loads(f'"{match}"') for match in re.findall(r'question:\s*"((?:[^"\\]|\\.)*)"', source)]
+
+
+def build_retrieval_cache(convex: Any, questions: List[str], batch_size: int = REBUILD_BATCH_SIZE) -> int:
+    """Precompute and store retrieval results for each question; returns questions cached.
+
+    Retrieval runs inside Convex (retrievalCache:rebuild) through the same
+    routine the chat uses, so a cache hit returns exactly what a live search
+    would have at build time. Entries for questions no longer suggested are
+    removed. Both functions are internal: pass ``convex_client(admin=True)``.
+    """
+    cached = 0
+    for start in range(0, len(questions), batch_size):
+        batch = questions[start:start + batch_size]
+        cached += convex.action("retrievalCache:rebuild", {"questions": batch})["cached"]
+        print(f"   {cached}/{len(questions)} questions cached")
+    pruned = convex.mutation("retrievalCache:prune", {"keep": questions})["deleted"]
+    if pruned:
+        print(f"🗑️  Removed {pruned} cached questions that are no longer suggested")
+    return cached
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute retrieval results for the suggested questions.")
+    parser.add_argument("--questions", type=Path, default=SUGGESTED_QUESTIONS_PATH,
+                        help="TypeScript file with the suggested questions")
+    args = parser.parse_args()
+
+    from backends import convex_client
+    from dotenv import load_dotenv
+    load_dotenv(PROJECT_ROOT / ".env")
+
+    questions = load_suggested_questions(args.questions)
+    print(f"💡 Caching retrieval results for {len(questions)} suggested questions")
+    try:
+        cached = build_retrieval_cache(convex_client(admin=True), questions)
+        print(f"✅ Cached {cached} questions")
+    except Exception as e:
+        print(f"❌ Error building retrieval cache: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
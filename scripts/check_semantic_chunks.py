@@ -1,99 +1,105 @@
-import os
+import argparse
 from pathlib import Path
-from dotenv import load_dotenv
-from convex import ConvexClient
+from typing import Dict, List, Optional
+from backends import convex_client
+from convex_pages import DEFAULT_PAGE_SIZE, iter_metadata
 
 # Get the absolute path to the script's directory
 SCRIPT_DIR = Path(__file__).resolve().parent
 PROJECT_ROOT = SCRIPT_DIR.parent
 
-# Load environment variables
-env_path = PROJECT_ROOT / ".env"
-load_dotenv(env_path)
+PREVIEW_LENGTH = 150
 
-# Initialize Convex client
-convex = ConvexClient(os.getenv("NEXT_PUBLIC_CONVEX_URL"))
+class SizeStats:
+    """Running count, total, min and max of chunk sizes, so nothing is kept per row."""
 
-def check_semantic_chunks():
-    """Check and display the semantic chunks stored in the database."""
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.smallest = None
+        self.largest = None
+
+    def add(self, size: int) -> None:
+        self.count += 1
+        self.total += size
+        self.smallest = size if self.smallest is None else min(self.smallest, size)
+        self.largest = size if self.largest is None else max(self.largest, size)
+
+    @property
+    def average(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+def check_semantic_chunks(page_size: int = DEFAULT_PAGE_SIZE, show_chunks: bool = True):
+    """Check and display the semantic chunks stored in the database.
+
+    Rows are read a page at a time through documents:listMetadata, which
+    leaves out the embeddings, and statistics are accumulated as pages
+    arrive, so memory stays flat however large the table is.
+    """
     try:
-        # Get all documents using the correct query function
-        documents = convex.query("documents:listDocuments")
-        
+        convex = convex_client()
         print(f"\n🔍 SEMANTIC CHUNKING VERIFICATION")
         print(f"=" * 60)
-        print(f"📊 Total documents in database: {len(documents)}")
-        
-        # Separate full documents from semantic chunks
-        full_documents = []
-        semantic_chunks = []
-        
-        for doc in documents:
-            if "semantic_chunk" in doc['name']:
-                semantic_chunks.append(doc)
-            else:
-                full_documents.append(doc)
-        
-        print(f"📄 Full documents: {len(full_documents)}")
-        print(f"🧠 Semantic chunks: {len(semantic_chunks)}")
+
+        full_count = 0
+        overall = SizeStats()
+        by_source: Dict[str, SizeStats] = {}
+        pages = 0
+
+        for page in iter_metadata(convex, page_size, preview_length=PREVIEW_LENGTH):
+            pages += 1
+            for doc in page:
+                if "semantic_chunk" not in doc['name']:
+                    full_count += 1
+                    print(f"\n📄 FULL DOCUMENT: {doc['name']}")
+                    print(f"ID: {doc['_id']}")
+                    print(f"Content length: {doc['contentLength']} characters")
+                    print(f"Embedding dimensions: {doc['embeddingDimensions']}")
+                    print(f"Preview: {doc['preview']}...")
+                    print(f"-" * 40)
+                    continue
+
+                source, _, chunk_num = doc['name'].rpartition('_semantic_chunk_')
+                by_source.setdefault(source, SizeStats()).add(doc['contentLength'])
+                overall.add(doc['contentLength'])
+                if show_chunks:
+                    print(f"  🧠 {source} chunk {chunk_num}: {doc['contentLength']} chars")
+                    print(f"    Preview: {doc['preview'][:100]}...")
+                    print(f"    ID: {doc['_id']}")
+
+        print(f"\n📊 Total documents in database: {full_count + overall.count} (read in {pages} pages)")
+        print(f"📄 Full documents: {full_count}")
+        print(f"🧠 Semantic chunks: {overall.count}")
         print(f"=" * 60)
-        
-        # Display full documents
-        print(f"\n📄 FULL DOCUMENTS:")
-        print(f"-" * 40)
-        for doc in full_documents:
-            print(f"Name: {doc['name']}")
-            print(f"ID: {doc['_id']}")
-            print(f"Content length: {len(doc['content'])} characters")
-            print(f"Embedding dimensions: {len(doc['embedding'])}")
-            print(f"Preview: {doc['content'][:150]}...")
-            print(f"-" * 40)
-        
-        # Display semantic chunks grouped by source
-        print(f"\n🧠 SEMANTIC CHUNKS:")
-        print(f"-" * 40)
-        
-        # Group chunks by source document
-        resume_chunks = [doc for doc in semantic_chunks if "resume" in doc['name']]
-        answers_chunks = [doc for doc in semantic_chunks if "suggested_answers" in doc['name']]
-        
-        if resume_chunks:
-            print(f"\n📋 RESUME SEMANTIC CHUNKS ({len(resume_chunks)} chunks):")
-            for i, chunk in enumerate(sorted(resume_chunks, key=lambda x: x['name'])):
-                chunk_num = chunk['name'].split('_')[-1]
-                print(f"  Chunk {chunk_num}: {len(chunk['content'])} chars")
-                print(f"    Preview: {chunk['content'][:100]}...")
-                print(f"    ID: {chunk['_id']}")
-                print()
-        
-        if answers_chunks:
-            print(f"\n💬 SUGGESTED ANSWERS SEMANTIC CHUNKS ({len(answers_chunks)} chunks):")
-            for i, chunk in enumerate(sorted(answers_chunks, key=lambda x: x['name'])):
-                chunk_num = chunk['name'].split('_')[-1]
-                print(f"  Chunk {chunk_num}: {len(chunk['content'])} chars")
-                print(f"    Preview: {chunk['content'][:100]}...")
-                print(f"    ID: {chunk['_id']}")
-                print()
-        
+
+        for source, stats in sorted(by_source.items()):
+            print(f"📋 {source}: {stats.count} chunks, "
+                  f"{stats.average:.0f} chars on average ({stats.smallest}-{stats.largest})")
+
         # Summary statistics
-        if semantic_chunks:
-            chunk_sizes = [len(chunk['content']) for chunk in semantic_chunks]
-            avg_size = sum(chunk_sizes) / len(chunk_sizes)
-            min_size = min(chunk_sizes)
-            max_size = max(chunk_sizes)
-            
+        if overall.count:
             print(f"\n📊 SEMANTIC CHUNKING STATISTICS:")
-            print(f"  Average chunk size: {avg_size:.0f} characters")
-            print(f"  Smallest chunk: {min_size} characters")
-            print(f"  Largest chunk: {max_size} characters")
-            print(f"  Total semantic chunks: {len(semantic_chunks)}")
-        
+            print(f"  Average chunk size: {overall.average:.0f} characters")
+            print(f"  Smallest chunk: {overall.smallest} characters")
+            print(f"  Largest chunk: {overall.largest} characters")
+            print(f"  Total semantic chunks: {overall.count}")
+
         print(f"\n✅ Semantic chunking verification complete!")
         print(f"🧠 Your documents are now intelligently chunked based on semantic meaning!")
-        
+
     except Exception as e:
         print(f"❌ Error checking semantic chunks: {str(e)}")
         raise
 
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Show the documents and semantic chunks stored in Convex.")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE, help="rows fetched per query")
+    parser.add_argument("--summary", action="store_true", help="only print statistics, not every chunk")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    load_dotenv(PROJECT_ROOT / ".env")
+    check_semantic_chunks(args.page_size, show_chunks=not args.summary)
+
 if __name__ == "__main__":
-    check_semantic_chunks() 
\ No newline at end of file
+    main()
@@ -1,50 +1,78 @@
+import argparse
 import os
 from pathlib import Path
-from dotenv import load_dotenv
-from convex import ConvexClient
+from typing import List, Optional
+from backends import convex_client, deployment_name
+from convex_pages import DEFAULT_DELETE_BATCH_SIZE, count_documents, delete_all
+from ingest_journal import IngestJournal
+from ingest_manifest import DEFAULT_MANIFEST_PATH, IngestManifest
+from lexical_index import clear_index
 
 # Get the absolute path to the script's directory
 SCRIPT_DIR = Path(__file__).resolve().parent
 PROJECT_ROOT = SCRIPT_DIR.parent
 
-# Load environment variables
-env_path = PROJECT_ROOT / ".env"
-load_dotenv(env_path)
+def forget_ingestion(embedding: str = ""):
+    """Reset the ingestion manifest and drop any interrupted run's journal, so
+    the next ingestion stores everything again instead of skipping it.
+    ``embedding`` records the model the table's rows now use, if any."""
+    manifest = IngestManifest(deployment_name(), Path(os.getenv("INGEST_MANIFEST_PATH", DEFAULT_MANIFEST_PATH)))
+    manifest.reset(embedding)
+    manifest.save()
+    IngestJournal.for_deployment(manifest.deployment, manifest.path.parent).complete()
 
-# Initialize Convex client
-convex = ConvexClient(os.getenv("NEXT_PUBLIC_CONVEX_URL"))
-
-def clear_all_documents():
-    """Clear all documents from the database."""
+def clear_all_documents(batch_size: int = DEFAULT_DELETE_BATCH_SIZE):
+    """Clear all documents from the database, one batch per transaction."""
     try:
+        convex = convex_client()
         print("🗑️  CLEARING DATABASE")
         print("=" * 40)
-        
-        # Get count of documents first
-        documents = convex.query("documents:listDocuments")
-        doc_count = len(documents)
+
+        # Get count of documents first, paging through metadata only
+        doc_count = count_documents(convex)
         print(f"📊 Found {doc_count} documents to delete")
-        
+
         if doc_count == 0:
+            # Postings can outlive their rows (an interrupted clear or ingestion)
+            postings = clear_index(convex)
+            if postings:
+                print(f"🔎 Cleared {postings} leftover lexical index postings")
+            forget_ingestion()
             print("✅ Database is already empty!")
             return
-        
+
         # Confirm deletion
         confirm = input(f"\n⚠️  Are you sure you want to delete ALL {doc_count} documents? (yes/no): ")
         if confirm.lower() != 'yes':
             print("❌ Deletion cancelled")
             return
-        
-        # Clear all documents using the batch function
-        print("🗑️  Deleting all documents...")
-        result = convex.mutation("documents:clearAllDocuments")
-        
-        print(f"\n✅ Successfully deleted {result['deleted']} documents!")
+
+        # Delete in batches so no single mutation outgrows the transaction limits
+        print(f"🗑️  Deleting all documents in batches of {batch_size}...")
+        deleted = delete_all(convex, batch_size, on_batch=lambda total: print(f"   {total}/{doc_count} deleted"))
+
+        # The next ingestion rebuilds the index from scratch
+        postings = clear_index(convex)
+        print(f"🔎 Cleared {postings} lexical index postings")
+        forget_ingestion()
+        print("📋 Reset the ingestion manifest")
+
+        print(f"\n✅ Successfully deleted {deleted} documents!")
         print("🧹 Database is now clean and ready for fresh semantic chunks!")
-        
+
     except Exception as e:
         print(f"❌ Error clearing database: {str(e)}")
         raise
 
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Delete every row of the documents table.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_DELETE_BATCH_SIZE,
+                        help="rows deleted per mutation")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    load_dotenv(PROJECT_ROOT / ".env")
+    clear_all_documents(args.batch_size)
+
 if __name__ == "__main__":
-    clear_all_documents() 
\ No newline at end of file
+    main()
@@ -0,0 +1,221 @@
+import argparse
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from embedding_cache import FULL_DIMENSIONS
+from local_search import LocalIndex, top_k
+from semantic_chunker import normalize_rows
+
+# Get the absolute path to the script's directory
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+DEFAULT_QUERIES_PATH = PROJECT_ROOT / "data" / "retrieval_queries.json"
+
+EVALUATED_DIMENSIONS = (1536, 1024, 512, 256)
+DTYPES = ("float32", "float16", "int8")
+
+# Model the stored rows are embedded with; its vectors can be truncated (Matryoshka)
+DOCUMENT_EMBEDDING_MODEL = "text-embedding-3-small"
+
+
+def truncate_dimensions(matrix: Any, dimensions: int) -> np.ndarray:
+    """Leading ``dimensions`` of each row, renormalized to unit length.
+
+    This is what the API's ``dimensions`` parameter returns for
+    text-embedding-3 models, so reduced sizes can be evaluated offline.
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    return normalize_rows(matrix[:, :dimensions])
+
+
+def quantize_int8(matrix: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-row int8 codes and the float32 scale of each row."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    scales = np.abs(matrix).max(axis=1) / 127
+    scales[scales == 0] = 1
+    codes = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def dequantize_int8(codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    return codes.astype(np.float32) * scales[:, None]
+
+
+def encode(matrix: Any, dtype: str) -> Dict[str, np.ndarray]:
+    """Arrays holding a matrix at a storage dtype: float32, float16 or int8 (+ scales)."""
+    if dtype == "float32":
+        return {"vectors": np.asarray(matrix, dtype=np.float32)}
+    if dtype == "float16":
+        return {"vectors": np.asarray(matrix, dtype=np.float16)}
+    if dtype == "int8":
+        codes, scales = quantize_int8(matrix)
+        return {"vectors": codes, "scales": scales}
+    raise ValueError(f"Unknown dtype: {dtype}")
+
+
+def decode(arrays: Dict[str, np.ndarray]) -> np.ndarray:
+    """Unit-norm float32 matrix back from encode's arrays."""
+    vectors = arrays["vectors"]
+    if vectors.dtype == np.int8:
+        return normalize_rows(dequantize_int8(vectors, arrays["scales"]))
+    return normalize_rows(vectors.astype(np.float32))
+
+
+def bytes_per_vector(dimensions: int, dtype: str) -> int:
+    itemsize = np.dtype(dtype).itemsize
+    return dimensions * itemsize + (4 if dtype == "int8" else 0)
+
+
+def compress(matrix: Any, dimensions: int, dtype: str) -> np.ndarray:
+    """Round-trip a matrix through truncation and quantization, as a searchable float32 matrix."""
+    return decode(encode(truncate_dimensions(matrix, dimensions), dtype))
+
+
+def save_compressed(index: LocalIndex, path: Path, dimensions: int, dtype: str) -> int:
+    """Write a LocalIndex's rows as a compact .npz; returns the size of the vectors in bytes."""
+    arrays = encode(truncate_dimensions(index.matrix, dimensions), dtype)
+    np.savez(
+        path,
+        ids=np.array(index.ids),
+        names=np.array(index.names),
+        texts=np.array(index.texts),
+        **arrays,
+    )
+    return sum(array.nbytes for array in arrays.values())
+
+
+def load_compressed(path: Path, **kwargs) -> LocalIndex:
+    """LocalIndex over a .npz written by save_compressed."""
+    with np.load(path) as data:
+        matrix = decode({key: data[key] for key in ("vectors", "scales") if key in data})
+        documents = [
+            {"_id": str(doc_id), "name": str(name), "content": str(text), "embedding": vector}
+            for doc_id, name, text, vector in zip(data["ids"], data["names"], data["texts"], matrix)
+        ]
+    return LocalIndex(documents, **kwargs)
+
+
+def neighbour_recall(baseline: np.ndarray, candidate: np.ndarray, queries: np.ndarray,
+                     candidate_queries: np.ndarray, k: int, exclude_self: bool = False) -> float:
+    """Mean fraction of each query's baseline top-k that the candidate also returns in its top-k."""
+    base_scores = queries @ baseline.T
+    cand_scores = candidate_queries @ candidate.T
+    if exclude_self:
+        np.fill_diagonal(base_scores, -np.inf)
+        np.fill_diagonal(cand_scores, -np.inf)
+    k = min(k, baseline.shape[0] - (1 if exclude_self else 0))
+    if k <= 0:
+        return 1.0
+    base_rows, _ = top_k(base_scores, k)
+    cand_rows, _ = top_k(cand_scores, k)
+    overlaps = [len(set(b) & set(c)) / k for b, c in zip(base_rows, cand_rows)]
+    return float(np.mean(overlaps))
+
+
+def evaluate(matrix: Any, query_vectors: Optional[Sequence[Sequence[float]]] = None, k: int = 10,
+             dimensions: Sequence[int] = EVALUATED_DIMENSIONS, dtypes: Sequence[str] = DTYPES) -> List[Dict[str, Any]]:
+    """Recall@k of every size/dtype combination against full-size float32 search.
+
+    Self-queries use each stored row as a query (excluding itself); labelled
+    queries must be text-embedding-3-small vectors at least as long as the
+    rows. They are truncated to the rows' size (rows may have been stored
+    reduced), then per evaluated size like the rows.
+    """
+    baseline = normalize_rows(matrix)
+    queries = None
+    if query_vectors is not None and len(query_vectors):
+        queries = np.asarray(query_vectors, dtype=np.float32)
+        if queries.shape[1] < baseline.shape[1]:
+            raise ValueError(f"Query vectors have {queries.shape[1]} dimensions but the rows have "
+                             f"{baseline.shape[1]}; embed the queries at full size")
+        queries = truncate_dimensions(queries, baseline.shape[1])
+    rows = []
+    for dims in dimensions:
+        if dims > baseline.shape[1]:
+            continue
+        for dtype in dtypes:
+            candidate = compress(baseline, dims, dtype)
+            row = {
+                "dimensions": dims,
+                "dtype": dtype,
+                "bytes_per_vector": bytes_per_vector(dims, dtype),
+                "self_recall": neighbour_recall(baseline, candidate, baseline, candidate, k, exclude_self=True),
+            }
+            if queries is not None:
+                row["query_recall"] = neighbour_recall(baseline, candidate, queries, truncate_dimensions(queries, dims), k)
+            rows.append(row)
+    return rows
+
+
+def print_evaluation(rows: List[Dict[str, Any]], documents: int, k: int) -> None:
+    print(f"\n📐 RECALL@{k} VS FULL-SIZE FLOAT32 ({documents} documents)")
+    print("=" * 60)
+    print(f"{'dims':>6}{'dtype':>9}{'bytes/vec':>11}{'self':>9}{'queries':>10}{'total KiB':>11}")
+    for row in rows:
+        queries = f"{row['query_recall']:.3f}" if "query_recall" in row else "-"
+        total = row["bytes_per_vector"] * documents / 1024
+        print(f"{row['dimensions']:>6}{row['dtype']:>9}{row['bytes_per_vector']:>11}"
+              f"{row['self_recall']:>9.3f}{queries:>10}{total:>11.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure and export reduced-size, quantized embeddings.")
+    parser.add_argument("--snapshot", type=Path, help="JSON snapshot to read (default: load from Convex)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    evaluate_cmd = commands.add_parser("evaluate", help="recall loss of each size/dtype against the full vectors")
+    evaluate_cmd.add_argument("--k", type=int, default=10, help="neighbours compared per query")
+    evaluate_cmd.add_argument("--queries", type=Path, nargs="?", const=DEFAULT_QUERIES_PATH,
+                              help="also embed the labelled benchmark queries (default file if no path)")
+    evaluate_cmd.add_argument("--output", type=Path, help="write the results as JSON")
+
+    export = commands.add_parser("export", help="write a compact local copy for LocalIndex")
+    export.add_argument("output", type=Path, help=".npz file to write")
+    export.add_argument("--dimensions", type=int, default=FULL_DIMENSIONS)
+    export.add_argument("--dtype", choices=DTYPES, default="int8")
+    args = parser.parse_args()
+
+    from backends import convex_client, embedding_client
+    from dotenv import load_dotenv
+    load_dotenv(PROJECT_ROOT / ".env")
+
+    if args.snapshot:
+        index = LocalIndex.from_snapshot(args.snapshot)
+    else:
+        index = LocalIndex.from_convex(convex_client())
+    print(f"📚 Loaded {len(index)} documents ({index.matrix.nbytes / 1024:.0f} KiB of float32 embeddings)")
+
+    if args.command == "export":
+        size = save_compressed(index, args.output, args.dimensions, args.dtype)
+        print(f"💾 Wrote {args.output} ({size / 1024:.0f} KiB of {args.dtype} x {args.dimensions} vectors)")
+        return
+
+    query_vectors = None
+    if args.queries:
+        from embedding_cache import EmbeddingCache, configured_cache_path
+        queries = [q["query"] for q in json.loads(args.queries.read_text(encoding="utf-8"))["queries"]]
+        # Full-size query vectors from the rows' model; evaluate truncates them to the rows' size
+        client = embedding_client()
+        cache = EmbeddingCache(configured_cache_path())
+        response_vectors = cache.get_many(DOCUMENT_EMBEDDING_MODEL, queries)
+        missing = [q for q, vector in zip(queries, response_vectors) if vector is None]
+        if missing:
+            response = client.embeddings.create(input=missing, model=DOCUMENT_EMBEDDING_MODEL)
+            cache.put_many(DOCUMENT_EMBEDDING_MODEL, missing,
+                           [item.embedding for item in sorted(response.data, key=lambda item: item.index)])
+            response_vectors = cache.get_many(DOCUMENT_EMBEDDING_MODEL, queries)
+        query_vectors = np.stack(response_vectors)
+
+    rows = evaluate(index.matrix, query_vectors, k=args.k)
+    print_evaluation(rows, len(index), args.k)
+    if args.output:
+        args.output.write_text(json.dumps({"k": args.k, "documents": len(index), "results": rows}, indent=2) + "\n")
+        print(f"\n💾 Wrote results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
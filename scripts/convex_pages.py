@@ -0,0 +1,52 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Rows fetched per documents:listMetadata call
+DEFAULT_PAGE_SIZE = 200
+
+# Rows removed per documents:deleteBatch transaction
+DEFAULT_DELETE_BATCH_SIZE = 500
+
+
+def iter_pages(convex: Any, function: str, args: Optional[Dict[str, Any]] = None,
+               page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """Follow a paginated Convex query's continueCursor, yielding one page at a time."""
+    cursor = None
+    while True:
+        result = convex.query(function, {**(args or {}), "paginationOpts": {"numItems": page_size, "cursor": cursor}})
+        yield result["page"]
+        if result["isDone"]:
+            return
+        cursor = result["continueCursor"]
+
+
+def iter_metadata(convex: Any, page_size: int = DEFAULT_PAGE_SIZE, preview_length: int = 0,
+                  include_content: bool = False, include_embedding: bool = False) -> Iterator[List[Dict[str, Any]]]:
+    """Pages of documents:listMetadata rows: _id, name, contentLength, embeddingDimensions, preview.
+
+    ``include_content`` adds the full text for callers that need to hash it;
+    ``include_embedding`` adds the vector, for exports only (a full-size
+    vector is ~30 KB of JSON, so use small pages).
+    """
+    args: Dict[str, Any] = {"previewLength": preview_length}
+    if include_content:
+        args["includeContent"] = True
+    if include_embedding:
+        args["includeEmbedding"] = True
+    return iter_pages(convex, "documents:listMetadata", args, page_size)
+
+
+def count_documents(convex: Any, page_size: int = 1000) -> int:
+    return sum(len(page) for page in iter_metadata(convex, page_size))
+
+
+def delete_all(convex: Any, batch_size: int = DEFAULT_DELETE_BATCH_SIZE,
+               on_batch: Optional[Callable[[int], None]] = None) -> int:
+    """Empty the documents table one documents:deleteBatch transaction at a time; returns rows deleted."""
+    total = 0
+    while True:
+        result = convex.mutation("documents:deleteBatch", {"batchSize": batch_size})
+        total += result["deleted"]
+        if on_batch:
+            on_batch(total)
+        if result["isDone"]:
+            return total
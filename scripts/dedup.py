@@ -0,0 +1,118 @@
+import hashlib
+import re
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# 128 permutations in 32 bands of 4 rows: pairs above ~0.6 Jaccard almost
+# always share a band; candidates are then checked against the threshold
+NUM_PERMUTATIONS = 128
+LSH_BANDS = 32
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+
+# Estimated Jaccard similarity of word shingles above which chunks are merged
+DEFAULT_DUPLICATE_THRESHOLD = 0.7
+
+SHINGLE_WORDS = 3
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_WORD_PATTERN = re.compile(r"\w+")
+
+# Fixed seed: signatures are persisted in the ingestion manifest and must stay comparable
+_rng = np.random.default_rng(20250101)
+_A = _rng.integers(1, (1 << 61) - 1, NUM_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.integers(0, (1 << 61) - 1, NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def normalized_words(text: str) -> List[str]:
+    return _WORD_PATTERN.findall(text.lower())
+
+
+def exact_key(text: str) -> str:
+    """Hash of a text with case, punctuation and whitespace differences removed."""
+    return hashlib.sha256(" ".join(normalized_words(text)).encode("utf-8")).hexdigest()
+
+
+def shingles(text: str, size: int = SHINGLE_WORDS) -> np.ndarray:
+    """CRC32 hashes of the text's overlapping word n-grams (the whole text if shorter)."""
+    words = normalized_words(text)
+    grams = {" ".join(words[i:i + size]) for i in range(max(1, len(words) - size + 1))}
+    return np.fromiter((zlib.crc32(gram.encode("utf-8")) for gram in grams), dtype=np.uint64, count=len(grams))
+
+
+def minhash(text: str) -> np.ndarray:
+    """MinHash signature of a text's shingles: NUM_PERMUTATIONS uint32 values."""
+    hashed = shingles(text)
+    # Universal hashing (a*x + b) mod p; uint64 wraparound is part of the hash family
+    with np.errstate(over="ignore"):
+        values = (np.outer(hashed, _A) + _B) % _MERSENNE_PRIME
+    return (values.min(axis=0) & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+
+def estimated_jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.mean(a == b))
+
+
+def signature_to_hex(signature: np.ndarray) -> str:
+    return signature.astype("<u4").tobytes().hex()
+
+
+def signature_from_hex(value: str) -> np.ndarray:
+    return np.frombuffer(bytes.fromhex(value), dtype="<u4").astype(np.uint32)
+
+
+class DuplicateIndex:
+    """Exact and MinHash/LSH near-duplicate lookup over named chunks.
+
+    ``claim(name, text)`` either registers the chunk as canonical and returns
+    None, or returns ``(canonical_name, similarity)`` for the chunk it
+    duplicates. Exact matches (after normalization) have similarity 1.0;
+    near matches are LSH candidates verified against ``threshold``.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_DUPLICATE_THRESHOLD):
+        self.threshold = threshold
+        self.signatures: Dict[str, np.ndarray] = {}
+        self._exact: Dict[str, str] = {}
+        self._buckets: Dict[Tuple[int, bytes], List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    @staticmethod
+    def _bands(signature: np.ndarray):
+        for band in range(LSH_BANDS):
+            yield band, signature[band * LSH_ROWS:(band + 1) * LSH_ROWS].tobytes()
+
+    def add(self, name: str, signature: np.ndarray, key: Optional[str] = None) -> None:
+        """Register a canonical chunk, e.g. one already stored by an earlier run."""
+        self.signatures[name] = signature
+        if key:
+            self._exact.setdefault(key, name)
+        for bucket in self._bands(signature):
+            self._buckets.setdefault(bucket, []).append(name)
+
+    def find(self, signature: np.ndarray, key: Optional[str] = None) -> Optional[Tuple[str, float]]:
+        """Best canonical chunk this signature duplicates, if any."""
+        if key and key in self._exact:
+            return self._exact[key], 1.0
+        best: Optional[Tuple[str, float]] = None
+        seen = set()
+        for bucket in self._bands(signature):
+            for name in self._buckets.get(bucket, ()):
+                if name in seen:
+                    continue
+                seen.add(name)
+                similarity = estimated_jaccard(signature, self.signatures[name])
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (name, similarity)
+        return best
+
+    def claim(self, name: str, text: str) -> Optional[Tuple[str, float]]:
+        signature = minhash(text)
+        key = exact_key(text)
+        match = self.find(signature, key)
+        if match is None:
+            self.add(name, signature, key)
+        return match
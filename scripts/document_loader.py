@@ -0,0 +1,165 @@
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+SUPPORTED_SUFFIXES = (".docx", ".md", ".txt", ".pdf")
+
+# Files that predate directory ingestion keep the row names they were stored under
+KNOWN_SOURCES = {
+    "EdaTopuz_Resume 2025.docx": {"name": "resume", "label": "resume"},
+    "suggested_answers.docx": {"name": "suggested_answers", "label": "suggested answers"},
+}
+
+Block = Dict[str, str]
+
+
+def source_for(path: Path, directory: Optional[Path] = None) -> Dict[str, str]:
+    """Row name prefix and display label for a source file.
+
+    Files in subdirectories of ``directory`` get the subdirectories in their
+    name (data/notes/x.md is notes_x), so they don't collide with x.md.
+    """
+    path = Path(path)
+    relative = Path(path.name)
+    if directory is not None and path.resolve().is_relative_to(Path(directory).resolve()):
+        relative = path.resolve().relative_to(Path(directory).resolve())
+    known = KNOWN_SOURCES.get(relative.as_posix())
+    if known:
+        return {**known, "file": relative.as_posix()}
+    name = re.sub(r"[^a-z0-9]+", "_", relative.with_suffix("").as_posix().lower()).strip("_") or "document"
+    return {"name": name, "label": path.stem, "file": relative.as_posix()}
+
+
+def is_source_path(path: Path) -> bool:
+    """Whether a path names a supported document rather than a hidden or editor lock file."""
+    return path.suffix.lower() in SUPPORTED_SUFFIXES and not path.name.startswith((".", "~$"))
+
+
+def discover_sources(directory: Path) -> List[Tuple[Dict[str, str], Path]]:
+    """Walk a directory for supported documents, skipping hidden and editor lock files.
+
+    Raises ValueError when two files map to the same source name (a b.txt
+    and a_b.md, or resume.pdf and EdaTopuz_Resume 2025.docx), since their
+    rows would overwrite each other.
+    """
+    sources = [
+        (source_for(path, directory), path) for path in sorted(Path(directory).rglob("*"))
+        if path.is_file() and is_source_path(path)
+    ]
+    files: Dict[str, List[str]] = {}
+    for source, _ in sources:
+        files.setdefault(source["name"], []).append(source["file"])
+    clashes = {name: names for name, names in files.items() if len(names) > 1}
+    if clashes:
+        details = "; ".join(f"{', '.join(names)} share the name {name}" for name, names in sorted(clashes.items()))
+        raise ValueError(f"Documents would overwrite each other's rows ({details}); rename one of each")
+    return sources
+
+
+def iter_docx_blocks(path: Path) -> Iterator[Block]:
+    """Paragraphs and tables of a .docx in document order.
+
+    Every paragraph is yielded, empty ones included, so joining block texts
+    with newlines reproduces the paragraph text the loader used to build.
+    Table rows become lines of ``cell | cell``, with merged cells once.
+    """
+    import docx
+    from docx.table import Table
+    from docx.text.paragraph import Paragraph
+
+    doc = docx.Document(str(path))
+    for child in doc.element.body.iterchildren():
+        tag = child.tag.rsplit("}", 1)[-1]
+        if tag == "p":
+            yield {"kind": "paragraph", "text": Paragraph(child, doc).text}
+        elif tag == "tbl":
+            lines = []
+            for row in Table(child, doc).rows:
+                cells = []
+                for cell in row.cells:
+                    text = cell.text.strip()
+                    if text and (not cells or cells[-1] != text):
+                        cells.append(text)
+                if cells:
+                    lines.append(" | ".join(cells))
+            if lines:
+                yield {"kind": "table", "text": "\n".join(lines)}
+
+
+def iter_text_blocks(path: Path) -> Iterator[Block]:
+    """Blank-line separated paragraphs of a .txt or .md file, read line by line.
+
+    Markdown headings and pipe tables are yielded as their own blocks.
+    """
+    markdown = path.suffix.lower() == ".md"
+    lines: List[str] = []
+    kind = "paragraph"
+
+    def flush() -> Iterator[Block]:
+        if lines:
+            yield {"kind": kind, "text": "\n".join(lines)}
+            lines.clear()
+
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for raw in f:
+            line = raw.rstrip("\n")
+            if not line.strip():
+                yield from flush()
+                continue
+            if markdown and line.lstrip().startswith("#"):
+                yield from flush()
+                yield {"kind": "heading", "text": line.lstrip("# ").strip()}
+                continue
+            line_kind = "table" if markdown and line.lstrip().startswith("|") else "paragraph"
+            if line_kind != kind:
+                yield from flush()
+                kind = line_kind
+            if line_kind == "table":
+                cells = [cell.strip() for cell in line.strip().strip("|").split("|")]
+                if all(re.fullmatch(r":?-+:?", cell) for cell in cells if cell):
+                    continue  # header separator row
+                line = " | ".join(cell for cell in cells if cell)
+            lines.append(line)
+    yield from flush()
+
+
+def iter_pdf_blocks(path: Path) -> Iterator[Block]:
+    """Blank-line separated paragraphs of each PDF page, one page at a time."""
+    try:
+        from pypdf import PdfReader
+    except ImportError as e:
+        raise ImportError(f"Reading {path.name} needs the optional pypdf package: pip install pypdf") from e
+
+    for page in PdfReader(str(path)).pages:
+        text = page.extract_text() or ""
+        for paragraph in re.split(r"\n\s*\n", text):
+            if paragraph.strip():
+                yield {"kind": "paragraph", "text": paragraph.strip()}
+
+
+def iter_blocks(path: Path) -> Iterator[Block]:
+    """Lazily yield the paragraph and table blocks of any supported file."""
+    suffix = path.suffix.lower()
+    if suffix == ".docx":
+        return iter_docx_blocks(path)
+    if suffix in (".md", ".txt"):
+        return iter_text_blocks(path)
+    if suffix == ".pdf":
+        return iter_pdf_blocks(path)
+    raise ValueError(f"Unsupported document type: {path.name}")
+
+
+def parse_file(path: Path) -> List[Block]:
+    """Process-pool entry point: every block of one file, as a list.
+
+    Parsing is lazy inside the worker, but the whole file comes back at
+    once, and the pipeline holds it in memory (blocks, joined text and
+    sentences) until it is chunked. Memory is bounded by the largest files
+    in flight, a few per parse and chunk worker, not by the size of the
+    corpus; a single very large file is still read whole.
+    """
+    return list(iter_blocks(Path(path)))
+
+
+def block_texts(blocks: Iterable[Block]) -> Iterator[str]:
+    return (block["text"] for block in blocks)
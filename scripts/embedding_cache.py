@@ -0,0 +1,203 @@
+import argparse
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+# Get the absolute path to the script's directory
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+DEFAULT_CACHE_PATH = PROJECT_ROOT / ".cache" / "embeddings.sqlite3"
+
+# 256 MiB holds roughly 43k text-embedding-3-small vectors
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# SQLite caps the number of bound parameters per statement
+_LOOKUP_BATCH = 500
+
+
+# Native output size of the OpenAI embedding models used here
+FULL_DIMENSIONS = 1536
+
+
+def configured_cache_path() -> Path:
+    """The cache file set by EMBEDDING_CACHE_PATH, or the default under .cache/."""
+    return Path(os.getenv("EMBEDDING_CACHE_PATH", DEFAULT_CACHE_PATH))
+
+
+def embedding_key(model: str, dimensions: int = FULL_DIMENSIONS) -> str:
+    """Cache/manifest key for a model at a given output size, e.g. text-embedding-3-small@256."""
+    return model if dimensions == FULL_DIMENSIONS else f"{model}@{dimensions}"
+
+
+def text_hash(text: str) -> str:
+    """Content address of a text: hex SHA-256 of its UTF-8 bytes."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """On-disk embedding store keyed by (model, text hash) with LRU eviction."""
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Shared by query threads (benchmark clients); calls are serialized by the lock
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._lock = threading.RLock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                dimensions INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._db.commit()
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional["np.ndarray"]]:
+        """Look up cached float32 vectors for texts; missing entries are None."""
+        import numpy as np
+
+        hashes = [text_hash(text) for text in texts]
+        found: Dict[str, np.ndarray] = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            for start in range(0, len(unique), _LOOKUP_BATCH):
+                batch = unique[start:start + _LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._db.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *batch],
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+
+            if found:
+                now = time.time()
+                self._db.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, key) for key in found],
+                )
+                self._db.commit()
+
+            results = [found.get(key) for key in hashes]
+            hit_count = sum(1 for vector in results if vector is not None)
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+        return results
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """Store vectors for texts, then evict least recently used entries over the size limit."""
+        import numpy as np
+
+        now = time.time()
+        rows = []
+        for text, vector in zip(texts, vectors):
+            array = np.asarray(vector, dtype=np.float32)
+            rows.append((model, text_hash(text), array.shape[0], array.tobytes(), now))
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, dimensions, vector, last_used) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._db.commit()
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        total = self.size_bytes()
+        if total <= self.max_bytes:
+            return
+        cursor = self._db.execute("SELECT model, text_hash, length(vector) FROM embeddings ORDER BY last_used ASC")
+        doomed = []
+        for model, key, size in cursor:
+            if total <= self.max_bytes:
+                break
+            doomed.append((model, key))
+            total -= size
+        self._db.executemany("DELETE FROM embeddings WHERE model = ? AND text_hash = ?", doomed)
+        self._db.commit()
+        self.evictions += len(doomed)
+
+    def size_bytes(self) -> int:
+        """Total bytes of stored vectors."""
+        return self._db.execute("SELECT COALESCE(SUM(length(vector)), 0) FROM embeddings").fetchone()[0]
+
+    def invalidate(self, model: Optional[str] = None) -> int:
+        """Delete every entry for a model, or the whole cache when model is None."""
+        if model is None:
+            cursor = self._db.execute("DELETE FROM embeddings")
+        else:
+            cursor = self._db.execute("DELETE FROM embeddings WHERE model = ?", (model,))
+        self._db.commit()
+        return cursor.rowcount
+
+    def reset_counters(self) -> None:
+        """Zero the hit, miss and eviction counts, e.g. between runs in one process."""
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this session plus per-model entry counts on disk."""
+        models = {
+            model: {"entries": entries, "bytes": size}
+            for model, entries, size in self._db.execute(
+                "SELECT model, COUNT(*), SUM(length(vector)) FROM embeddings GROUP BY model"
+            )
+        }
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "bytes": self.size_bytes(),
+            "max_bytes": self.max_bytes,
+            "models": models,
+        }
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or invalidate the embedding cache.")
+    parser.add_argument("--path", type=Path, help="cache database file (default: $EMBEDDING_CACHE_PATH or .cache/)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="show entry counts and size per model")
+    invalidate = commands.add_parser("invalidate", help="delete cached embeddings")
+    target = invalidate.add_mutually_exclusive_group(required=True)
+    target.add_argument("--model", help="only delete embeddings for this model")
+    target.add_argument("--all", action="store_true", help="delete every cached embedding")
+    args = parser.parse_args()
+
+    cache = EmbeddingCache(args.path or configured_cache_path())
+    try:
+        if args.command == "stats":
+            stats = cache.stats()
+            print(f"📦 Embedding cache: {cache.path}")
+            print(f"   Size: {stats['bytes'] / 1024 / 1024:.1f} MiB of {stats['max_bytes'] / 1024 / 1024:.0f} MiB")
+            for model, info in stats["models"].items():
+                print(f"   {model}: {info['entries']} embeddings")
+        else:
+            deleted = cache.invalidate(None if args.all else args.model)
+            print(f"🗑️  Deleted {deleted} cached embeddings")
+    finally:
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+# Get the absolute path to the script's directory
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+DEFAULT_JOURNAL_DIR = PROJECT_ROOT / ".cache"
+
+
+class IngestJournal:
+    """Write-ahead log of an ingestion run, one fsynced JSON object per line.
+
+    Events, after a ``begin``, in the order a source produces them:
+
+    - ``parsed`` / ``planned`` (with the file hash the plan was made from)
+    - ``storing``: row names about to be sent to documents:storeBatch
+    - ``stored``: the same rows with their source, document ID and content hash
+    - ``deleted``: a row retired by finalize or rolled back
+    - ``finalized``: the source's manifest entry has been saved
+
+    ``complete`` removes the file, so a journal left on disk means the last
+    run stopped partway. Its rows are either picked up again by ``--resume``
+    or rolled back. Rows that were ``storing`` but never ``stored`` may or
+    may not have been written; callers find those by name.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.entries: List[Dict[str, Any]] = []
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self.entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # A crash mid-write leaves at most one torn line, always the last
+                        break
+        self._file = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_deployment(cls, deployment: str, directory: Path = DEFAULT_JOURNAL_DIR) -> "IngestJournal":
+        digest = hashlib.sha256(deployment.encode("utf-8")).hexdigest()[:12]
+        return cls(Path(directory) / f"ingest_journal-{digest}.jsonl")
+
+    @property
+    def interrupted(self) -> bool:
+        """Whether a previous run left work behind."""
+        return bool(self.entries)
+
+    def open(self) -> None:
+        """Start appending to the journal, after whatever a previous run left."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def restart(self) -> None:
+        """Discard the previous run's entries, once nothing in them is needed."""
+        with self._lock:
+            self._file.truncate(0)
+            self.entries = []
+
+    def record(self, event: str, **fields: Any) -> None:
+        entry = {"event": event, "time": time.time(), **fields}
+        with self._lock:
+            self.entries.append(entry)
+            if self._file is None:
+                return
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def complete(self) -> None:
+        """The run finished: nothing is left to resume or roll back."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self.entries = []
+            self.path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def started_with(self) -> Dict[str, Any]:
+        """Fields of the interrupted run's ``begin`` entry (its embedding key, for one)."""
+        return next((e for e in self.entries if e["event"] == "begin"), {})
+
+    def finalized(self) -> Dict[str, str]:
+        """Source name -> file hash of every source whose manifest entry was saved."""
+        return {e["source"]: e["file_hash"] for e in self.entries if e["event"] == "finalized"}
+
+    def planned(self) -> Dict[str, str]:
+        """Source name -> file hash its latest plan was made from."""
+        return {e["source"]: e["file_hash"] for e in self.entries if e["event"] == "planned"}
+
+    def deleted(self) -> Set[str]:
+        return {e["id"] for e in self.entries if e["event"] == "deleted"}
+
+    def pending_rows(self) -> Dict[str, Dict[str, Dict[str, str]]]:
+        """Rows stored for sources that never finalized: source -> row name -> {"id", "content_hash"}."""
+        finalized, deleted = self.finalized(), self.deleted()
+        pending: Dict[str, Dict[str, Dict[str, str]]] = {}
+        for entry in self.entries:
+            if entry["event"] != "stored":
+                continue
+            for row in entry["rows"]:
+                if row["source"] not in finalized and row["id"] not in deleted:
+                    pending.setdefault(row["source"], {})[row["name"]] = {
+                        "id": row["id"], "content_hash": row["content_hash"]
+                    }
+        return pending
+
+    def unconfirmed_names(self) -> Set[str]:
+        """Row names sent to storeBatch without a recorded result."""
+        storing: Set[str] = set()
+        for entry in self.entries:
+            if entry["event"] == "storing":
+                storing.update(entry["names"])
+            elif entry["event"] == "stored":
+                storing.difference_update(row["name"] for row in entry["rows"])
+        return storing
+
+    def known_ids(self) -> Set[str]:
+        return {row["id"] for entry in self.entries if entry["event"] == "stored" for row in entry["rows"]}
+
+
+def rows_to_roll_back(journal: IngestJournal, keep: Optional[Dict[str, str]] = None) -> List[str]:
+    """IDs of journaled rows to delete: every pending row, except those of
+    sources in ``keep`` (name -> current file hash) whose plan still matches."""
+    keep = keep or {}
+    planned = journal.planned()
+    return [
+        row["id"]
+        for source, rows in journal.pending_rows().items()
+        if not (source in keep and planned.get(source) == keep[source])
+        for row in rows.values()
+    ]
@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# Get the absolute path to the script's directory
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+DEFAULT_MANIFEST_PATH = PROJECT_ROOT / ".cache" / "ingest_manifest.json"
+
+MANIFEST_VERSION = 1
+
+
+def file_hash(path: Path) -> str:
+    """Hex SHA-256 of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def content_hash(content: str) -> str:
+    """Hex SHA-256 of a document's text."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def source_of(document_name: str, source_names: Iterable[str]) -> str:
+    """Name of the source a stored document belongs to, or '' if none matches."""
+    for source in source_names:
+        if document_name == source or document_name.startswith(f"{source}_semantic_chunk_"):
+            return source
+    return ""
+
+
+class IngestManifest:
+    """Records, per Convex deployment, what each source file was last ingested as.
+
+    For every source it keeps the file hash and, for each stored row, the row
+    name, content hash and Convex document ID, so re-ingestion can diff the
+    new chunks against what is already in the table. Chunks dropped as
+    near-duplicates are listed under ``merged`` with the row they were
+    merged into, and stored chunks keep their MinHash signature so later
+    runs can dedup against them.
+    """
+
+    def __init__(self, deployment: str, path: Path = DEFAULT_MANIFEST_PATH):
+        self.deployment = deployment
+        self.path = Path(path)
+        self._data: Dict[str, Any] = {"version": MANIFEST_VERSION, "deployments": {}}
+        if self.path.exists():
+            with open(self.path) as f:
+                self._data = json.load(f)
+        self._sources: Dict[str, Any] = self._data["deployments"].setdefault(deployment, {"sources": {}})["sources"]
+
+    @property
+    def is_empty(self) -> bool:
+        return not self._sources
+
+    @property
+    def embedding(self) -> str:
+        """Embedding model key (see embedding_cache.embedding_key) the stored rows were made with."""
+        return self._data["deployments"][self.deployment].get("embedding", "")
+
+    @embedding.setter
+    def embedding(self, key: str) -> None:
+        self._data["deployments"][self.deployment]["embedding"] = key
+
+    def source(self, name: str) -> Dict[str, Any]:
+        """Manifest entry for a source: {"file", "file_hash", "documents", "merged"}."""
+        entry = self._sources.get(name, {"file": "", "file_hash": "", "documents": {}})
+        return {"merged": {}, **entry}
+
+    def set_source(self, name: str, file_name: str, source_file_hash: str, documents: Dict[str, Dict[str, str]],
+                   merged: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+        self._sources[name] = {"file": file_name, "file_hash": source_file_hash, "documents": documents,
+                               "merged": merged or {}}
+
+    def remove_source(self, name: str) -> None:
+        """Forget a source whose file was deleted, once its rows are gone."""
+        self._sources.pop(name, None)
+
+    def signatures(self, exclude: Set[str] = frozenset()) -> Iterator[Tuple[str, str]]:
+        """(row name, hex MinHash signature) of stored chunks outside the excluded sources."""
+        for source, entry in self._sources.items():
+            if source in exclude:
+                continue
+            for row_name, row in entry["documents"].items():
+                if row.get("minhash"):
+                    yield row_name, row["minhash"]
+
+    def merged_into(self, sources: Set[str]) -> Set[str]:
+        """Other sources with chunks merged into rows of ``sources``.
+
+        When those rows are re-chunked the merged copies may lose their
+        canonical row, so their sources have to be re-planned as well.
+        """
+        names = list(self._sources)
+        return {
+            other for other, entry in self._sources.items()
+            if other not in sources
+            and any(source_of(row["into"], names) in sources for row in entry.get("merged", {}).values())
+        }
+
+    def row_ids(self) -> Set[str]:
+        """Document IDs of every stored row the manifest knows about."""
+        return {row["id"] for entry in self._sources.values() for row in entry["documents"].values()}
+
+    def drop_missing(self, stored_ids: Set[str]) -> Dict[str, int]:
+        """Forget rows that are no longer in the table; returns {source: rows lost}.
+
+        Those sources get their file hash cleared, so the next plan re-chunks
+        them and stores the missing rows again instead of trusting the manifest.
+        """
+        lost: Dict[str, int] = {}
+        for source, entry in self._sources.items():
+            missing = [name for name, row in entry["documents"].items() if row["id"] not in stored_ids]
+            for name in missing:
+                del entry["documents"][name]
+            if missing:
+                entry["file_hash"] = ""
+                lost[source] = len(missing)
+        return lost
+
+    def adopt(self, stored_documents: Iterable[Dict[str, Any]], source_names: List[str]) -> int:
+        """Seed the manifest from rows already in the table; returns rows adopted.
+
+        Used on the first incremental run against a deployment loaded by an
+        older full ingestion, so its rows are diffed instead of duplicated.
+        File hashes are left empty to force every source to be re-chunked.
+        """
+        adopted = 0
+        for doc in stored_documents:
+            source = source_of(doc["name"], source_names)
+            if not source:
+                continue
+            entry = self._sources.setdefault(source, {"file": "", "file_hash": "", "documents": {}})
+            entry["documents"][doc["name"]] = {"id": doc["_id"], "content_hash": content_hash(doc["content"])}
+            adopted += 1
+        return adopted
+
+    def reset(self, embedding: str = "") -> None:
+        """Forget every source of this deployment, after its rows were replaced
+        wholesale; the next ingestion adopts whatever the table then holds."""
+        self._sources.clear()
+        self.embedding = embedding
+
+    def save(self) -> None:
+        """Write the manifest atomically so an interrupted run never truncates it."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self._data, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def diff_documents(
+    stored: Dict[str, Dict[str, str]],
+    planned: List[Tuple[str, str]],
+) -> Dict[str, List[Any]]:
+    """Compare stored rows with the (name, content) rows a source should now have.
+
+    Rows are matched by content hash, so a chunk whose text is unchanged is
+    kept even if its position (and therefore its name) moved. Returns:
+
+    - ``insert``: (name, content) pairs with no stored row to reuse
+    - ``keep``: (name, id, content_hash) for rows that stay, under their new name
+    - ``rename``: (id, new_name) for kept rows whose name changed
+    - ``delete``: IDs of stored rows no longer produced
+    """
+    unclaimed: Dict[str, List[Tuple[str, str]]] = {}
+    for name, row in stored.items():
+        unclaimed.setdefault(row["content_hash"], []).append((name, row["id"]))
+
+    insert, keep, rename = [], [], []
+    for name, content in planned:
+        digest = content_hash(content)
+        candidates = unclaimed.get(digest)
+        if not candidates:
+            insert.append((name, content))
+            continue
+        # Prefer the stored row that already has this name
+        match = next((c for c in candidates if c[0] == name), candidates[0])
+        candidates.remove(match)
+        keep.append((name, match[1], digest))
+        if match[0] != name:
+            rename.append((match[1], name))
+
+    delete = [row_id for rows in unclaimed.values() for _, row_id in rows]
+    return {"insert": insert, "keep": keep, "rename": rename, "delete": delete}
@@ -0,0 +1,161 @@
+import argparse
+import json
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Get the absolute path to the script's directory
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+# Generated from NLTK's English stopword list (see `stopwords` below); the
+# Convex side imports the same file, so both ends drop the same terms
+STOPWORDS_MODULE = PROJECT_ROOT / "convex" / "stopwords.ts"
+
+# Same pattern as indexTerms in convex/lexicalIndex.ts; keeps figures like 220% and 1.5 intact
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?%?")
+
+# Postings written per lexicalIndex:addDocuments call, well inside Convex's per-mutation write limit
+MAX_POSTINGS_PER_BATCH = 4000
+
+# Each removed document deletes one row per distinct term, so keep these batches small
+REMOVE_BATCH_SIZE = 8
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; keeps figures like 220% and 1.5 intact."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def load_stopwords(path: Path = STOPWORDS_MODULE) -> FrozenSet[str]:
+    """The stopword list shared with Convex, read from convex/stopwords.ts."""
+    source = path.read_text(encoding="utf-8")
+    return frozenset(json.loads(f'"{word}"') for word in re.findall(r'"((?:[^"\\]|\\.)*)"', source))
+
+
+STOPWORDS = load_stopwords()
+
+
+def index_terms(text: str) -> List[str]:
+    """Tokens that go into the inverted index: tokenize() without stopwords."""
+    return [term for term in tokenize(text) if term not in STOPWORDS]
+
+
+def document_postings(doc_id: Any, text: str) -> Dict[str, Any]:
+    """lexicalIndex:addDocuments entry for one row: its length and term frequencies."""
+    counts = Counter(index_terms(text))
+    return {
+        "docId": doc_id,
+        "length": sum(counts.values()),
+        "terms": [{"term": term, "tf": tf} for term, tf in sorted(counts.items())],
+    }
+
+
+def iter_posting_batches(entries: Iterable[Dict[str, Any]],
+                         max_postings: int = MAX_POSTINGS_PER_BATCH) -> Iterator[List[Dict[str, Any]]]:
+    """Group entries so no call writes more than max_postings rows (a larger entry goes alone)."""
+    batch: List[Dict[str, Any]] = []
+    postings = 0
+    for entry in entries:
+        if batch and postings + len(entry["terms"]) > max_postings:
+            yield batch
+            batch, postings = [], 0
+        batch.append(entry)
+        postings += len(entry["terms"])
+    if batch:
+        yield batch
+
+
+def index_documents(convex: Any, documents: Iterable[Tuple[Any, str]]) -> int:
+    """Upload postings for (document ID, content) rows; re-indexing a row replaces its postings."""
+    indexed = 0
+    for batch in iter_posting_batches(document_postings(doc_id, text) for doc_id, text in documents):
+        indexed += convex.mutation("lexicalIndex:addDocuments", {"documents": batch})["indexed"]
+    return indexed
+
+
+def remove_documents(convex: Any, ids: Sequence[Any]) -> int:
+    """Drop the postings of deleted rows; returns rows that had any."""
+    removed = 0
+    for start in range(0, len(ids), REMOVE_BATCH_SIZE):
+        batch = list(ids[start:start + REMOVE_BATCH_SIZE])
+        removed += convex.mutation("lexicalIndex:removeDocuments", {"ids": batch})["removed"]
+    return removed
+
+
+def clear_index(convex: Any) -> int:
+    """Delete every posting and the collection statistics, a batch per call."""
+    deleted = 0
+    while True:
+        result = convex.mutation("lexicalIndex:clear", {})
+        deleted += result["deleted"]
+        if result["isDone"]:
+            return deleted
+
+
+def rebuild_index(convex: Any) -> int:
+    """Index every row of the documents table from scratch; returns rows indexed."""
+    from convex_pages import iter_metadata
+
+    clear_index(convex)
+    indexed = 0
+    for page in iter_metadata(convex, include_content=True):
+        indexed += index_documents(convex, [(doc["_id"], doc["content"]) for doc in page])
+    return indexed
+
+
+def write_stopwords_module(words: Iterable[str], path: Path = STOPWORDS_MODULE) -> int:
+    """Write the stopword list as a TypeScript Set; returns the number of words."""
+    words = sorted(set(words))
+    lines = ["// Generated by `python scripts/lexical_index.py stopwords` from NLTK's English list.",
+             "// scripts/lexical_index.py reads this file too, so both sides drop the same terms.",
+             "export const STOPWORDS: ReadonlySet<string> = new Set(["]
+    line = " "
+    for word in words:
+        item = f" {json.dumps(word)},"
+        if len(line) + len(item) > 100:
+            lines.append(line)
+            line = " "
+        line += item
+    lines += [line, "]);", ""]
+    path.write_text("\n".join(lines), encoding="utf-8")
+    return len(words)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Maintain the BM25 term-postings index in Convex.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("rebuild", help="re-index every stored row")
+    commands.add_parser("stats", help="show the collection statistics")
+    commands.add_parser("stopwords", help="regenerate convex/stopwords.ts from NLTK (run download_nltk.py first)")
+    args = parser.parse_args(argv)
+
+    if args.command == "stopwords":
+        from nltk.corpus import stopwords
+        count = write_stopwords_module(stopwords.words("english"))
+        print(f"💾 Wrote {count} stopwords to {STOPWORDS_MODULE}")
+        return
+
+    from backends import convex_client
+    from dotenv import load_dotenv
+    load_dotenv(PROJECT_ROOT / ".env")
+    convex = convex_client()
+    try:
+        if args.command == "rebuild":
+            print("🔎 Rebuilding the lexical index...")
+            print(f"✅ Indexed {rebuild_index(convex)} documents")
+        else:
+            stats = convex.query("lexicalIndex:stats")
+            if stats is None:
+                print("📭 The lexical index has not been built; run `python lexical_index.py rebuild`")
+            else:
+                print(f"📊 {stats['docCount']} documents, {stats['postingCount']} postings, "
+                      f"{stats['totalLength'] / max(stats['docCount'], 1):.1f} terms per document on average")
+    except Exception as e:
+        print(f"❌ Error maintaining lexical index: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+import argparse
+import json
+import math
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from convex_pages import iter_metadata
+from embedding_cache import FULL_DIMENSIONS, embedding_key
+from lexical_index import index_terms
+from semantic_chunker import normalize_rows
+
+# Get the absolute path to the script's directory
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+# Mirrors convex/search.ts: hybridSearch embeds queries with the rows' model
+# (text-embedding-3-small, at the size convex/embeddingConfig.ts sets), asks
+# vectorSearch for 50 results and trusts them above a 0.7 top score
+QUERY_EMBEDDING_MODEL = "text-embedding-3-small"
+VECTOR_LIMIT = 50
+SEMANTIC_SCORE_THRESHOLD = 0.7
+
+# keywordRetriever returns at most this many BM25 matches
+KEYWORD_LIMIT = 50
+
+# Rows per documents:listMetadata page when loading from Convex; each
+# full-size embedding is ~30 KB of JSON, so pages stay well under read limits
+LOAD_PAGE_SIZE = 100
+
+
+class BM25Index:
+    """Okapi BM25 over an in-memory inverted index of term -> (doc rows, term frequencies).
+
+    Terms come from lexical_index.index_terms, so scores match the postings
+    Convex's keywordRetriever reads.
+    """
+
+    def __init__(self, texts: Sequence[str], k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.doc_count = len(texts)
+        postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        lengths = np.zeros(len(texts), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts = Counter(index_terms(text))
+            lengths[row] = sum(counts.values())
+            for term, tf in counts.items():
+                rows, tfs = postings.setdefault(term, ([], []))
+                rows.append(row)
+                tfs.append(tf)
+        self.doc_lengths = lengths
+        self.avg_doc_length = float(lengths.mean()) if len(texts) else 0.0
+        self.postings = {
+            term: (np.array(rows, dtype=np.int32), np.array(tfs, dtype=np.float32))
+            for term, (rows, tfs) in postings.items()
+        }
+
+    def idf(self, term: str) -> float:
+        df = len(self.postings[term][0]) if term in self.postings else 0
+        return math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every document for a query (zero where no term matches)."""
+        scores = np.zeros(self.doc_count, dtype=np.float32)
+        if not self.doc_count:
+            return scores
+        norm = self.k1 * (1 - self.b + self.b * self.doc_lengths / max(self.avg_doc_length, 1e-9))
+        for term in set(index_terms(query)):
+            if term not in self.postings:
+                continue
+            rows, tfs = self.postings[term]
+            scores[rows] += self.idf(term) * tfs * (self.k1 + 1) / (tfs + norm[rows])
+        return scores
+
+
+def top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Indices and values of the k largest entries in each row, best first."""
+    scores = np.atleast_2d(scores)
+    k = min(k, scores.shape[1])
+    if k == 0:
+        empty = np.zeros((scores.shape[0], 0))
+        return empty.astype(np.int64), empty
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-part_scores, axis=1, kind="stable")
+    return np.take_along_axis(part, order, axis=1), np.take_along_axis(part_scores, order, axis=1)
+
+
+class LocalIndex:
+    """The documents table in memory: a unit-norm float32 embedding matrix plus BM25.
+
+    ``hybrid_search`` reproduces the merge in ``search:hybridSearch``: vector
+    results alone when the best one scores above the threshold, otherwise
+    vector results plus unseen lexical matches, sorted by score.
+    """
+
+    def __init__(self, documents: Sequence[Dict[str, Any]], lexical: str = "bm25",
+                 matrix: Optional[np.ndarray] = None):
+        if lexical not in ("bm25", "substring"):
+            raise ValueError(f"Unknown lexical mode: {lexical}")
+        self.lexical = lexical
+        self.ids = [doc["_id"] for doc in documents]
+        self.names = [doc["name"] for doc in documents]
+        self.texts = [doc["content"] for doc in documents]
+        if matrix is not None:
+            # Unit-length float32 rows used as they are, so a memory-mapped snapshot is never copied
+            self.matrix = matrix
+        elif documents:
+            self.matrix = np.ascontiguousarray(normalize_rows([doc["embedding"] for doc in documents]))
+        else:
+            self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self.bm25 = BM25Index(self.texts)
+        self._lower_texts = [text.lower() for text in self.texts]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dimensions(self) -> int:
+        """Embedding size of the indexed rows (full size for an empty index)."""
+        return self.matrix.shape[1] or FULL_DIMENSIONS
+
+    @classmethod
+    def from_convex(cls, convex: Any, page_size: int = LOAD_PAGE_SIZE, **kwargs) -> "LocalIndex":
+        """Load every row of the documents table from a Convex deployment, a page at a time."""
+        pages = iter_metadata(convex, page_size, include_content=True, include_embedding=True)
+        return cls([doc for page in pages for doc in page], **kwargs)
+
+    @classmethod
+    def from_snapshot(cls, path: Path, **kwargs) -> "LocalIndex":
+        """Load a JSON snapshot written by save_snapshot."""
+        with open(path) as f:
+            return cls(json.load(f), **kwargs)
+
+    def save_snapshot(self, path: Path) -> None:
+        """Write the indexed rows as JSON, in the shape documents:listDocuments returns."""
+        documents = [
+            {"_id": doc_id, "name": name, "content": text, "embedding": vector.tolist()}
+            for doc_id, name, text, vector in zip(self.ids, self.names, self.texts, self.matrix)
+        ]
+        with open(path, "w") as f:
+            json.dump(documents, f)
+
+    def _result(self, row: int, score: float) -> Dict[str, Any]:
+        return {"text": self.texts[row], "id": self.ids[row], "name": self.names[row], "score": float(score)}
+
+    def vector_search(self, query_vectors: Sequence[Sequence[float]], k: int = VECTOR_LIMIT) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k rows by cosine similarity for a batch of query vectors."""
+        queries = normalize_rows(query_vectors)
+        if not len(self):
+            return top_k(np.zeros((len(queries), 0), dtype=np.float32), k)
+        return top_k(queries @ self.matrix.T, k)
+
+    def keyword_search(self, query: str) -> List[Dict[str, Any]]:
+        """Lexical matches for a query, best first, with scores in (0, 1]."""
+        if self.lexical == "substring":
+            # What keywordRetriever falls back to before the lexical index is built
+            needle = query.lower()
+            rows = [row for row, text in enumerate(self._lower_texts) if needle in text]
+            return [self._result(row, 1 - i / len(rows)) for i, row in enumerate(rows)]
+
+        scores = self.bm25.scores(query)
+        matched = np.flatnonzero(scores > 0)
+        if not len(matched):
+            return []
+        order = matched[np.argsort(-scores[matched], kind="stable")][:KEYWORD_LIMIT]
+        best = scores[order[0]]
+        return [self._result(row, scores[row] / best) for row in order]
+
+    def hybrid_search(
+        self,
+        queries: Sequence[str],
+        query_vectors: Sequence[Sequence[float]],
+        limit: int = VECTOR_LIMIT,
+        threshold: float = SEMANTIC_SCORE_THRESHOLD,
+    ) -> List[List[Dict[str, Any]]]:
+        """Answer a batch of queries the way search:hybridSearch does."""
+        rows, scores = self.vector_search(query_vectors, limit)
+        results = []
+        for query, query_rows, query_scores in zip(queries, rows, scores):
+            semantic = [self._result(row, score) for row, score in zip(query_rows, query_scores)]
+            if semantic and semantic[0]["score"] > threshold:
+                results.append(semantic)
+                continue
+            seen = {doc["id"] for doc in semantic}
+            lexical = [doc for doc in self.keyword_search(query) if doc["id"] not in seen]
+            results.append(sorted(semantic + lexical, key=lambda doc: doc["score"], reverse=True))
+        return results
+
+
+def query_embedder(client: Any, cache: Optional[Any] = None,
+                   dimensions: int = FULL_DIMENSIONS) -> Callable[[List[str]], List[List[float]]]:
+    """Batch query embedder using the same model as the Convex search action."""
+    model = QUERY_EMBEDDING_MODEL
+    options = {} if dimensions == FULL_DIMENSIONS else {"dimensions": dimensions}
+    key = embedding_key(model, dimensions)
+
+    def embed(queries: List[str]) -> List[List[float]]:
+        cached = cache.get_many(key, queries) if cache else [None] * len(queries)
+        missing = list(dict.fromkeys(q for q, vector in zip(queries, cached) if vector is None))
+        fetched = {}
+        if missing:
+            response = client.embeddings.create(input=missing, model=model, **options)
+            vectors = [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+            if cache:
+                cache.put_many(key, missing, vectors)
+            fetched = dict(zip(missing, vectors))
+        return [vector.tolist() if vector is not None else fetched[q] for q, vector in zip(queries, cached)]
+    return embed
+
+
+def load_index(path: Path, lexical: str = "bm25") -> LocalIndex:
+    """LocalIndex from a JSON snapshot, a compression.py .npz or a snapshot.py .rbsnap copy."""
+    if path.suffix == ".npz":
+        from compression import load_compressed
+        return load_compressed(path, lexical=lexical)
+    if path.suffix == ".rbsnap":
+        from snapshot import Snapshot
+        return Snapshot(path).local_index(lexical=lexical)
+    return LocalIndex.from_snapshot(path, lexical=lexical)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Run hybridSearch locally against a snapshot of the documents table.")
+    parser.add_argument("queries", nargs="*", help="queries to answer")
+    parser.add_argument("--snapshot", type=Path,
+                        help="JSON snapshot, compression.py .npz or snapshot.py .rbsnap copy to search "
+                             "(default: load from Convex)")
+    parser.add_argument("--export", type=Path, help="write the loaded documents to this JSON snapshot and exit")
+    parser.add_argument("--lexical", choices=["bm25", "substring"], default="bm25",
+                        help="lexical fallback: BM25, or the substring scan keywordRetriever uses")
+    parser.add_argument("--top", type=int, default=5, help="results to print per query")
+    args = parser.parse_args(argv)
+
+    from backends import convex_client, embedding_client
+    from dotenv import load_dotenv
+    load_dotenv(PROJECT_ROOT / ".env")
+
+    if args.snapshot:
+        index = load_index(args.snapshot, lexical=args.lexical)
+    else:
+        index = LocalIndex.from_convex(convex_client(), lexical=args.lexical)
+    print(f"📚 Loaded {len(index)} documents ({index.matrix.nbytes / 1024:.0f} KiB of embeddings)")
+
+    if args.export:
+        index.save_snapshot(args.export)
+        print(f"💾 Wrote snapshot to {args.export}")
+        return
+    if not args.queries:
+        return
+
+    from embedding_cache import EmbeddingCache, configured_cache_path
+    embed = query_embedder(embedding_client(), EmbeddingCache(configured_cache_path()), index.dimensions)
+    for query, results in zip(args.queries, index.hybrid_search(args.queries, embed(args.queries))):
+        print(f"\n🔍 {query}")
+        for i, result in enumerate(results[:args.top]):
+            print(f"{i+1}. {result['name']} ({result['score']:.4f}): {result['text'][:120]}...")
+
+
+if __name__ == "__main__":
+    main()
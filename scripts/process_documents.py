@@ -1,50 +1,73 @@
+import argparse
+import asyncio
+import contextlib
 import os
 from pathlib import Path
-from openai import OpenAI
 from dotenv import load_dotenv
-from convex import ConvexClient
-import docx
 import json
-from typing import List, Dict, Any
-import time
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Iterable, Optional
 from datetime import datetime
-from tqdm import tqdm
-import re
+from async_pipeline import (
+    DEFAULT_REQUESTS_PER_MINUTE, DEFAULT_TOKENS_PER_MINUTE, CachedEmbedder, ConvexStore, IngestPipeline,
+    OpenAIEmbedder, RateLimiter, SourceJob, Turnstile, semantic_chunks_async, with_retries
+)
+from batch_writer import iter_payload_batches
+from backends import (async_embedding_client, convex_client, deployment_name, embedding_client, has_admin_access,
+                      uses_fixtures)
+from build_retrieval_cache import build_retrieval_cache, load_suggested_questions
+from convex_pages import iter_metadata
+from dedup import DEFAULT_DUPLICATE_THRESHOLD, DuplicateIndex, signature_from_hex, signature_to_hex
+from document_loader import block_texts, discover_sources, iter_docx_blocks, parse_file, source_for
+from embedding_cache import FULL_DIMENSIONS, EmbeddingCache, configured_cache_path, embedding_key
+from ingest_journal import IngestJournal, rows_to_roll_back
+from lexical_index import MAX_POSTINGS_PER_BATCH, index_documents, index_terms, rebuild_index, remove_documents
+from ingest_manifest import DEFAULT_MANIFEST_PATH, IngestManifest, content_hash, diff_documents, file_hash
+from profiling import DEFAULT_PROFILE_DIR, Profiler, print_summary
+from request_packer import embed_packed
+from semantic_chunker import iter_sentences
+from snapshot import configured_dimensions
 
 # Get the absolute path to the script's directory
 SCRIPT_DIR = Path(__file__).resolve().parent
 PROJECT_ROOT = SCRIPT_DIR.parent
 
-# Load environment variables
+DATA_DIR = PROJECT_ROOT / "data"
+
+# Load environment variables; the clients themselves are built on first use
+# (see backends.py), so importing this module needs neither credentials nor network
 env_path = PROJECT_ROOT / ".env"
-if not env_path.exists():
-    raise FileNotFoundError(f"Environment file not found at {env_path}")
 load_dotenv(env_path)
 
-# Check for required environment variables
-required_env_vars = ["OPENAI_API_KEY", "NEXT_PUBLIC_CONVEX_URL"]
-missing_vars = [var for var in required_env_vars if not os.getenv(var)]
-if missing_vars:
-    raise ValueError(f"Missing required environment variables: {', '.join(missing_vars)}")
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+# Output size requested from the model; must match EMBEDDING_DIMENSIONS in convex/embeddingConfig.ts
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", FULL_DIMENSIONS))
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Request and token budgets for the embeddings API; override to match your tier
+EMBEDDING_REQUESTS_PER_MINUTE = int(os.getenv("EMBEDDING_REQUESTS_PER_MINUTE", DEFAULT_REQUESTS_PER_MINUTE))
+EMBEDDING_TOKENS_PER_MINUTE = int(os.getenv("EMBEDDING_TOKENS_PER_MINUTE", DEFAULT_TOKENS_PER_MINUTE))
 
-# Initialize Convex client
-convex = ConvexClient(os.getenv("NEXT_PUBLIC_CONVEX_URL"))
+# Embeddings survive between runs, so unchanged documents are not re-embedded
+embedding_cache = EmbeddingCache(configured_cache_path())
+
+# Records what each source was last stored as, for incremental re-ingestion
+MANIFEST_PATH = Path(os.getenv("INGEST_MANIFEST_PATH", DEFAULT_MANIFEST_PATH))
 
 def read_docx(file_path: str) -> Dict[str, Any]:
-    """Read a .docx file and return its content with metadata."""
+    """Read a .docx file, tables included, and return its content with metadata."""
     try:
-        doc = docx.Document(file_path)
-        content = "\n".join([paragraph.text for paragraph in doc.paragraphs])
+        blocks = list(iter_docx_blocks(Path(file_path)))
+        content = "\n".join(block_texts(blocks))
         
         # Extract metadata
         metadata = {
             "file_name": Path(file_path).name,
             "file_size": os.path.getsize(file_path),
             "last_modified": datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat(),
-            "total_paragraphs": len(doc.paragraphs),
+            "total_paragraphs": sum(1 for block in blocks if block["kind"] == "paragraph"),
+            "total_tables": sum(1 for block in blocks if block["kind"] == "table"),
             "total_characters": len(content)
         }
         
@@ -56,111 +79,45 @@ def read_docx(file_path: str) -> Dict[str, Any]:
         print(f"Error reading {file_path}: {str(e)}")
         raise
 
-def get_embedding(text: str) -> List[float]:
-    """Get embedding for a text chunk using OpenAI API."""
-    try:
-        response = client.embeddings.create(
-            input=text,
-            model="text-embedding-3-small"  # Updated to newer model
-        )
-        return response.data[0].embedding
-    except Exception as e:
-        print(f"Error getting embedding: {str(e)}")
-        raise
+def get_embeddings(texts: List[str]) -> List[List[float]]:
+    """Get embeddings for many texts, serving repeats from the on-disk cache.
 
-def calculate_semantic_similarity(text1: str, text2: str) -> float:
-    """Calculate semantic similarity between two text segments using embeddings."""
+    Only texts the cache has never seen for this model are sent to the
+    OpenAI API, packed into as few requests as its input and token limits
+    allow; texts over the per-input limit are split and their pieces averaged.
+    """
     try:
-        # Get embeddings for both texts
-        embedding1 = get_embedding(text1)
-        embedding2 = get_embedding(text2)
-        
-        # Calculate cosine similarity
-        dot_product = sum(a * b for a, b in zip(embedding1, embedding2))
-        magnitude1 = sum(a * a for a in embedding1) ** 0.5
-        magnitude2 = sum(b * b for b in embedding2) ** 0.5
-        
-        if magnitude1 == 0 or magnitude2 == 0:
-            return 0
-        
-        similarity = dot_product / (magnitude1 * magnitude2)
-        return similarity
-    except Exception as e:
-        print(f"Error calculating similarity: {str(e)}")
-        return 0
+        key = embedding_key(EMBEDDING_MODEL, EMBEDDING_DIMENSIONS)
+        options = {} if EMBEDDING_DIMENSIONS == FULL_DIMENSIONS else {"dimensions": EMBEDDING_DIMENSIONS}
+        cached = embedding_cache.get_many(key, texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
 
-def split_into_semantic_chunks(text: str, similarity_threshold: float = 0.7, min_chunk_size: int = 200) -> List[Dict[str, Any]]:
-    """Split text into semantic chunks based on content similarity."""
-    try:
-        # Split text into sentences
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
-        
-        if not sentences:
-            return []
-        
-        chunks = []
-        current_chunk = [sentences[0]]
-        
-        print(f"Processing {len(sentences)} sentences for semantic chunking...")
-        
-        for i in range(1, len(sentences)):
-            current_sentence = sentences[i]
-            
-            # Get the last few sentences from current chunk for comparison
-            comparison_text = ' '.join(current_chunk[-3:]) if len(current_chunk) >= 3 else ' '.join(current_chunk)
-            
-            # Calculate similarity between current sentence and chunk context
-            try:
-                similarity = calculate_semantic_similarity(comparison_text, current_sentence)
-                print(f"Sentence {i+1}/{len(sentences)}: Similarity = {similarity:.3f}")
-                
-                # If similarity is high enough and chunk isn't too long, add to current chunk
-                current_chunk_text = ' '.join(current_chunk)
-                if similarity >= similarity_threshold and len(current_chunk_text) < 2000:
-                    current_chunk.append(current_sentence)
-                else:
-                    # Start new chunk if current chunk meets minimum size
-                    if len(' '.join(current_chunk)) >= min_chunk_size:
-                        chunk_text = ' '.join(current_chunk)
-                        chunks.append({
-                            "content": chunk_text,
-                            "metadata": {
-                                "chunk_index": len(chunks),
-                                "chunk_size": len(chunk_text),
-                                "sentence_count": len(current_chunk),
-                                "avg_similarity": similarity
-                            }
-                        })
-                        current_chunk = [current_sentence]
-                    else:
-                        # If chunk is too small, add sentence anyway
-                        current_chunk.append(current_sentence)
-                        
-            except Exception as e:
-                print(f"Error processing sentence {i}: {str(e)}")
-                # Fallback: just add to current chunk
-                current_chunk.append(current_sentence)
-        
-        # Don't forget the last chunk
-        if current_chunk:
-            chunk_text = ' '.join(current_chunk)
-            chunks.append({
-                "content": chunk_text,
-                "metadata": {
-                    "chunk_index": len(chunks),
-                    "chunk_size": len(chunk_text),
-                    "sentence_count": len(current_chunk)
-                }
-            })
-        
-        print(f"Created {len(chunks)} semantic chunks")
-        return chunks
-        
+        def create(batch: List[str]) -> List[List[float]]:
+            response = embedding_client().embeddings.create(
+                input=batch,
+                model=EMBEDDING_MODEL,
+                **options
+            )
+            # The API may return items out of order; index maps them back
+            return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+        fetched = {}
+        if missing:
+            vectors = embed_packed(missing, create)
+            embedding_cache.put_many(key, missing, vectors)
+            fetched = dict(zip(missing, vectors))
+
+        return [
+            vector.tolist() if vector is not None else fetched[text]
+            for text, vector in zip(texts, cached)
+        ]
     except Exception as e:
-        print(f"Error in semantic chunking: {str(e)}")
-        # Fallback to simple chunking
-        return simple_chunk_fallback(text)
+        print(f"Error getting embeddings: {str(e)}")
+        raise
+
+def get_embedding(text: str) -> List[float]:
+    """Get embedding for a text chunk using OpenAI API."""
+    return get_embeddings([text])[0]
 
 def simple_chunk_fallback(text: str, chunk_size: int = 1000) -> List[Dict[str, Any]]:
     """Fallback to simple chunking if semantic chunking fails."""
@@ -203,97 +160,524 @@ def simple_chunk_fallback(text: str, chunk_size: int = 1000) -> List[Dict[str, A
     
     return chunks
 
-def process_documents():
-    """Process all documents using semantic chunking and store them in the database."""
+def parse_source(job: SourceJob, executor: ProcessPoolExecutor, journal: IngestJournal) -> None:
+    """Pipeline parse stage: read the source file's blocks in a worker process."""
+    print(f"\n📄 Processing {job.source['label']}: {job.path.name}")
+    blocks = executor.submit(parse_file, job.path).result()
+    job.context["blocks"] = blocks
+    job.text = "\n".join(block_texts(blocks))
+    journal.record("parsed", source=job.source["name"], characters=len(job.text))
+    print(f"✅ {job.source['label'].capitalize()} loaded: {len(job.text)} characters in {len(blocks)} blocks")
+
+async def plan_source(job: SourceJob, embedder: Any, profiler: Profiler,
+                      duplicates: Optional[DuplicateIndex], claims: Optional[Turnstile],
+                      journal: IngestJournal) -> None:
+    """Pipeline chunk stage: chunk the text and diff it against the stored rows.
+
+    The whole file is in memory by now: its blocks are split into a list
+    of sentences before chunking. Chunks that repeat one already claimed by
+    any source are merged into it instead of being embedded again. Sources
+    claim their chunks through ``claims`` in source order, whichever
+    finishes chunking first, so the same copy stays canonical from run to
+    run. Only chunks whose text changed are queued for embedding and
+    storage, less any a resumed run already stored.
+    """
+    name = job.source["name"]
+    if not job.text.strip():
+        if claims is not None:
+            async with claims.turn(job.sequence):
+                pass  # Nothing to claim, but later sources wait for this turn
+        return
+
+    print(f"🧠 Creating semantic chunks for {job.path.name}...")
     try:
-        # Get the absolute paths to the documents
-        documents_dir = PROJECT_ROOT / "data"
-        resume_path = documents_dir / "EdaTopuz_Resume 2025.docx"
-        suggested_answers_path = documents_dir / "suggested_answers.docx"
-        
+        with profiler.span("sentence_split", "compute"):
+            sentences = list(iter_sentences(block_texts(job.context.pop("blocks"))))
+        chunks = await semantic_chunks_async(sentences, embedder, profiler=profiler)
+        print(f"Created {len(chunks)} semantic chunks")
+    except Exception as e:
+        print(f"Error in semantic chunking: {str(e)}")
+        chunks = simple_chunk_fallback(job.text)
+
+    # Chunk numbers are kept when a duplicate is dropped, so row names stay stable
+    planned = [(name, job.text)]
+    merged: Dict[str, Dict[str, Any]] = {}
+    async with claims.turn(job.sequence) if claims is not None else contextlib.nullcontext():
+        with profiler.span("dedup", "compute"):
+            for i, chunk in enumerate(chunks):
+                row_name = f"{name}_semantic_chunk_{i}"
+                match = duplicates.claim(row_name, chunk["content"]) if duplicates is not None else None
+                if match:
+                    merged[row_name] = {"into": match[0], "similarity": round(match[1], 3),
+                                        "content_hash": content_hash(chunk["content"])}
+                else:
+                    planned.append((row_name, chunk["content"]))
+    if merged:
+        profiler.count("duplicate_chunks", len(merged))
+        print(f"🧬 {job.path.name}: merged {len(merged)} duplicate chunks")
+        for row_name, row in merged.items():
+            print(f"   {row_name} -> {row['into']} (similarity {row['similarity']:.2f})")
+    job.context["merged"] = merged
+    if duplicates is not None:
+        job.context["signatures"] = {
+            row_name: signature_to_hex(duplicates.signatures[row_name])
+            for row_name, _ in planned[1:]
+        }
+
+    stored = job.context["entry"]["documents"]
+    if job.context["reembed"]:
+        # Vectors of the old size cannot be kept: insert everything, retire all old rows
+        diff = diff_documents({}, planned)
+        diff["delete"] = [row["id"] for row in stored.values()]
+    else:
+        diff = diff_documents(stored, planned)
+    print(f"🔀 {job.path.name}: {len(diff['insert'])} new, {len(diff['keep'])} unchanged, "
+          f"{len(diff['delete'])} removed rows")
+    job.rows = diff["insert"]
+    job.context["diff"] = diff
+
+    resumed = dict(job.context.get("resumed", {}))
+    if resumed:
+        # Rows stored before the interruption need neither embedding nor uploading again
+        job.rows = []
+        for row_name, row_content in diff["insert"]:
+            row = resumed.get(row_name)
+            if row and row["content_hash"] == content_hash(row_content):
+                job.stored[row_name] = resumed.pop(row_name)["id"]
+            else:
+                job.rows.append((row_name, row_content))
+        # Anything the new plan no longer produces goes with the outdated rows
+        diff["delete"].extend(row["id"] for row in resumed.values())
+        print(f"♻️  {job.path.name}: reusing {len(job.stored)} rows stored before the interruption")
+    journal.record("planned", source=name, file_hash=job.context["file_hash"], rows=len(job.rows))
+
+    if job.context.get("swap") and job.rows:
+        # Embed here rather than in the pipeline, so finalize can write the rows in one swap
+        texts = [row_content for _, row_content in job.rows]
+
+        async def call():
+            with profiler.span("embed", "api", texts=len(texts)):
+                return await embedder.embed(texts)
+
+        job.context["swap_rows"] = [
+            {"name": row_name, "content": row_content, "embedding": vector}
+            for (row_name, row_content), vector in zip(job.rows, await with_retries(call))
+        ]
+        job.rows = []
+
+def swap_source_rows(job: SourceJob, diff: Dict[str, List[Any]], profiler: Profiler, journal: IngestJournal) -> bool:
+    """Write a source's new rows with their postings, renames and deletions
+    in one documents:swapRows transaction; returns False, having only stored
+    the rows, when they don't fit in one mutation."""
+    rows = job.context.pop("swap_rows", [])
+    postings = sum(len(set(index_terms(row["content"]))) for row in rows)
+    if len(list(iter_payload_batches(rows))) > 1 or postings > MAX_POSTINGS_PER_BATCH:
+        # Too big for one transaction: store them ahead, and retire the old rows after as usual
+        for batch in iter_payload_batches(rows):
+            journal.record("storing", names=[row["name"] for row in batch])
+            with profiler.span("store_batch", "api", documents=len(batch)):
+                ids = convex_client().mutation("documents:storeBatch", {"documents": batch})
+            profiler.count("convex_mutations")
+            journal.record("stored", rows=[
+                {"source": job.source["name"], "name": row["name"], "id": doc_id,
+                 "content_hash": content_hash(row["content"])}
+                for row, doc_id in zip(batch, ids)
+            ])
+            job.stored.update((row["name"], doc_id) for row, doc_id in zip(batch, ids))
+        job.context["swapped"] = len(rows)
+        return False
+
+    already_deleted = journal.deleted()
+    doomed = [row_id for row_id in diff["delete"] if row_id not in already_deleted]
+    if not rows and not diff["rename"] and not doomed:
+        return True
+    journal.record("storing", names=[row["name"] for row in rows])
+    with profiler.span("convex_swap", "api", documents=len(rows)):
+        ids = convex_client().mutation("documents:swapRows", {
+            "insert": rows,
+            "rename": [{"id": row_id, "name": new_name} for row_id, new_name in diff["rename"]],
+            "deleteIds": doomed,
+        })
+    profiler.count("convex_mutations")
+    journal.record("stored", rows=[
+        {"source": job.source["name"], "name": row["name"], "id": doc_id, "content_hash": content_hash(row["content"])}
+        for row, doc_id in zip(rows, ids)
+    ])
+    for row_id in doomed:
+        journal.record("deleted", id=row_id)
+    job.stored.update((row["name"], doc_id) for row, doc_id in zip(rows, ids))
+    job.context["swapped"] = len(rows)
+    print(f"🔁 {job.path.name}: swapped in {len(rows)} rows, renamed {len(diff['rename'])}, "
+          f"removed {len(doomed)} in one transaction")
+    return True
+
+def finalize_source(job: SourceJob, manifest: IngestManifest, profiler: Profiler, journal: IngestJournal,
+                    index_lexical: bool = True) -> None:
+    """Pipeline completion: index the new rows for keyword search and retire
+    outdated rows once the new ones are stored.
+
+    New rows are already in place when this runs, so the source never
+    disappears from search while it is being refreshed. Sources planned
+    with ``swap`` have not been stored yet; their change is applied here in
+    a single transaction, so search never sees old and new rows together.
+    """
+    diff = job.context.get("diff")
+    if diff is None:
+        return
+
+    swapped = job.context.get("swap", False) and swap_source_rows(job, diff, profiler, journal)
+    if swapped:
+        # swapRows already indexed the new rows and dropped the deleted rows' postings
+        diff = {**diff, "insert": [], "rename": [], "delete": []}
+
+    for row_id, new_name in diff["rename"]:
+        with profiler.span("convex_rename", "api"):
+            convex_client().mutation("documents:rename", {"id": row_id, "name": new_name})
+        profiler.count("convex_mutations")
+
+    if index_lexical and diff["insert"]:
+        with profiler.span("lexical_index", "api"):
+            index_documents(convex_client(), [(job.stored[name], content) for name, content in diff["insert"]])
+        profiler.count("convex_mutations")
+
+    already_deleted = journal.deleted()
+    if index_lexical and diff["delete"]:
+        with profiler.span("lexical_index", "api"):
+            remove_documents(convex_client(), [row_id for row_id in diff["delete"] if row_id not in already_deleted])
+    for row_id in diff["delete"]:
+        if row_id in already_deleted:
+            continue
+        with profiler.span("convex_delete", "api"):
+            convex_client().mutation("documents:deleteDocument", {"id": row_id})
+        profiler.count("convex_mutations")
+        journal.record("deleted", id=row_id)
+    if diff["delete"]:
+        print(f"🗑️  Deleted {len(diff['delete'])} outdated rows from {job.path.name}")
+
+    diff = job.context["diff"]
+    documents = {row_name: {"id": row_id, "content_hash": digest} for row_name, row_id, digest in diff["keep"]}
+    for row_name, row_content in diff["insert"]:
+        documents[row_name] = {"id": job.stored[row_name], "content_hash": content_hash(row_content)}
+    for row_name, signature in job.context.get("signatures", {}).items():
+        documents[row_name]["minhash"] = signature
+    manifest.set_source(job.source["name"], job.path.name, job.context["file_hash"], documents,
+                        job.context.get("merged"))
+    manifest.save()
+    journal.record("finalized", source=job.source["name"], file_hash=job.context["file_hash"])
+    print(f"✅ {job.path.name}: stored {len(diff['insert'])} rows")
+
+def recover_journal(convex: Any, journal: IngestJournal, manifest: IngestManifest, hashes: Dict[str, str],
+                    resume: bool) -> Dict[str, Dict[str, Dict[str, str]]]:
+    """Clean up after an interrupted run; returns, per source, the stored rows to reuse.
+
+    Writes that were sent but never confirmed have no recorded ID, so they
+    are found by name and deleted. Without ``resume`` every row the run
+    stored is rolled back as well; with it, rows of sources whose file is
+    unchanged are handed to plan_source instead.
+    """
+    keep = hashes if resume else {}
+    doomed = rows_to_roll_back(journal, keep)
+    unconfirmed = journal.unconfirmed_names()
+    if unconfirmed:
+        known = manifest.row_ids() | journal.known_ids()
+        doomed += [doc["_id"] for page in iter_metadata(convex) for doc in page
+                   if doc["name"] in unconfirmed and doc["_id"] not in known]
+    # Re-indexed rows have postings too; rows never indexed are skipped
+    remove_documents(convex, doomed)
+    for row_id in doomed:
+        convex.mutation("documents:deleteDocument", {"id": row_id})
+        journal.record("deleted", id=row_id)
+    if doomed:
+        print(f"🧹 Removed {len(doomed)} rows left behind by the interrupted ingestion")
+
+    planned = journal.planned()
+    return {
+        source: rows for source, rows in journal.pending_rows().items()
+        if resume and planned.get(source) == hashes.get(source)
+    }
+
+def retire_source(convex: Any, name: str, manifest: IngestManifest, journal: IngestJournal) -> int:
+    """Remove every row of a source whose file was deleted, in one transaction; returns rows removed."""
+    ids = [row["id"] for row in manifest.source(name)["documents"].values()]
+    if ids:
+        convex.mutation("documents:swapRows", {"insert": [], "rename": [], "deleteIds": ids})
+        for row_id in ids:
+            journal.record("deleted", id=row_id)
+    manifest.remove_source(name)
+    manifest.save()
+    print(f"🗑️  {name}: file deleted, removed its {len(ids)} rows")
+    return len(ids)
+
+def process_documents(documents_dir: Path = DATA_DIR, full: bool = False, concurrency: int = 4,
+                      workers: Optional[int] = None, dimensions: int = EMBEDDING_DIMENSIONS,
+                      profile: Optional[Path] = None, dedup: bool = True,
+                      dedup_threshold: float = DEFAULT_DUPLICATE_THRESHOLD, retrieval_cache: bool = True,
+                      resume: bool = False, only: Optional[Iterable[Path]] = None, swap: bool = False):
+    """Process all documents using semantic chunking and sync them to the database.
+
+    A manifest of what was stored last time limits each run to the rows that
+    actually changed; it is checked against the table's IDs first, so rows
+    deleted behind its back are stored again. With ``full`` every source is
+    re-chunked and diffed even when its file hash is unchanged. Sources flow through a concurrent
+    parse -> chunk -> embed -> store pipeline paced by a token-bucket limiter,
+    with files parsed across ``workers`` processes.
+
+    ``dimensions`` below 1536 asks text-embedding-3-small for shorter
+    vectors; it must match EMBEDDING_DIMENSIONS in convex/embeddingConfig.ts
+    or the run stops before embedding anything. Switching sizes re-embeds
+    every row, since stored vectors of the old size no longer match the
+    vector index.
+
+    Unless ``dedup`` is off, exact and near-duplicate chunks (MinHash/LSH,
+    estimated Jaccard >= ``dedup_threshold``) are merged into the first copy
+    before embedding, across sources and against chunks stored earlier. The
+    manifest records which row each merged chunk went into.
+
+    Progress is written ahead to a journal (see ingest_journal.py). After an
+    interrupted run, ``resume`` picks up from the last stored chunk: finished
+    sources are skipped and stored rows reused, so nothing is embedded or
+    uploaded twice. Without it, the interrupted run's rows are rolled back
+    first.
+
+    ``only`` limits the run to those files (as watch.py does after an edit),
+    plus any sources whose merged chunks point into them; a listed file that
+    no longer exists has its rows removed. With ``swap``, each source's new,
+    renamed and outdated rows change in one transaction instead of new rows
+    appearing a batch at a time ahead of the deletions.
+
+    Whenever rows were added or removed, the precomputed retrieval results
+    for the suggested questions are rebuilt (skip with ``retrieval_cache``).
+
+    With ``profile`` set to a directory, every stage is timed and a JSON
+    summary plus a Chrome trace (chrome://tracing, ui.perfetto.dev) of the
+    run are written there.
+    """
+    profiler = Profiler(enabled=profile is not None)
+    try:
+        # Vectors of any other size are stored but never found by the vector index
+        expected = configured_dimensions()
+        if expected and dimensions != expected:
+            raise ValueError(f"Embedding at {dimensions} dimensions, but convex/embeddingConfig.ts expects "
+                             f"{expected}; set EMBEDDING_DIMENSIONS (or --dimensions) to match it")
+
+        with profiler.span("discover"):
+            sources = discover_sources(documents_dir)
+
         print(f"\n🧠 Starting document processing with SEMANTIC CHUNKING")
         print(f"📁 Looking for documents in {documents_dir}")
-        
-        # Process resume
-        if resume_path.exists():
-            print(f"\n📄 Processing resume: {resume_path.name}")
-            resume_data = read_docx(str(resume_path))
-            resume_content = resume_data["content"]
-            
-            if resume_content.strip():
-                print(f"✅ Resume loaded: {len(resume_content)} characters")
-                
-                # Store full document
-                resume_embedding = get_embedding(resume_content)
-                resume_id = convex.mutation("documents:store", {
-                    "name": "resume",
-                    "content": resume_content,
-                    "embedding": resume_embedding
-                })
-                print(f"📝 Stored full resume with ID: {resume_id}")
-                
-                # Create semantic chunks
-                print("🧠 Creating semantic chunks...")
-                semantic_chunks = split_into_semantic_chunks(resume_content)
-                
-                # Store semantic chunks
-                for i, chunk in enumerate(semantic_chunks):
-                    print(f"💾 Processing semantic chunk {i+1}/{len(semantic_chunks)}")
-                    
-                    embedding = get_embedding(chunk["content"])
-                    result = convex.mutation("documents:store", {
-                        "name": f"resume_semantic_chunk_{i}",
-                        "content": chunk["content"],
-                        "embedding": embedding
-                    })
-                    
-                    print(f"✅ Stored semantic chunk {i+1} (size: {chunk['metadata']['chunk_size']} chars)")
-                    time.sleep(0.5)  # Rate limiting
-        
-        # Process suggested answers
-        if suggested_answers_path.exists():
-            print(f"\n📄 Processing suggested answers: {suggested_answers_path.name}")
-            answers_data = read_docx(str(suggested_answers_path))
-            answers_content = answers_data["content"]
-            
-            if answers_content.strip():
-                print(f"✅ Suggested answers loaded: {len(answers_content)} characters")
-                
-                # Store full document
-                answers_embedding = get_embedding(answers_content)
-                answers_id = convex.mutation("documents:store", {
-                    "name": "suggested_answers",
-                    "content": answers_content,
-                    "embedding": answers_embedding
-                })
-                print(f"📝 Stored full suggested answers with ID: {answers_id}")
-                
-                # Create semantic chunks
-                print("🧠 Creating semantic chunks...")
-                semantic_chunks = split_into_semantic_chunks(answers_content)
-                
-                # Store semantic chunks
-                for i, chunk in enumerate(semantic_chunks):
-                    print(f"💾 Processing semantic chunk {i+1}/{len(semantic_chunks)}")
-                    
-                    embedding = get_embedding(chunk["content"])
-                    result = convex.mutation("documents:store", {
-                        "name": f"suggested_answers_semantic_chunk_{i}",
-                        "content": chunk["content"],
-                        "embedding": embedding
-                    })
-                    
-                    print(f"✅ Stored semantic chunk {i+1} (size: {chunk['metadata']['chunk_size']} chars)")
-                    time.sleep(0.5)  # Rate limiting
+
+        convex = convex_client()
+        cache, manifest_path = embedding_cache, MANIFEST_PATH
+        if uses_fixtures():
+            # Start from nothing, so a replay makes exactly the calls its recording made
+            cache = EmbeddingCache(":memory:")
+            manifest_path = Path(tempfile.mkdtemp()) / "ingest_manifest.json"
+        # The module-level cache outlives a run (watch.py ingests again and again); report this run only
+        cache.reset_counters()
+        manifest = IngestManifest(deployment_name(), manifest_path)
+        if manifest.is_empty:
+            # Reuse rows from an earlier full load instead of duplicating them
+            with profiler.span("convex_list", "api"):
+                # Page through names and text only; the embeddings are not needed to diff
+                stored_documents = [doc for page in iter_metadata(convex, include_content=True) for doc in page]
+            adopted = manifest.adopt(stored_documents, [source["name"] for source, _ in sources])
+            if adopted:
+                print(f"📋 Adopted {adopted} existing rows into the ingestion manifest")
+
+        key = embedding_key(EMBEDDING_MODEL, dimensions)
+        reembed = bool(manifest.embedding) and manifest.embedding != key
+        if reembed:
+            print(f"📐 Stored rows use {manifest.embedding}; re-embedding everything with {key}")
+
+        hashes = {}
+        for source, path in sources:
+            with profiler.span("file_hash", source=path.name):
+                hashes[source["name"]] = file_hash(path)
+
+        journal = IngestJournal.for_deployment(manifest.deployment, manifest_path.parent)
+        if journal.interrupted and resume and journal.started_with().get("embedding") != key:
+            print(f"⚠️  The interrupted run used {journal.started_with().get('embedding')}, not {key}; "
+                  f"rolling it back instead of resuming")
+            resume = False
+        elif resume and not journal.interrupted:
+            print("ℹ️  No interrupted ingestion to resume; running normally")
+        finished = {
+            name for name, digest in journal.finalized().items() if resume and hashes.get(name) == digest
+        }
+        journal.open()
+        resumed = {}
+        if journal.interrupted:
+            print(f"↩️  {'Resuming' if resume else 'Rolling back'} an interrupted ingestion "
+                  f"({len(journal.finalized())} sources were finished)")
+            with profiler.span("journal_recovery", "api"):
+                resumed = recover_journal(convex, journal, manifest, hashes, resume)
+        if not resume:
+            journal.restart()
+        journal.record("begin", embedding=key, data_dir=str(documents_dir), resume=resume)
+
+        # The table may have been cleared or edited behind the manifest's back
+        with profiler.span("convex_list", "api"):
+            stored_ids = {doc["_id"] for page in iter_metadata(convex) for doc in page}
+        for name, count in sorted(manifest.drop_missing(stored_ids).items()):
+            print(f"⚠️  {count} rows recorded for {name} are missing from the table; re-ingesting it")
+
+        only_paths = None if only is None else {Path(path).resolve() for path in only}
+        removed = set()
+        if only_paths is not None:
+            on_disk = {path.resolve() for _, path in sources}
+            removed = {
+                source_for(path, documents_dir)["name"] for path in only_paths
+                if path not in on_disk and manifest.source(source_for(path, documents_dir)["name"])["documents"]
+            }
+
+        selected = {
+            source["name"] for source, path in sources
+            if source["name"] not in finished and (only_paths is None or path.resolve() in only_paths) and (
+                full or reembed or not manifest.source(source["name"])["documents"]
+                or manifest.source(source["name"])["file_hash"] != hashes[source["name"]]
+            )
+        }
+        if dedup:
+            # Re-plan sources whose merged chunks point into rows about to change
+            while dependents := (manifest.merged_into(selected | removed) & set(hashes)) - finished - selected:
+                selected |= dependents
+
+        for name in sorted(removed):
+            retire_source(convex, name, manifest, journal)
+
+        # Until the lexical index exists, keyword search scans rows and there is nothing to update
+        with profiler.span("lexical_stats", "api"):
+            lexical_built = convex.query("lexicalIndex:stats") is not None
+
+        duplicates = DuplicateIndex(dedup_threshold) if dedup else None
+        claims = Turnstile() if dedup else None
+        if duplicates is not None:
+            for row_name, signature in manifest.signatures(exclude=selected):
+                duplicates.add(row_name, signature_from_hex(signature))
+
+        jobs = []
+        for source, path in sources:
+            if source["name"] not in selected:
+                if only_paths is None or path.resolve() in only_paths:
+                    print(f"\n⏭️  {path.name} is unchanged since the last ingestion, skipping")
+                continue
+            jobs.append(SourceJob(source, path, context={
+                "entry": manifest.source(source["name"]), "file_hash": hashes[source["name"]], "reembed": reembed,
+                "resumed": resumed.get(source["name"], {}), "swap": swap,
+            }))
+
+        limiter = RateLimiter(EMBEDDING_REQUESTS_PER_MINUTE, EMBEDDING_TOKENS_PER_MINUTE)
+        # Cache hits never reach the limiter; each packed request is charged once
+        embedder = CachedEmbedder(
+            OpenAIEmbedder(async_embedding_client(), EMBEDDING_MODEL,
+                           None if dimensions == FULL_DIMENSIONS else dimensions, profiler, limiter=limiter),
+            cache, key)
+        workers = workers or os.cpu_count() or 1
+        executor = ProcessPoolExecutor(max_workers=workers)
+        pipeline = IngestPipeline(
+            lambda job: parse_source(job, executor, journal),
+            lambda job: plan_source(job, embedder, profiler, duplicates, claims, journal),
+            lambda job: finalize_source(job, manifest, profiler, journal, lexical_built),
+            embedder,
+            ConvexStore(convex),
+            limiter,
+            parse_workers=workers,
+            embed_workers=concurrency,
+            store_workers=concurrency,
+            profiler=profiler,
+            on_storing=lambda rows: journal.record("storing", names=[name for _, name in rows]),
+            # A batch can hold rows of several sources
+            on_stored=lambda rows: journal.record("stored", rows=[
+                {"source": job.source["name"], "name": name, "id": doc_id, "content_hash": content_hash(content)}
+                for job, name, content, doc_id in rows
+            ]),
+        )
+        try:
+            stats = asyncio.run(pipeline.run(jobs))
+        finally:
+            executor.shutdown()
+            journal.close()
+        # Swapped sources were embedded and written outside the pipeline's own stages
+        stats["stored"] += sum(job.context.get("swapped", 0) for job in jobs)
+        # Requests actually sent: cache hits cost none, and the packer may split one call into several
+        stats["embed_requests"] = embedder.inner.requests
+        manifest.embedding = key
+        manifest.save()
+        journal.complete()
+        if not lexical_built:
+            print("\n🔎 Building the lexical index for keyword search...")
+            with profiler.span("lexical_index", "api"):
+                print(f"✅ Indexed {rebuild_index(convex)} documents")
         
         print("\n🎉 SUCCESS! Documents processed with TRUE semantic chunking!")
         print("🧠 Chunks are now created based on semantic similarity, not arbitrary size!")
         print("📊 Each chunk groups semantically related content together")
+        print(f"⏱️  Stored {stats['stored']} rows from {stats['sources']} sources in {stats['elapsed_seconds']:.1f}s "
+              f"({stats['embed_requests']} embedding requests, {stats['store_requests']} batch writes, "
+              f"{stats['retries']} retries, "
+              f"{stats['rate_limit_wait_seconds']:.1f}s waiting on rate limits)")
+        merged_count = sum(len(job.context.get("merged", {})) for job in jobs)
+        if merged_count:
+            print(f"🧬 Merged {merged_count} duplicate chunks instead of embedding and storing them")
+
+        cache_stats = cache.stats()
+        print(f"📦 Embedding cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+              f"({cache_stats['hit_rate']:.0%} hit rate)")
+
+        changed = removed or any(
+            job.context.get("diff", {}).get("insert") or job.context.get("diff", {}).get("delete") for job in jobs
+        )
+        if retrieval_cache and changed and not has_admin_access():
+            print("\n⚠️  CONVEX_DEPLOY_KEY is not set, so the retrieval cache was not rebuilt; "
+                  "run build_retrieval_cache.py once it is")
+        elif retrieval_cache and changed:
+            print("\n💡 Rebuilding the retrieval cache for suggested questions...")
+            with profiler.span("retrieval_cache", "api"):
+                build_retrieval_cache(convex_client(admin=True), load_suggested_questions())
+
+        if profile is not None:
+            profiler.count("embedding_cache_hits", cache_stats["hits"])
+            profiler.count("embedding_cache_misses", cache_stats["misses"])
+            profiler.count("rate_limit_wait_seconds", stats["rate_limit_wait_seconds"])
+            summary_path = profiler.write(profile, extra={
+                "params": {"data_dir": str(documents_dir), "full": full, "concurrency": concurrency,
+                           "workers": workers, "dimensions": dimensions},
+                "pipeline": stats,
+            })
+            print_summary(json.loads(summary_path.read_text()))
+            print(f"\n💾 Wrote profile to {summary_path} (trace: {summary_path.with_suffix('.trace.json').name})")
         
     except Exception as e:
         print(f"❌ Error: {str(e)}")
         raise
 
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Chunk, embed and store the documents in a directory.")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR,
+                        help="directory of .docx, .md, .txt and .pdf files (default: data/)")
+    parser.add_argument("--full", action="store_true",
+                        help="re-chunk every source even if its file is unchanged")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="concurrent embedding requests and batch writes")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes used to parse files (default: one per core)")
+    parser.add_argument("--dimensions", type=int, default=EMBEDDING_DIMENSIONS,
+                        help="embedding size, e.g. 256 or 512; must match convex/embeddingConfig.ts")
+    parser.add_argument("--no-dedup", action="store_true",
+                        help="embed every chunk, even exact or near duplicates of another")
+    parser.add_argument("--dedup-threshold", type=float, default=DEFAULT_DUPLICATE_THRESHOLD,
+                        help="estimated Jaccard similarity at which chunks are merged")
+    parser.add_argument("--no-retrieval-cache", action="store_true",
+                        help="don't rebuild the suggested-question retrieval cache after ingesting")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue an interrupted run, reusing the rows it already stored")
+    parser.add_argument("--profile", type=Path, nargs="?", const=DEFAULT_PROFILE_DIR,
+                        help="time every stage and write a JSON summary and Chrome trace (default dir: profiles/)")
+    args = parser.parse_args(argv)
+    process_documents(args.data_dir, full=args.full, concurrency=args.concurrency, workers=args.workers,
+                      dimensions=args.dimensions, profile=args.profile, dedup=not args.no_dedup,
+                      dedup_threshold=args.dedup_threshold, retrieval_cache=not args.no_retrieval_cache,
+                      resume=args.resume)
+
 if __name__ == "__main__":
-    process_documents()
-    
\ No newline at end of file
+    main()
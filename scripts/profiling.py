@@ -0,0 +1,183 @@
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Get the absolute path to the script's directory
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+DEFAULT_PROFILE_DIR = PROJECT_ROOT / "profiles"
+
+_DISABLED = nullcontext()
+
+
+def _lane() -> str:
+    """Trace row for the caller: its asyncio task inside the event loop, else its thread."""
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return task.get_name() if task is not None else threading.current_thread().name
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "category", "args", "lane", "started")
+
+    def __init__(self, profiler: "Profiler", name: str, category: str, args: Dict[str, Any]):
+        self.profiler = profiler
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self) -> "_Span":
+        self.lane = _lane()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.profiler._record(self.name, self.category, self.lane, self.started, time.perf_counter(), self.args)
+
+
+class Profiler:
+    """Wall-clock spans and counters for one ingestion run.
+
+    ``span(name)`` times a block; ``count(name, n)`` bumps a counter. Both are
+    safe from worker threads and asyncio tasks. A disabled profiler hands out
+    a shared no-op context, so instrumented code costs next to nothing when
+    profiling is off.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.counters: Dict[str, float] = {}
+        self._events: List[tuple] = []
+        self._lock = threading.Lock()
+
+    def span(self, name: str, category: str = "stage", **args: Any):
+        if not self.enabled:
+            return _DISABLED
+        return _Span(self, name, category, args)
+
+    def count(self, name: str, amount: float = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def _record(self, name: str, category: str, lane: str, started: float, ended: float, args: Dict[str, Any]) -> None:
+        with self._lock:
+            self._events.append((name, category, lane, started, ended, args))
+
+    def summary(self) -> Dict[str, Any]:
+        """Per-span call counts and busy time, plus counters.
+
+        Busy time adds up across concurrent workers, so a stage's share of the
+        wall clock can exceed 100% when it runs in parallel.
+        """
+        wall = time.perf_counter() - self.started
+        stages: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            events = list(self._events)
+            counters = dict(self.counters)
+        for name, category, _, started, ended, _ in events:
+            entry = stages.setdefault(name, {"category": category, "calls": 0, "busy_seconds": 0.0, "max_ms": 0.0})
+            duration = ended - started
+            entry["calls"] += 1
+            entry["busy_seconds"] += duration
+            entry["max_ms"] = max(entry["max_ms"], duration * 1000)
+        for entry in stages.values():
+            entry["mean_ms"] = entry["busy_seconds"] * 1000 / entry["calls"]
+            entry["share_of_wall"] = entry["busy_seconds"] / wall if wall else 0.0
+        return {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "wall_seconds": wall,
+            "stages": dict(sorted(stages.items(), key=lambda item: -item[1]["busy_seconds"])),
+            "counters": counters,
+        }
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Events in the Chrome trace format (chrome://tracing, Perfetto)."""
+        pid = os.getpid()
+        lanes: Dict[str, int] = {}
+        events = []
+        with self._lock:
+            recorded = list(self._events)
+        for name, category, lane, started, ended, args in recorded:
+            tid = lanes.setdefault(lane, len(lanes) + 1)
+            events.append({
+                "name": name, "cat": category, "ph": "X", "pid": pid, "tid": tid,
+                "ts": (started - self.started) * 1e6, "dur": (ended - started) * 1e6, "args": args,
+            })
+        events += [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": lane}}
+            for lane, tid in lanes.items()
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, directory: Path = DEFAULT_PROFILE_DIR, prefix: str = "ingest",
+              extra: Optional[Dict[str, Any]] = None) -> Path:
+        """Write <prefix>-<timestamp>.json (summary) and .trace.json; returns the summary path."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        stem = f"{prefix}-{datetime.now():%Y%m%d-%H%M%S}"
+        summary = self.summary()
+        if extra:
+            summary.update(extra)
+        summary_path = directory / f"{stem}.json"
+        summary_path.write_text(json.dumps(summary, indent=2) + "\n")
+        (directory / f"{stem}.trace.json").write_text(json.dumps(self.chrome_trace()))
+        return summary_path
+
+
+def print_summary(summary: Dict[str, Any]) -> None:
+    print(f"\n⏱️  PROFILE ({summary['wall_seconds']:.2f}s wall)")
+    print("=" * 60)
+    print(f"{'stage':<22}{'calls':>7}{'busy s':>10}{'mean ms':>10}{'% wall':>9}")
+    for name, entry in summary["stages"].items():
+        print(f"{name:<22}{entry['calls']:>7}{entry['busy_seconds']:>10.3f}{entry['mean_ms']:>10.1f}"
+              f"{entry['share_of_wall'] * 100:>8.0f}%")
+    if summary["counters"]:
+        print("-" * 60)
+        for name, value in sorted(summary["counters"].items()):
+            print(f"{name:<22}{value:>17,.0f}")
+
+
+def compare_summaries(baseline: Dict[str, Any], candidate: Dict[str, Any]) -> None:
+    """Print busy time and counter deltas between two saved profiles."""
+    rows = [("wall_seconds", baseline["wall_seconds"], candidate["wall_seconds"])]
+    for name in dict.fromkeys([*baseline["stages"], *candidate["stages"]]):
+        rows.append((f"{name} (s)", baseline["stages"].get(name, {}).get("busy_seconds", 0.0),
+                     candidate["stages"].get(name, {}).get("busy_seconds", 0.0)))
+    for name in dict.fromkeys([*baseline["counters"], *candidate["counters"]]):
+        rows.append((name, baseline["counters"].get(name, 0), candidate["counters"].get(name, 0)))
+    print(f"{'metric':<26}{'baseline':>12}{'candidate':>12}{'delta':>12}")
+    for metric, old, new in rows:
+        print(f"{metric:<26}{old:>12.3f}{new:>12.3f}{new - old:>+12.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show or compare ingestion profiles written by --profile.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    show = commands.add_parser("show", help="print a saved profile summary")
+    show.add_argument("summary", type=Path)
+    compare = commands.add_parser("compare", help="diff two saved profile summaries")
+    compare.add_argument("baseline", type=Path)
+    compare.add_argument("candidate", type=Path)
+    args = parser.parse_args()
+
+    if args.command == "show":
+        print_summary(json.loads(args.summary.read_text()))
+    else:
+        compare_summaries(json.loads(args.baseline.read_text()), json.loads(args.candidate.read_text()))
+
+
+if __name__ == "__main__":
+    main()
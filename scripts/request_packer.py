@@ -0,0 +1,193 @@
+import re
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Limits of the OpenAI embeddings endpoint for the text-embedding-3 and ada-002 models
+MAX_INPUTS_PER_REQUEST = 2048
+MAX_TOKENS_PER_INPUT = 8191
+MAX_TOKENS_PER_REQUEST = 300_000
+
+# Encoding used by text-embedding-3-small, text-embedding-3-large and ada-002
+TOKEN_ENCODING = "cl100k_base"
+
+# Line breaks, then sentence ends: the places an oversize input is cut first
+_SEGMENT_PATTERN = re.compile(r"(?<=\n)|(?<=[.!?])\s+")
+
+
+class TokenCounter:
+    """Token counts for embedding inputs.
+
+    Exact when the optional tiktoken package (and its encoding file) is
+    available; otherwise a byte-based estimate that errs high, so inputs are
+    split a little early rather than rejected by the API.
+    """
+
+    def __init__(self, encoding: str = TOKEN_ENCODING):
+        try:
+            import tiktoken
+            self._encoding = tiktoken.get_encoding(encoding)
+        except Exception:
+            # Not installed, or the encoding could not be downloaded (offline)
+            self._encoding = None
+
+    @property
+    def exact(self) -> bool:
+        return self._encoding is not None
+
+    def count(self, text: str) -> int:
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return len(text.encode("utf-8")) // 3 + 1
+
+    def hard_split(self, text: str, max_tokens: int) -> List[str]:
+        """Cut text into consecutive pieces of at most max_tokens, ignoring word boundaries."""
+        if self._encoding is not None:
+            tokens = self._encoding.encode(text, disallowed_special=())
+            return [self._encoding.decode(tokens[i:i + max_tokens]) for i in range(0, len(tokens), max_tokens)]
+        # Three bytes per estimated token; stepping by characters never splits a code point
+        pieces, piece, size = [], [], 0
+        for char in text:
+            width = len(char.encode("utf-8"))
+            if piece and (size + width) // 3 + 1 > max_tokens:
+                pieces.append("".join(piece))
+                piece, size = [], 0
+            piece.append(char)
+            size += width
+        return pieces + ["".join(piece)] if piece else pieces
+
+
+@dataclass
+class PackPlan:
+    """How a list of inputs is sent: flattened pieces and the requests they are grouped into."""
+    # Pieces in request order; an input under the token limit is a single piece
+    pieces: List[str] = field(default_factory=list)
+    # Index of the input each piece came from
+    owners: List[int] = field(default_factory=list)
+    # Token count of each piece, used to weight the average of a split input
+    tokens: List[int] = field(default_factory=list)
+    # [start, end) slices of ``pieces``, one per embeddings request
+    requests: List[Tuple[int, int]] = field(default_factory=list)
+    inputs: int = 0
+
+    @property
+    def split_inputs(self) -> int:
+        return len(self.pieces) - self.inputs
+
+    def combine(self, vectors: Sequence[Sequence[float]]) -> List[List[float]]:
+        """Map the piece vectors back to one vector per input, in input order.
+
+        A split input gets the token-weighted mean of its pieces, rescaled to
+        unit length like the model's own vectors.
+        """
+        grouped: List[List[int]] = [[] for _ in range(self.inputs)]
+        for piece, owner in enumerate(self.owners):
+            grouped[owner].append(piece)
+        results = []
+        for pieces in grouped:
+            if len(pieces) == 1:
+                results.append(list(vectors[pieces[0]]))
+                continue
+            mean = np.average(np.asarray([vectors[p] for p in pieces], dtype=np.float32), axis=0,
+                              weights=[self.tokens[p] for p in pieces])
+            results.append((mean / (np.linalg.norm(mean) or 1.0)).tolist())
+        return results
+
+
+class RequestPacker:
+    """Packs embedding inputs into as few requests as the endpoint's limits allow.
+
+    Inputs over ``max_input_tokens`` are cut at line and sentence breaks
+    (mid-sentence only as a last resort) and their pieces embedded
+    separately. Pieces are then grouped in order into requests of at most
+    ``max_inputs`` inputs and ``max_request_tokens`` tokens.
+    """
+
+    def __init__(
+        self,
+        max_inputs: int = MAX_INPUTS_PER_REQUEST,
+        max_input_tokens: int = MAX_TOKENS_PER_INPUT,
+        max_request_tokens: int = MAX_TOKENS_PER_REQUEST,
+        counter: Optional[TokenCounter] = None,
+    ):
+        self.max_inputs = max_inputs
+        self.max_input_tokens = max_input_tokens
+        self.max_request_tokens = max_request_tokens
+        self.counter = counter or TokenCounter()
+
+    def split(self, text: str) -> List[str]:
+        """Pieces of text that each fit in one input; the text itself if it already does."""
+        if self.counter.count(text) <= self.max_input_tokens:
+            return [text]
+        pieces: List[str] = []
+        piece, piece_tokens = "", 0
+        # Each segment is counted once and added to a running total, so
+        # splitting stays linear in the length of the text
+        for segment in _SEGMENT_PATTERN.split(text):
+            if not segment:
+                continue
+            spaced = bool(piece) and not piece.endswith("\n")
+            joined = f" {segment}" if spaced else segment
+            tokens = self.counter.count(joined)
+            if piece_tokens + tokens <= self.max_input_tokens:
+                piece += joined
+                piece_tokens += tokens
+                continue
+            if piece:
+                pieces.append(piece)
+            if spaced:
+                tokens = self.counter.count(segment)
+            if tokens <= self.max_input_tokens:
+                piece, piece_tokens = segment, tokens
+            else:
+                *whole, piece = self.counter.hard_split(segment, self.max_input_tokens)
+                pieces.extend(whole)
+                piece_tokens = self.counter.count(piece)
+        if piece:
+            pieces.append(piece)
+        # Tokens can merge across a join, so a piece may count slightly
+        # differently from the sum of its segments; check each piece once
+        return [
+            part for piece in pieces
+            for part in ([piece] if self.counter.count(piece) <= self.max_input_tokens
+                         else self.counter.hard_split(piece, self.max_input_tokens))
+        ]
+
+    def plan(self, texts: Sequence[str]) -> PackPlan:
+        plan = PackPlan(inputs=len(texts))
+        for owner, text in enumerate(texts):
+            for piece in self.split(text):
+                plan.pieces.append(piece)
+                plan.owners.append(owner)
+                plan.tokens.append(self.counter.count(piece))
+
+        start, request_tokens = 0, 0
+        for i, tokens in enumerate(plan.tokens):
+            if i > start and (i - start >= self.max_inputs or request_tokens + tokens > self.max_request_tokens):
+                plan.requests.append((start, i))
+                start, request_tokens = i, 0
+            request_tokens += tokens
+        if plan.pieces:
+            plan.requests.append((start, len(plan.pieces)))
+        return plan
+
+
+def embed_packed(texts: Sequence[str], create: Callable[[List[str]], List[List[float]]],
+                 packer: Optional[RequestPacker] = None) -> List[List[float]]:
+    """Embed texts through ``create(batch) -> vectors`` in packed requests; one vector per text."""
+    plan = (packer or RequestPacker()).plan(texts)
+    vectors: List[List[float]] = []
+    for start, end in plan.requests:
+        vectors.extend(create(plan.pieces[start:end]))
+    return plan.combine(vectors)
+
+
+async def embed_packed_async(texts: Sequence[str], create: Callable[[List[str]], Awaitable[List[List[float]]]],
+                             packer: Optional[RequestPacker] = None) -> List[List[float]]:
+    """Async version of embed_packed; requests are sent one after another."""
+    plan = (packer or RequestPacker()).plan(texts)
+    vectors: List[List[float]] = []
+    for start, end in plan.requests:
+        vectors.extend(await create(plan.pieces[start:end]))
+    return plan.combine(vectors)
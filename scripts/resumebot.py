@@ -0,0 +1,48 @@
+import argparse
+import importlib
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+# Get the absolute path to the script's directory
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+# Subcommand -> (module whose main() runs it, help). Modules are imported only
+# when their command runs, so `resumebot check` never loads the ingestion
+# stack and `resumebot clear` never loads numpy or the OpenAI SDK.
+COMMANDS = {
+    "ingest": ("process_documents", "chunk, embed and store the documents in data/"),
+    "check": ("check_semantic_chunks", "show the rows stored in Convex"),
+    "clear": ("clear_database", "delete every stored row"),
+    "search": ("test_hybrid_search", "run queries through search:hybridSearch"),
+    "bench": ("benchmark_retrieval", "benchmark retrieval latency and quality"),
+    "snapshot": ("snapshot", "export the stored rows to a file, or restore them without re-embedding"),
+    "watch": ("watch", "re-ingest files in data/ as they change"),
+}
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        prog="resumebot",
+        description="Manage the resume chatbot's document store.",
+        epilog="Run `resumebot <command> --help` for a command's options. "
+               "EMBEDDING_BACKEND and STORAGE_BACKEND select the services (see backends.py).",
+    )
+    commands = parser.add_subparsers(dest="command", required=True, metavar="command")
+    for name, (_, help) in COMMANDS.items():
+        # Options are parsed by the command's own module, once it is loaded
+        commands.add_parser(name, help=help, add_help=False)
+    args, rest = parser.parse_known_args(argv)
+
+    from dotenv import load_dotenv
+    load_dotenv(PROJECT_ROOT / ".env")
+
+    module = importlib.import_module(COMMANDS[args.command][0])
+    # Usage and error lines then name the subcommand rather than the module
+    sys.argv[0] = f"resumebot {args.command}"
+    module.main(rest)
+
+
+if __name__ == "__main__":
+    main()
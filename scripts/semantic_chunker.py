@@ -0,0 +1,250 @@
+import re
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Same sentence boundaries the original per-sentence chunker used
+SENTENCE_PATTERN = re.compile(r'[.!?]+')
+
+# Number of trailing chunk sentences a new sentence is compared against
+CONTEXT_WINDOW = 3
+
+# Chunks stop growing once their text reaches this many characters
+MAX_CHUNK_CHARS = 2000
+
+EmbedFn = Callable[[List[str]], Sequence[Sequence[float]]]
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into stripped, non-empty sentences."""
+    sentences = SENTENCE_PATTERN.split(text)
+    return [s.strip() for s in sentences if s.strip()]
+
+
+def normalize_rows(vectors: Sequence[Sequence[float]]) -> np.ndarray:
+    """Return a float32 matrix whose rows have unit length (zero rows stay zero)."""
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def cosine_similarity(a: Sequence[float], b: Sequence[float]) -> float:
+    """Cosine similarity of two vectors, 0 when either has zero length."""
+    unit = normalize_rows([a, b])
+    return float(unit[0] @ unit[1])
+
+
+def window_texts(sentences: List[str], window: int = CONTEXT_WINDOW) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """Distinct texts to embed for chunking, with row indices into that list.
+
+    Returns ``(texts, sentence_rows, window_rows)``: ``sentence_rows[i]`` is
+    the row of sentence ``i`` and ``window_rows[i, k]`` the row of the
+    ``k + 1`` sentences immediately preceding it, joined with a space exactly
+    as the chunker builds its comparison text (-1 where that window would
+    start before the first sentence). The window of one sentence is the
+    sentence itself, so it reuses that row.
+    """
+    n = len(sentences)
+    rows: Dict[str, int] = {}
+    texts: List[str] = []
+
+    def row_for(text: str) -> int:
+        if text not in rows:
+            rows[text] = len(texts)
+            texts.append(text)
+        return rows[text]
+
+    sentence_rows = np.array([row_for(s) for s in sentences], dtype=np.int64)
+    window_rows = np.full((n, window), -1, dtype=np.int64)
+    for i in range(1, n):
+        for size in range(1, min(window, i) + 1):
+            window_rows[i, size - 1] = row_for(' '.join(sentences[i - size:i]))
+    return texts, sentence_rows, window_rows
+
+
+def similarities_from_embeddings(
+    embeddings: Sequence[Sequence[float]],
+    sentence_rows: np.ndarray,
+    window_rows: np.ndarray,
+) -> np.ndarray:
+    """Cosine similarity of each sentence to each of its context windows (NaN where absent)."""
+    unit = normalize_rows(embeddings)
+    valid = window_rows >= 0
+    contexts = unit[np.where(valid, window_rows, 0)]
+    similarities = np.einsum('nkd,nd->nk', contexts, unit[sentence_rows])
+    similarities[~valid] = np.nan
+    return similarities
+
+
+def window_similarities(sentences: List[str], embed: EmbedFn, window: int = CONTEXT_WINDOW) -> np.ndarray:
+    """Similarity of every sentence to each candidate context window before it.
+
+    Every distinct sentence and window text is embedded once, in a single
+    call to ``embed``.
+    """
+    texts, sentence_rows, window_rows = window_texts(sentences, window)
+    return similarities_from_embeddings(embed(texts), sentence_rows, window_rows)
+
+
+class StreamingChunker:
+    """Incremental semantic chunker fed sentences in batches.
+
+    Each batch goes through two steps: ``prepare`` lists the texts that must
+    be embedded, including windows that reach back into the previous batch,
+    and ``consume`` takes their similarities and returns the chunks that
+    completed. Several batches may be prepared before the first is consumed,
+    as long as both steps see the batches in the same order. Fed the same sentences, it produces exactly the chunks of a
+    single pass over the whole text, while only holding the current chunk
+    and the last few sentences in memory.
+    """
+
+    def __init__(self, similarity_threshold: float = 0.7, min_chunk_size: int = 200,
+                 window: int = CONTEXT_WINDOW, verbose: bool = True, total: Optional[int] = None):
+        self.similarity_threshold = similarity_threshold
+        self.min_chunk_size = min_chunk_size
+        self.window = window
+        self.verbose = verbose
+        self.total = total
+        self.history: List[str] = []
+        self.seen = 0
+        self.current_chunk: List[str] = []
+        self.current_size = 0
+        self.chunk_count = 0
+
+    def prepare(self, sentences: List[str]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """Texts to embed for a batch, with the batch's rows into them (see window_texts)."""
+        texts, sentence_rows, window_rows = window_texts(self.history + sentences, self.window)
+        offset = len(self.history)
+        self.history = (self.history + sentences)[-self.window:]
+        return texts, sentence_rows[offset:], window_rows[offset:]
+
+    def _emit(self, similarity: Optional[float] = None) -> Dict[str, Any]:
+        chunk_text = ' '.join(self.current_chunk)
+        metadata = {
+            "chunk_index": self.chunk_count,
+            "chunk_size": len(chunk_text),
+            "sentence_count": len(self.current_chunk)
+        }
+        if similarity is not None:
+            metadata["avg_similarity"] = similarity
+        self.chunk_count += 1
+        return {"content": chunk_text, "metadata": metadata}
+
+    def consume(self, sentences: List[str], similarities: np.ndarray) -> List[Dict[str, Any]]:
+        """Add a prepared batch given its similarities; returns chunks completed by it."""
+        chunks = []
+        for current_sentence, row in zip(sentences, similarities):
+            self.seen += 1
+            if not self.current_chunk:
+                self.current_chunk = [current_sentence]
+                self.current_size = len(current_sentence)
+                continue
+
+            context_size = min(self.window, len(self.current_chunk))
+            similarity = float(row[context_size - 1])
+            if self.verbose:
+                position = f"{self.seen}/{self.total}" if self.total else str(self.seen)
+                print(f"Sentence {position}: Similarity = {similarity:.3f}")
+
+            if similarity >= self.similarity_threshold and self.current_size < MAX_CHUNK_CHARS:
+                self.current_chunk.append(current_sentence)
+                self.current_size += 1 + len(current_sentence)
+            elif self.current_size >= self.min_chunk_size:
+                chunks.append(self._emit(similarity))
+                self.current_chunk = [current_sentence]
+                self.current_size = len(current_sentence)
+            else:
+                # If chunk is too small, add sentence anyway
+                self.current_chunk.append(current_sentence)
+                self.current_size += 1 + len(current_sentence)
+        return chunks
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """Flush the last, still-open chunk."""
+        if not self.current_chunk:
+            return []
+        chunk = self._emit()
+        self.current_chunk = []
+        self.current_size = 0
+        return [chunk]
+
+
+def chunk_sentences(
+    sentences: List[str],
+    similarities: np.ndarray,
+    similarity_threshold: float = 0.7,
+    min_chunk_size: int = 200,
+    window: int = CONTEXT_WINDOW,
+    verbose: bool = True,
+) -> List[Dict[str, Any]]:
+    """Group sentences into chunks using precomputed window similarities."""
+    chunker = StreamingChunker(similarity_threshold, min_chunk_size, window, verbose, total=len(sentences))
+    return chunker.consume(sentences, similarities) + chunker.finish()
+
+
+def iter_sentences(blocks: Iterable[str]) -> Iterator[str]:
+    """Sentences of the text made by joining blocks with newlines, yielded as they complete.
+
+    Gives the same sentences as split_sentences on the joined text, holding
+    only the trailing unfinished sentence between blocks.
+    """
+    buffer: Optional[str] = None
+    for block in blocks:
+        buffer = block if buffer is None else buffer + "\n" + block
+        last_end = None
+        for match in SENTENCE_PATTERN.finditer(buffer):
+            last_end = match.end()
+        if last_end is None:
+            continue
+        complete, buffer = buffer[:last_end], buffer[last_end:]
+        yield from split_sentences(complete)
+    if buffer:
+        yield from split_sentences(buffer)
+
+
+def iter_batches(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    batch: List[Any] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def stream_semantic_chunks(
+    sentences: Iterable[str],
+    embed: EmbedFn,
+    similarity_threshold: float = 0.7,
+    min_chunk_size: int = 200,
+    batch_sentences: int = 256,
+    verbose: bool = True,
+) -> Iterator[Dict[str, Any]]:
+    """Yield semantic chunks from a sentence stream, embedding one batch of sentences at a time."""
+    chunker = StreamingChunker(similarity_threshold, min_chunk_size, verbose=verbose)
+    for batch in iter_batches(sentences, batch_sentences):
+        texts, sentence_rows, window_rows = chunker.prepare(batch)
+        similarities = similarities_from_embeddings(embed(texts), sentence_rows, window_rows)
+        yield from chunker.consume(batch, similarities)
+    yield from chunker.finish()
+
+
+def semantic_chunks(
+    text: str,
+    embed: EmbedFn,
+    similarity_threshold: float = 0.7,
+    min_chunk_size: int = 200,
+    verbose: bool = True,
+) -> List[Dict[str, Any]]:
+    """Split text into semantic chunks, embedding each distinct text only once."""
+    sentences = split_sentences(text)
+    if not sentences:
+        return []
+    if verbose:
+        print(f"Processing {len(sentences)} sentences for semantic chunking...")
+    similarities = window_similarities(sentences, embed)
+    return chunk_sentences(sentences, similarities, similarity_threshold, min_chunk_size, verbose=verbose)
@@ -0,0 +1,310 @@
+import argparse
+import json
+import mmap
+import os
+import re
+import shutil
+import struct
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from batch_writer import DEFAULT_MAX_BATCH_BYTES, iter_payload_batches
+from embedding_cache import embedding_key
+
+# Get the absolute path to the script's directory
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+EMBEDDING_CONFIG = PROJECT_ROOT / "convex" / "embeddingConfig.ts"
+
+# Model process_documents.py embeds rows with, assumed when the manifest doesn't say
+DEFAULT_MODEL = "text-embedding-3-small"
+
+# File layout, all little-endian:
+#   magic (8 bytes) | header length (uint64) | JSON header, space-padded
+#   then each section at the offset the header gives, 64-byte aligned:
+#   embeddings  float32 [rows, dimensions], unit-length rows
+#   text_offsets / name_offsets  uint64 [rows + 1] into the blobs
+#   texts / names  UTF-8 blobs, row i at [offsets[i], offsets[i + 1])
+MAGIC = b"RBSNAP\x00\x01"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+SECTIONS = ("embeddings", "text_offsets", "name_offsets", "texts", "names")
+
+# Rows per documents:listMetadata page when exporting; each carries its vector
+EXPORT_PAGE_SIZE = 100
+
+
+def configured_dimensions(path: Path = EMBEDDING_CONFIG) -> Optional[int]:
+    """EMBEDDING_DIMENSIONS from convex/embeddingConfig.ts, the size the vector index expects."""
+    match = re.search(r"EMBEDDING_DIMENSIONS\s*=\s*(\d+)", path.read_text(encoding="utf-8"))
+    return int(match.group(1)) if match else None
+
+
+def _padding(offset: int) -> int:
+    return -offset % ALIGNMENT
+
+
+class SnapshotWriter:
+    """Streams rows into a snapshot file without holding the corpus in memory.
+
+    Sections are spooled to temporary files while rows arrive and joined
+    behind the header on ``close``, which replaces ``path`` atomically.
+    """
+
+    def __init__(self, path: Path, model: str = DEFAULT_MODEL, dimensions: Optional[int] = None,
+                 embedding: str = "", source: str = ""):
+        self.path = Path(path)
+        self.model = model
+        self.dimensions = dimensions
+        self.embedding = embedding
+        self.source = source
+        self.rows = 0
+        self._spools = {name: tempfile.TemporaryFile() for name in ("embeddings", "texts", "names")}
+        self._offsets: Dict[str, List[int]] = {"texts": [0], "names": [0]}
+
+    def add(self, name: str, content: str, embedding: Any) -> None:
+        vector = np.asarray(embedding, dtype=np.float32)
+        if self.dimensions is None:
+            self.dimensions = len(vector)
+        if len(vector) != self.dimensions:
+            raise ValueError(f"Row {name!r} has {len(vector)} dimensions; the snapshot has {self.dimensions}")
+        norm = np.linalg.norm(vector)
+        self._spools["embeddings"].write((vector / (norm or 1.0)).astype("<f4").tobytes())
+        for section, value in (("texts", content), ("names", name)):
+            data = value.encode("utf-8")
+            self._spools[section].write(data)
+            self._offsets[section].append(self._offsets[section][-1] + len(data))
+        self.rows += 1
+
+    def close(self) -> Path:
+        sections = {
+            "embeddings": self._spools["embeddings"],
+            "text_offsets": np.asarray(self._offsets["texts"], dtype="<u8").tobytes(),
+            "name_offsets": np.asarray(self._offsets["names"], dtype="<u8").tobytes(),
+            "texts": self._spools["texts"],
+            "names": self._spools["names"],
+        }
+        sizes = {name: len(data) if isinstance(data, bytes) else data.tell() for name, data in sections.items()}
+        header = {
+            "version": FORMAT_VERSION,
+            "model": self.model,
+            "dimensions": self.dimensions or 0,
+            "embedding": self.embedding or (embedding_key(self.model, self.dimensions) if self.dimensions else self.model),
+            "rows": self.rows,
+            "source": self.source,
+            "created": time.time(),
+        }
+        # Offsets depend on the header's length, which depends on the offsets: reserve room, then fill in
+        header_room = len(json.dumps({**header, "sections": {n: [10 ** 15, 10 ** 15] for n in SECTIONS}})) + 1
+        offset = len(MAGIC) + 8 + header_room
+        offset += _padding(offset)
+        header["sections"] = {}
+        for name in SECTIONS:
+            header["sections"][name] = [offset, sizes[name]]
+            offset += sizes[name] + _padding(offset + sizes[name])
+
+        encoded = json.dumps(header).encode("utf-8")
+        start = len(MAGIC) + 8 + len(encoded)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC + struct.pack("<Q", len(encoded)) + encoded)
+            f.write(b" " * (header["sections"]["embeddings"][0] - start))
+            for name in SECTIONS:
+                data = sections[name]
+                if isinstance(data, bytes):
+                    f.write(data)
+                else:
+                    data.seek(0)
+                    shutil.copyfileobj(data, f, 1 << 20)
+                f.write(b"\0" * _padding(f.tell()))
+        os.replace(tmp_path, self.path)
+        for spool in self._spools.values():
+            spool.close()
+        return self.path
+
+
+class Snapshot:
+    """Read-only, memory-mapped view of a snapshot file.
+
+    ``embeddings`` and the offset arrays are numpy views straight into the
+    mapping, so opening a snapshot costs no copy whatever its size; text
+    is decoded per row on access.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            # The mapping outlives the file descriptor
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not a snapshot file")
+        (length,) = struct.unpack_from("<Q", self._map, len(MAGIC))
+        self.header: Dict[str, Any] = json.loads(self._map[len(MAGIC) + 8:len(MAGIC) + 8 + length])
+        if self.header["version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {self.header['version']} in {self.path}")
+        rows, dimensions = self.header["rows"], self.header["dimensions"]
+        self.embeddings = self._array("embeddings", "<f4").reshape(rows, dimensions)
+        self._text_offsets = self._array("text_offsets", "<u8")
+        self._name_offsets = self._array("name_offsets", "<u8")
+
+    def _array(self, section: str, dtype: str) -> np.ndarray:
+        offset, size = self.header["sections"][section]
+        return np.frombuffer(self._map, dtype=dtype, count=size // np.dtype(dtype).itemsize, offset=offset)
+
+    def _blob(self, section: str, offsets: np.ndarray, row: int) -> str:
+        base = self.header["sections"][section][0]
+        return self._map[base + int(offsets[row]):base + int(offsets[row + 1])].decode("utf-8")
+
+    def __len__(self) -> int:
+        return self.header["rows"]
+
+    @property
+    def model(self) -> str:
+        return self.header["model"]
+
+    @property
+    def dimensions(self) -> int:
+        return self.header["dimensions"]
+
+    @property
+    def embedding(self) -> str:
+        """Embedding key (see embedding_cache.embedding_key) the rows were made with."""
+        return self.header["embedding"]
+
+    def name(self, row: int) -> str:
+        return self._blob("names", self._name_offsets, row)
+
+    def text(self, row: int) -> str:
+        return self._blob("texts", self._text_offsets, row)
+
+    def documents(self) -> Iterator[Dict[str, Any]]:
+        """Rows in documents:storeBatch shape."""
+        for row in range(len(self)):
+            yield {"name": self.name(row), "content": self.text(row), "embedding": self.embeddings[row].tolist()}
+
+    def local_index(self, **kwargs) -> Any:
+        """LocalIndex searching the mapped matrix in place."""
+        from local_search import LocalIndex
+        documents = [{"_id": f"snapshot_{row}", "name": self.name(row), "content": self.text(row)}
+                     for row in range(len(self))]
+        return LocalIndex(documents, matrix=self.embeddings, **kwargs)
+
+
+def export_snapshot(convex: Any, path: Path, model: str = DEFAULT_MODEL, embedding: str = "",
+                    source: str = "", page_size: int = EXPORT_PAGE_SIZE) -> int:
+    """Write every row of the documents table to a snapshot; returns rows written."""
+    from convex_pages import iter_metadata
+
+    if embedding:
+        # The manifest's key, e.g. text-embedding-3-small@256, names the model itself
+        model = embedding.partition("@")[0]
+    writer = SnapshotWriter(path, model, embedding=embedding, source=source)
+    for page in iter_metadata(convex, page_size, include_content=True, include_embedding=True):
+        for doc in page:
+            writer.add(doc["name"], doc["content"], doc["embedding"])
+    writer.close()
+    return writer.rows
+
+
+def restore_snapshot(convex: Any, snapshot: Snapshot, replace: bool = False,
+                     max_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+                     on_batch: Optional[Callable[[int], None]] = None) -> List[str]:
+    """Load a snapshot's rows through documents:storeBatch; returns their new IDs.
+
+    Refuses to add to a non-empty table unless ``replace``, which empties it
+    (and the lexical index) first. The restored rows are indexed for
+    keyword search as well, so nothing is left to rebuild.
+    """
+    from convex_pages import count_documents, delete_all
+    from lexical_index import clear_index, index_documents
+
+    existing = count_documents(convex)
+    if existing and not replace:
+        raise ValueError(f"The documents table already has {existing} rows; pass replace=True to overwrite them")
+    if replace:
+        clear_index(convex)
+        delete_all(convex)
+
+    ids: List[str] = []
+    for batch in iter_payload_batches(snapshot.documents(), max_bytes):
+        ids.extend(convex.mutation("documents:storeBatch", {"documents": batch}))
+        if on_batch:
+            on_batch(len(ids))
+    index_documents(convex, ((doc_id, snapshot.text(row)) for row, doc_id in enumerate(ids)))
+    return ids
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Export the documents table to a snapshot file, or restore one.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="write every stored row and its embedding to a snapshot")
+    export.add_argument("output", type=Path, help="snapshot file to write, e.g. snapshots/prod.rbsnap")
+    export.add_argument("--model", default=DEFAULT_MODEL,
+                        help="embedding model to record when the ingestion manifest doesn't know it")
+
+    restore = commands.add_parser("restore", help="load a snapshot into the deployment, without re-embedding")
+    restore.add_argument("snapshot", type=Path)
+    restore.add_argument("--replace", action="store_true", help="delete the rows already stored first")
+    restore.add_argument("--yes", action="store_true", help="don't ask before replacing rows")
+
+    info = commands.add_parser("info", help="show a snapshot's metadata")
+    info.add_argument("snapshot", type=Path)
+    args = parser.parse_args(argv)
+
+    if args.command == "info":
+        snapshot = Snapshot(args.snapshot)
+        print(f"📦 {args.snapshot}: {len(snapshot)} rows of {snapshot.embedding} embeddings "
+              f"({snapshot.embeddings.nbytes / 1024:.0f} KiB), exported from {snapshot.header['source'] or '?'}")
+        return
+
+    from backends import convex_client, deployment_name
+    from clear_database import forget_ingestion
+    from dotenv import load_dotenv
+    from ingest_manifest import DEFAULT_MANIFEST_PATH, IngestManifest
+    load_dotenv(PROJECT_ROOT / ".env")
+    convex = convex_client()
+    manifest = IngestManifest(deployment_name(), Path(os.getenv("INGEST_MANIFEST_PATH", DEFAULT_MANIFEST_PATH)))
+    try:
+        if args.command == "export":
+            started = time.perf_counter()
+            rows = export_snapshot(convex, args.output, args.model, manifest.embedding, deployment_name())
+            snapshot = Snapshot(args.output)
+            print(f"💾 Wrote {rows} rows of {snapshot.embedding} embeddings to {args.output} "
+                  f"({args.output.stat().st_size / 1024:.0f} KiB) in {time.perf_counter() - started:.1f}s")
+            return
+
+        snapshot = Snapshot(args.snapshot)
+        expected = configured_dimensions()
+        if expected and snapshot.dimensions != expected:
+            raise ValueError(f"The snapshot has {snapshot.dimensions}-dimension embeddings but "
+                             f"convex/embeddingConfig.ts expects {expected}")
+        if args.replace and not args.yes:
+            confirm = input(f"⚠️  Replace every stored row with the {len(snapshot)} rows of {args.snapshot}? (yes/no): ")
+            if confirm.lower() != "yes":
+                print("❌ Restore cancelled")
+                return
+
+        started = time.perf_counter()
+        print(f"📥 Restoring {len(snapshot)} rows from {args.snapshot}...")
+        ids = restore_snapshot(convex, snapshot, replace=args.replace,
+                               on_batch=lambda total: print(f"   {total}/{len(snapshot)} stored"))
+        # Row IDs changed, so the next ingestion re-adopts the table rather than trusting old
+        # entries, and an interrupted run's journal must not replay against the restored rows
+        forget_ingestion(snapshot.embedding)
+        print(f"✅ Restored {len(ids)} rows in {time.perf_counter() - started:.1f}s, with no embedding requests")
+        print("💡 Cached answers for the suggested questions point at the old rows until "
+              "build_retrieval_cache.py runs again")
+    except Exception as e:
+        print(f"❌ Error with snapshot: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    main()
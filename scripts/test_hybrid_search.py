@@ -1,33 +1,44 @@
-import os
+import argparse
 from pathlib import Path
-from dotenv import load_dotenv
-from convex import ConvexClient
+from typing import List, Optional
+from backends import convex_client
 
 # Get the absolute path to the script's directory
 SCRIPT_DIR = Path(__file__).resolve().parent
 PROJECT_ROOT = SCRIPT_DIR.parent
 
-# Load environment variables
-env_path = PROJECT_ROOT / ".env"
-load_dotenv(env_path)
+# Queries run when none are given
+DEFAULT_QUERIES = [
+    # Semantic queries (should use vector search)
+    "Tell me about Eda's AI experience",
+    "What is the AI Skills project?",
+    "How did Eda contribute to Project Unify?",
 
-# Initialize Convex client
-convex = ConvexClient(os.getenv("NEXT_PUBLIC_CONVEX_URL"))
+    # Keyword queries (should use lexical search)
+    "SAP SuccessFactors",
+    "Rocket Software",
+    "Python development",
 
-def test_hybrid_search(query: str):
+    # Mixed queries (should use both)
+    "AI skills at SAP",
+    "Project Unify data model",
+    "Leadership experience at Rocket"
+]
+
+def test_hybrid_search(query: str, top: int = 10):
     """Test hybrid search with a specific query."""
     try:
         print(f"\n🔍 TESTING HYBRID SEARCH: '{query}'")
         print("=" * 60)
         
         # Use the hybrid search action
-        results = convex.action("search:hybridSearch", {"query": query})
+        results = convex_client().action("search:hybridSearch", {"query": query})
         
         print(f"📊 Found {len(results)} documents")
         print("-" * 40)
         
         # Print details for each result
-        for i, result in enumerate(results[:10]):  # Show top 10 results
+        for i, result in enumerate(results[:top]):
             print(f"\n{i+1}. Document ID: {result['id']}")
             print(f"   Score: {result['score']:.4f}")
             print(f"   Content length: {len(result['text'])} chars")
@@ -45,25 +56,17 @@ def test_hybrid_search(query: str):
         print(f"❌ Error testing hybrid search: {str(e)}")
         raise
 
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Run queries through search:hybridSearch and show the top results.")
+    parser.add_argument("queries", nargs="*", help="queries to run (default: a mix of semantic and keyword queries)")
+    parser.add_argument("--top", type=int, default=10, help="results to print per query")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    load_dotenv(PROJECT_ROOT / ".env")
+    for query in args.queries or DEFAULT_QUERIES:
+        test_hybrid_search(query, args.top)
+        print("\n" + "🔄" * 20 + "\n")
+
 if __name__ == "__main__":
-    # Test different types of queries
-    test_queries = [
-        # Semantic queries (should use vector search)
-        "Tell me about Eda's AI experience",
-        "What is the AI Skills project?",
-        "How did Eda contribute to Project Unify?",
-        
-        # Keyword queries (should use lexical search)
-        "SAP SuccessFactors",
-        "Rocket Software",
-        "Python development",
-        
-        # Mixed queries (should use both)
-        "AI skills at SAP",
-        "Project Unify data model",
-        "Leadership experience at Rocket"
-    ]
-    
-    for query in test_queries:
-        test_hybrid_search(query)
-        print("\n" + "🔄" * 20 + "\n") 
\ No newline at end of file
+    main()
@@ -0,0 +1,238 @@
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from document_loader import is_source_path
+
+# Get the absolute path to the script's directory
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+DATA_DIR = PROJECT_ROOT / "data"
+
+# Quiet time after the last change before ingesting; editors save in bursts
+# (temp file, rename, lock file, metadata)
+DEFAULT_DEBOUNCE_SECONDS = 1.5
+
+# How often PollingWatcher rescans the directory
+DEFAULT_POLL_SECONDS = 1.0
+
+# inotify event bits, from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# A finished write (IN_CLOSE_WRITE) rather than every IN_MODIFY, plus creates,
+# deletes and renames, which is how most editors save
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def scan(directory: Path) -> Dict[Path, Tuple[int, int]]:
+    """(mtime in ns, size) of every source document under a directory."""
+    state = {}
+    for path in Path(directory).rglob("*"):
+        if is_source_path(path):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.is_file():
+                state[path] = (stat.st_mtime_ns, stat.st_size)
+    return state
+
+
+class PollingWatcher:
+    """Finds changes by rescanning the directory; works on every platform."""
+
+    def __init__(self, directory: Path, interval: float = DEFAULT_POLL_SECONDS):
+        self.directory = Path(directory)
+        self.interval = interval
+        self._state = scan(self.directory)
+
+    def wait(self, timeout: Optional[float] = None) -> Set[Path]:
+        """Source paths created, changed or deleted since the last call; empty after ``timeout`` seconds."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            state = scan(self.directory)
+            changed = {path for path in state.keys() | self._state.keys() if state.get(path) != self._state.get(path)}
+            self._state = state
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            time.sleep(self.interval if deadline is None else max(0.0, min(self.interval, deadline - time.monotonic())))
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """Linux inotify through libc, so no extra package is needed.
+
+    Every directory under the root is watched, including ones created
+    later. Raises OSError where inotify is unavailable.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify is not available on this platform")
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, Path] = {}
+        self._add_tree(self.directory)
+
+    def _add_tree(self, root: Path) -> None:
+        for directory in [root, *(path for path in root.rglob("*") if path.is_dir())]:
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"Cannot watch {directory}")
+            self._dirs[wd] = directory
+
+    def _read(self) -> Set[Path]:
+        changed: Set[Path] = set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + length].rstrip(b"\0")
+            offset += _EVENT_HEADER.size + length
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped: report every document, the pipeline skips unchanged ones
+                changed |= set(scan(self.directory))
+                continue
+            if mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = directory / os.fsdecode(name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    # A new directory may already hold documents by the time it is watched
+                    self._add_tree(path)
+                    changed |= set(scan(path))
+                continue
+            if is_source_path(path):
+                changed.add(path)
+        return changed
+
+    def wait(self, timeout: Optional[float] = None) -> Set[Path]:
+        """Source paths created, changed or deleted; empty after ``timeout`` seconds."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            ready, _, _ = select.select([self._fd], [], [], remaining)
+            if not ready:
+                return set()
+            changed = self._read()
+            if changed:
+                return changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def open_watcher(directory: Path, polling: bool = False, interval: float = DEFAULT_POLL_SECONDS):
+    """InotifyWatcher where the platform has it, PollingWatcher otherwise."""
+    if not polling:
+        try:
+            return InotifyWatcher(directory)
+        except (OSError, AttributeError) as e:
+            print(f"⚠️  inotify unavailable ({e}); polling every {interval:.1f}s instead")
+    return PollingWatcher(directory, interval)
+
+
+def debounced_changes(watcher, debounce: float = DEFAULT_DEBOUNCE_SECONDS) -> Iterator[Tuple[Set[Path], float]]:
+    """Sets of changed paths, each yielded once ``debounce`` seconds pass without another change.
+
+    Each set comes with the time.perf_counter() at which its last change was seen.
+    """
+    while True:
+        changed = watcher.wait()
+        last_change = time.perf_counter()
+        while more := watcher.wait(debounce):
+            changed |= more
+            last_change = time.perf_counter()
+        yield changed, last_change
+
+
+def watch(data_dir: Path = DATA_DIR, debounce: float = DEFAULT_DEBOUNCE_SECONDS, polling: bool = False,
+          interval: float = DEFAULT_POLL_SECONDS, **options) -> None:
+    """Keep the documents table in sync with data_dir until interrupted.
+
+    Catches up on edits made while nothing was watching, then re-ingests
+    each changed file on its own, swapping its rows in one transaction.
+    ``options`` are passed on to process_documents.
+    """
+    from process_documents import process_documents
+
+    # Watch first, so nothing saved during the catch-up run is missed
+    watcher = open_watcher(data_dir, polling, interval)
+    try:
+        print(f"👀 Syncing {data_dir} before watching it...")
+        process_documents(data_dir, swap=True, **options)
+        print(f"\n👀 Watching {data_dir} for changes ({type(watcher).__name__}, {debounce:.1f}s debounce); "
+              f"Ctrl+C to stop")
+        for changed, last_change in debounced_changes(watcher, debounce):
+            names = ", ".join(sorted(path.name for path in changed))
+            print(f"\n✏️  Changed: {names}")
+            try:
+                process_documents(data_dir, only=changed, swap=True, **options)
+            except Exception as e:
+                # Keep watching; the journal lets the next run recover whatever this one left
+                print(f"❌ Re-ingesting {names} failed: {str(e)}")
+                continue
+            # Includes the debounce wait: this is how long an edit takes to become searchable
+            print(f"⏱️  Up to date {time.perf_counter() - last_change:.1f}s after the last save")
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    finally:
+        watcher.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    from dedup import DEFAULT_DUPLICATE_THRESHOLD
+
+    parser = argparse.ArgumentParser(description="Re-ingest documents as they change, one file at a time.")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="directory to watch (default: data/)")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE_SECONDS,
+                        help="seconds without changes before a burst of edits is ingested")
+    parser.add_argument("--polling", action="store_true", help="rescan the directory instead of using inotify")
+    parser.add_argument("--interval", type=float, default=DEFAULT_POLL_SECONDS, help="seconds between rescans")
+    parser.add_argument("--no-dedup", action="store_true", help="embed every chunk, even duplicates of another")
+    parser.add_argument("--dedup-threshold", type=float, default=DEFAULT_DUPLICATE_THRESHOLD)
+    parser.add_argument("--no-retrieval-cache", action="store_true",
+                        help="don't rebuild the suggested-question retrieval cache after each change")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    load_dotenv(PROJECT_ROOT / ".env")
+    watch(args.data_dir, args.debounce, args.polling, args.interval, dedup=not args.no_dedup,
+          dedup_threshold=args.dedup_threshold, retrieval_cache=not args.no_retrieval_cache)
+
+
+if __name__ == "__main__":
+    main()
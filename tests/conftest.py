@@ -0,0 +1,101 @@
+import sys
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+# The scripts import each other as top-level modules
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+# Small documents with a few topics each, so semantic chunking finds several boundaries
+SAMPLE_DOCUMENTS = {
+    "career.md": (
+        "# Career\n\n"
+        "Eda led the data platform team at Rocket Software for four years. The team built ingestion "
+        "pipelines for mainframe data. Those pipelines moved billions of records into cloud warehouses.\n\n"
+        "Before Rocket, Eda worked at SAP on SuccessFactors. She designed the reporting data model for "
+        "the Unify project. The data model served hundreds of enterprise customers.\n\n"
+        "Eda mentors junior engineers every week. Mentoring and hiring are part of her leadership work. "
+        "She ran interview loops for the analytics group.\n"
+    ),
+    "skills.txt": (
+        "Python is the language Eda uses most. She writes data pipelines, services and tooling in Python. "
+        "Pandas and NumPy are part of her daily work.\n\n"
+        "Machine learning projects include retrieval augmented generation and semantic search. "
+        "She has shipped embedding based search to production. Evaluation of retrieval quality matters to her.\n\n"
+        "Cloud skills cover AWS, Azure and Kubernetes. Deployments are automated with Terraform. "
+        "Monitoring uses Grafana dashboards and alerts.\n"
+    ),
+    "education.md": (
+        "# Education\n\n"
+        "Eda studied computer engineering at Istanbul Technical University. Her thesis was about "
+        "distributed databases. She graduated with honors.\n\n"
+        "Later she completed a certificate in machine learning. The program covered deep learning "
+        "and natural language processing.\n"
+    ),
+}
+
+
+def write_documents(directory: Path, documents: Dict[str, str] = SAMPLE_DOCUMENTS) -> Path:
+    """Write {file name: text} into a directory and return it."""
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, text in documents.items():
+        (directory / name).write_text(text, encoding="utf-8")
+    return directory
+
+
+@pytest.fixture
+def local_backend(tmp_path, monkeypatch):
+    """LocalConvexClient over a fresh SQLite store, with deterministic local embeddings."""
+    import backends
+
+    monkeypatch.setenv("EMBEDDING_BACKEND", "local")
+    monkeypatch.setenv("STORAGE_BACKEND", "local")
+    monkeypatch.setenv("LOCAL_STORE_PATH", str(tmp_path / "store.sqlite3"))
+    monkeypatch.setenv("INGEST_MANIFEST_PATH", str(tmp_path / "ingest_manifest.json"))
+    monkeypatch.setenv("EMBEDDING_CACHE_PATH", str(tmp_path / "embeddings.sqlite3"))
+    monkeypatch.delenv("CONVEX_DEPLOY_KEY", raising=False)
+    factories = (backends.embedding_client, backends.async_embedding_client, backends.convex_client)
+    for factory in factories:
+        factory.cache_clear()
+    convex = backends.convex_client()
+    yield convex
+    convex.close()
+    for factory in factories:
+        factory.cache_clear()
+
+
+@pytest.fixture
+def ingest(local_backend, tmp_path, monkeypatch):
+    """Run process_documents against the local backend; returns the saved IngestManifest."""
+    import process_documents
+    from backends import deployment_name
+    from embedding_cache import EmbeddingCache
+    from ingest_manifest import IngestManifest
+
+    manifest_path = tmp_path / "ingest_manifest.json"
+    cache = EmbeddingCache(tmp_path / "embeddings.sqlite3")
+    monkeypatch.setattr(process_documents, "MANIFEST_PATH", manifest_path)
+    monkeypatch.setattr(process_documents, "embedding_cache", cache)
+
+    def run(data_dir: Path, **options) -> IngestManifest:
+        options.setdefault("workers", 1)
+        options.setdefault("retrieval_cache", False)
+        process_documents.process_documents(data_dir, **options)
+        return IngestManifest(deployment_name(), manifest_path)
+
+    yield run
+    cache.close()
+
+
+def stored_rows(convex) -> Dict[str, Dict[str, str]]:
+    """Every row of the documents table: name -> {"_id", "content"}."""
+    from convex_pages import iter_metadata
+
+    rows = {}
+    for page in iter_metadata(convex, include_content=True):
+        for doc in page:
+            assert doc["name"] not in rows, f"duplicate row {doc['name']}"
+            rows[doc["name"]] = {"_id": doc["_id"], "content": doc["content"]}
+    return rows
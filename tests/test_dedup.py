@@ -0,0 +1,61 @@
+import asyncio
+
+import process_documents
+from async_pipeline import Turnstile
+from conftest import SAMPLE_DOCUMENTS, stored_rows, write_documents
+
+SHARED = SAMPLE_DOCUMENTS["skills.txt"]
+
+# The same text behind a different opening line, so each file can be told apart while chunking
+DOCUMENTS = {
+    "a.md": "Alpha copy of the skills summary follows.\n\n" + SHARED,
+    "b.md": "Bravo copy of the skills summary follows.\n\n" + SHARED,
+    "c.md": "Charlie copy of the skills summary follows.\n\n" + SHARED,
+}
+
+# a finishes chunking after b, though it comes first in source order
+DELAYS = {"Alpha": 0.3, "Bravo": 0.15, "Charlie": 0.0}
+
+
+def test_turns_are_taken_in_sequence_order():
+    async def run():
+        turnstile, order = Turnstile(), []
+
+        async def take(sequence, delay):
+            await asyncio.sleep(delay)
+            async with turnstile.turn(sequence):
+                order.append(sequence)
+
+        await asyncio.gather(*(take(i, delay) for i, delay in enumerate([0.03, 0.02, 0.0])))
+        return order
+
+    assert asyncio.run(run()) == [0, 1, 2]
+
+
+def test_first_source_keeps_duplicate_chunks(local_backend, ingest, tmp_path, monkeypatch):
+    chunk = process_documents.semantic_chunks_async
+    finished = []
+
+    async def slow_chunks(sentences, *args, **kwargs):
+        sentences = list(sentences)
+        label = sentences[0].split()[0]
+        await asyncio.sleep(DELAYS[label])
+        chunks = await chunk(sentences, *args, **kwargs)
+        finished.append(label)
+        return chunks
+
+    monkeypatch.setattr(process_documents, "semantic_chunks_async", slow_chunks)
+    data = write_documents(tmp_path / "data", DOCUMENTS)
+    manifest = ingest(data, concurrency=3)
+    assert finished.index("Bravo") < finished.index("Alpha")
+
+    assert manifest.source("a")["merged"] == {}
+    for name in ("b", "c"):
+        merged = manifest.source(name)["merged"]
+        assert merged
+        assert all(row["into"].startswith("a_semantic_chunk_") for row in merged.values())
+
+    # Chunk rows are stored for a only; b and c keep just their whole-document rows
+    names = set(stored_rows(local_backend))
+    assert names == {"a", "b", "c"} | set(manifest.source("a")["documents"])
+    assert all(name in {"a", "b", "c"} or name.startswith("a_") for name in names)
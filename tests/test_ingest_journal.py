@@ -0,0 +1,79 @@
+from functools import partial
+
+import pytest
+
+import process_documents
+from async_pipeline import IngestPipeline
+from clear_database import forget_ingestion
+from conftest import stored_rows, write_documents
+
+
+class Crash(Exception):
+    """Not a transient Convex error, so the pipeline gives up instead of retrying."""
+
+
+def crash_after_store(convex, monkeypatch, calls_before_crash=0):
+    """Make documents:storeBatch write its rows and then fail, as if the
+    process died before the IDs came back."""
+    store_batch = convex._functions["documents:storeBatch"]
+    calls = []
+
+    def crashing(args):
+        ids = store_batch(args)
+        calls.append(ids)
+        if len(calls) > calls_before_crash:
+            raise Crash("connection lost")
+        return ids
+
+    monkeypatch.setitem(convex._functions, "documents:storeBatch", crashing)
+    return calls
+
+
+@pytest.fixture
+def clean_run(local_backend, ingest, tmp_path):
+    """Rows of an uninterrupted ingestion, after which the table and manifest are cleared."""
+    data = write_documents(tmp_path / "data")
+    ingest(data)
+    rows = {name: row["content"] for name, row in stored_rows(local_backend).items()}
+    local_backend.mutation("documents:clearAllDocuments", {})
+    forget_ingestion()
+    assert stored_rows(local_backend) == {}
+    return data, rows
+
+
+def assert_recovered(convex, manifest, expected):
+    rows = stored_rows(convex)
+    assert {name: row["content"] for name, row in rows.items()} == expected
+    assert {row["_id"] for row in rows.values()} == manifest.row_ids()
+    assert not any(path.stat().st_size for path in manifest.path.parent.glob("ingest_journal-*.jsonl"))
+
+
+@pytest.mark.parametrize("resume", [False, True])
+def test_rows_stored_before_a_crash_are_not_duplicated(local_backend, ingest, clean_run, monkeypatch, resume):
+    data, expected = clean_run
+    with monkeypatch.context() as patch:
+        calls = crash_after_store(local_backend, patch)
+        with pytest.raises(Crash):
+            ingest(data)
+    # Every batch in flight reached the table without its IDs being recorded
+    assert calls and len(stored_rows(local_backend)) == sum(map(len, calls))
+
+    manifest = ingest(data, resume=resume)
+    assert_recovered(local_backend, manifest, expected)
+
+
+def test_resume_keeps_confirmed_rows(local_backend, ingest, clean_run, monkeypatch):
+    data, expected = clean_run
+    with monkeypatch.context() as patch:
+        # One row per write, so the crash lands partway through the sources
+        patch.setattr(process_documents, "IngestPipeline", partial(IngestPipeline, max_batch_bytes=1))
+        calls = crash_after_store(local_backend, patch, calls_before_crash=4)
+        with pytest.raises(Crash):
+            ingest(data, concurrency=1)
+    confirmed = {doc_id for ids in calls[:-1] for doc_id in ids}
+    assert len(confirmed) == 4
+
+    manifest = ingest(data, resume=True)
+    assert_recovered(local_backend, manifest, expected)
+    # Rows whose IDs came back before the crash were kept rather than stored again
+    assert confirmed <= manifest.row_ids()
@@ -0,0 +1,80 @@
+from conftest import SAMPLE_DOCUMENTS, stored_rows, write_documents
+from ingest_manifest import content_hash, diff_documents
+
+
+def stored(**rows):
+    """{name: content} -> the {name: {"id", "content_hash"}} shape diff_documents takes."""
+    return {name: {"id": f"id_{name}", "content_hash": content_hash(content)} for name, content in rows.items()}
+
+
+def test_unchanged_rows_are_kept():
+    diff = diff_documents(stored(a_0="one", a_1="two"), [("a_0", "one"), ("a_1", "two")])
+    assert diff["insert"] == [] and diff["rename"] == [] and diff["delete"] == []
+    assert [(name, row_id) for name, row_id, _ in diff["keep"]] == [("a_0", "id_a_0"), ("a_1", "id_a_1")]
+
+
+def test_moved_rows_are_renamed_not_reinserted():
+    diff = diff_documents(stored(a_0="one", a_1="two"), [("a_0", "new"), ("a_1", "one"), ("a_2", "two")])
+    assert diff["insert"] == [("a_0", "new")]
+    assert diff["rename"] == [("id_a_0", "a_1"), ("id_a_1", "a_2")]
+    assert diff["delete"] == []
+
+
+def test_rows_no_longer_planned_are_deleted():
+    diff = diff_documents(stored(a_0="one", a_1="two", a_2="three"), [("a_0", "one")])
+    assert sorted(diff["delete"]) == ["id_a_1", "id_a_2"]
+    assert diff["insert"] == []
+
+
+def test_same_name_match_is_preferred():
+    # Two stored rows with the same text; the one already named a_1 stays a_1
+    diff = diff_documents(stored(a_0="same", a_1="same"), [("a_1", "same")])
+    assert diff["keep"] == [("a_1", "id_a_1", content_hash("same"))]
+    assert diff["rename"] == []
+    assert diff["delete"] == ["id_a_0"]
+
+
+def test_each_stored_row_is_claimed_once():
+    diff = diff_documents(stored(a_0="same"), [("a_0", "same"), ("a_1", "same")])
+    assert [name for name, _, _ in diff["keep"]] == ["a_0"]
+    assert diff["insert"] == [("a_1", "same")]
+
+
+def test_reingest_keeps_unchanged_rows(local_backend, ingest, tmp_path):
+    data = write_documents(tmp_path / "data")
+    ingest(data)
+    before = stored_rows(local_backend)
+
+    ingest(data)
+    assert stored_rows(local_backend) == before
+
+    edited = SAMPLE_DOCUMENTS["skills.txt"].replace("Terraform", "Pulumi")
+    (data / "skills.txt").write_text(edited, encoding="utf-8")
+    manifest = ingest(data)
+    after = stored_rows(local_backend)
+
+    # Other sources keep their row IDs; only skills rows can change
+    for name, row in before.items():
+        if not name.startswith("skills"):
+            assert after[name] == row
+    assert any("Pulumi" in row["content"] for row in after.values())
+    assert set(after) == {name for source in ("career", "skills", "education")
+                          for name in manifest.source(source)["documents"]}
+
+
+def test_rows_deleted_behind_the_manifest_are_stored_again(local_backend, ingest, tmp_path):
+    data = write_documents(tmp_path / "data")
+    ingest(data)
+    before = stored_rows(local_backend)
+    lost = sorted(name for name in before if name.startswith("career"))
+    for name in lost:
+        local_backend.mutation("documents:deleteDocument", {"id": before[name]["_id"]})
+
+    manifest = ingest(data)
+    after = stored_rows(local_backend)
+    assert {name: row["content"] for name, row in after.items()} == {
+        name: row["content"] for name, row in before.items()
+    }
+    assert {row["id"] for row in manifest.source("career")["documents"].values()} == {
+        after[name]["_id"] for name in lost
+    }
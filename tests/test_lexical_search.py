@@ -0,0 +1,121 @@
+import math
+
+import pytest
+
+from backends import embedding_client
+from conftest import SAMPLE_DOCUMENTS, stored_rows, write_documents
+from lexical_index import index_terms, rebuild_index
+from local_search import KEYWORD_LIMIT, LocalIndex, query_embedder
+
+TOOLS = ["Python", "Kubernetes", "Terraform", "Grafana", "Pandas"]
+
+# Enough rows that the 50 vector hits leave some rows to lexical matching
+DOCUMENTS = {
+    **SAMPLE_DOCUMENTS,
+    **{
+        f"project_{i}.txt": (
+            f"Project {i} moved {TOOLS[i % 5]} workloads for team {i % 3}. "
+            f"The rollout took {i + 2} weeks and used {TOOLS[(i + 2) % 5]} for monitoring.\n\n"
+            f"Lessons from project {i} were shared with the data platform group."
+        )
+        for i in range(30)
+    },
+}
+
+QUERIES = ["python data pipelines", "kubernetes terraform rollout", "mentoring hiring",
+           "distributed databases thesis", "project 7 lessons", "quantum"]
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def stored_bm25(convex, query):
+    """bm25Search from lexicalIndex.ts, run over the stored postings and stats: {id: score}."""
+    stats = convex.query("lexicalIndex:stats")
+    ids = {convex._row(row["_id"]): row["_id"] for row in stored_rows(convex).values()}
+    avg_length = stats["totalLength"] / stats["docCount"] if stats["docCount"] else 0
+    scores = {}
+    for term in set(index_terms(query)):
+        postings = convex._db.execute(
+            "SELECT doc_row, tf, doc_length FROM lexical_postings WHERE term = ?", (term,)
+        ).fetchall()
+        df = len(postings)
+        if not df:
+            continue
+        idf = math.log(1 + (stats["docCount"] - df + 0.5) / (df + 0.5))
+        for row, tf, length in postings:
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / max(avg_length, 1e-9))
+            scores[ids[row]] = scores.get(ids[row], 0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:KEYWORD_LIMIT]
+    return {doc_id: score / ranked[0][1] for doc_id, score in ranked}
+
+
+def postings(convex):
+    return sorted(convex._db.execute("SELECT term, doc_row, tf, doc_length FROM lexical_postings").fetchall())
+
+
+def assert_search_matches_postings(convex):
+    index = LocalIndex.from_convex(convex)
+    embed = query_embedder(embedding_client(), dimensions=index.dimensions)
+    lexical_only = 0
+    for query in QUERIES:
+        expected = stored_bm25(convex, query)
+        keyword = {doc["id"]: doc["score"] for doc in index.keyword_search(query)}
+        assert keyword == pytest.approx(expected, rel=1e-5)
+
+        rows, _ = index.vector_search(embed([query]))
+        semantic = {index.ids[row] for row in rows[0]}
+        results = convex.action("search:hybridSearch", {"query": query})
+        lexical = {doc["id"]: doc["score"] for doc in results if doc["id"] not in semantic}
+        assert lexical == pytest.approx({doc_id: score for doc_id, score in expected.items()
+                                         if doc_id not in semantic}, rel=1e-5)
+        lexical_only += len(lexical)
+    assert lexical_only
+
+
+def assert_stats_match_a_rebuild(convex):
+    stats, before = convex.query("lexicalIndex:stats"), postings(convex)
+    assert stats["docCount"] == len(stored_rows(convex))
+    rebuild_index(convex)
+    assert convex.query("lexicalIndex:stats") == stats
+    assert postings(convex) == before
+
+
+@pytest.fixture
+def corpus(local_backend, ingest, tmp_path):
+    data = write_documents(tmp_path / "data", DOCUMENTS)
+    ingest(data)
+    return data
+
+
+def test_search_after_ingest(local_backend, corpus):
+    assert len(stored_rows(local_backend)) > 50
+    assert_search_matches_postings(local_backend)
+    assert_stats_match_a_rebuild(local_backend)
+
+
+def test_search_after_a_swapped_edit(local_backend, ingest, corpus):
+    text = SAMPLE_DOCUMENTS["skills.txt"].replace("Terraform", "Pulumi and Terraform")
+    (corpus / "skills.txt").write_text(text, encoding="utf-8")
+    ingest(corpus, swap=True)
+    assert any("Pulumi" in row["content"] for row in stored_rows(local_backend).values())
+    assert_search_matches_postings(local_backend)
+    assert_stats_match_a_rebuild(local_backend)
+
+
+def test_search_after_deletes(local_backend, ingest, corpus):
+    # The watcher retires a deleted file by passing it in ``only``
+    (corpus / "project_3.txt").unlink()
+    ingest(corpus, only=[corpus / "project_3.txt"])
+    rows = stored_rows(local_backend)
+    assert not any(name.startswith("project_3") for name in rows)
+    local_backend.mutation("documents:deleteDocument", {"id": rows["career"]["_id"]})
+    assert_search_matches_postings(local_backend)
+    assert_stats_match_a_rebuild(local_backend)
+
+
+def test_clearing_the_table_clears_the_index(local_backend, corpus):
+    while not local_backend.mutation("documents:deleteBatch", {"batchSize": 10})["isDone"]:
+        pass
+    assert postings(local_backend) == []
+    assert local_backend.query("lexicalIndex:stats")["docCount"] == 0
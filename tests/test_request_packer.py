@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+
+from request_packer import PackPlan, RequestPacker, TokenCounter, embed_packed
+
+
+class CountingCounter(TokenCounter):
+    """The byte-based estimate (no tiktoken encoding), counting calls and characters counted."""
+
+    def __init__(self):
+        super().__init__(encoding="no-such-encoding")
+        self.calls = 0
+        self.characters = 0
+
+    def count(self, text):
+        self.calls += 1
+        self.characters += len(text)
+        return super().count(text)
+
+
+@pytest.fixture
+def counter():
+    counter = CountingCounter()
+    assert not counter.exact
+    return counter
+
+
+def words(pieces):
+    return " ".join(pieces).split()
+
+
+def test_short_text_is_one_piece(counter):
+    packer = RequestPacker(max_input_tokens=100, counter=counter)
+    assert packer.split("A short sentence.") == ["A short sentence."]
+
+
+def test_long_text_is_cut_at_sentence_breaks(counter):
+    sentences = [f"Sentence number {i} talks about topic {i % 7}." for i in range(200)]
+    text = " ".join(sentences)
+    packer = RequestPacker(max_input_tokens=60, counter=counter)
+    pieces = packer.split(text)
+    assert len(pieces) > 1
+    assert all(counter.count(piece) <= 60 for piece in pieces)
+    assert words(pieces) == text.split()
+    # Every piece ends where a sentence does
+    assert all(piece.endswith(".") for piece in pieces)
+
+
+def test_line_breaks_are_kept_inside_pieces(counter):
+    text = "\n".join(f"Line {i} of the table" for i in range(100))
+    pieces = RequestPacker(max_input_tokens=40, counter=counter).split(text)
+    assert all(counter.count(piece) <= 40 for piece in pieces)
+    assert "".join(pieces).replace("\n", "") == text.replace("\n", "")
+
+
+def test_text_without_breaks_is_hard_split(counter):
+    text = "x" * 5000
+    pieces = RequestPacker(max_input_tokens=100, counter=counter).split(text)
+    assert "".join(pieces) == text
+    assert all(counter.count(piece) <= 100 for piece in pieces)
+
+
+def test_split_counts_each_segment_once(counter):
+    text = " ".join(f"Sentence {i} is here." for i in range(5000))
+    RequestPacker(max_input_tokens=500, counter=counter).split(text)
+    # Linear: a small constant number of passes over the text, not one per segment
+    assert counter.characters < 5 * len(text)
+
+
+def test_plan_respects_request_limits(counter):
+    texts = [f"Document {i}. " * (i % 5 + 1) for i in range(50)]
+    packer = RequestPacker(max_inputs=8, max_input_tokens=20, max_request_tokens=60, counter=counter)
+    plan = packer.plan(texts)
+
+    assert plan.inputs == len(texts)
+    assert sorted(set(plan.owners)) == list(range(len(texts)))
+    assert plan.owners == sorted(plan.owners)
+    # Requests cover every piece once, in order
+    assert plan.requests[0][0] == 0 and plan.requests[-1][1] == len(plan.pieces)
+    assert all(end == start for (_, end), (start, _) in zip(plan.requests, plan.requests[1:]))
+    for start, end in plan.requests:
+        assert end - start <= 8
+        assert end - start == 1 or sum(plan.tokens[start:end]) <= 60
+
+
+def test_combine_averages_split_inputs_by_tokens():
+    plan = PackPlan(pieces=["a", "b1", "b2"], owners=[0, 1, 1], tokens=[1, 3, 1], requests=[(0, 3)], inputs=2)
+    vectors = [[1.0, 0.0], [1.0, 0.0], [0.0, 1.0]]
+    combined = plan.combine(vectors)
+    assert combined[0] == [1.0, 0.0]
+    expected = np.array([3.0, 1.0]) / np.linalg.norm([3.0, 1.0])
+    assert np.allclose(combined[1], expected)
+    assert plan.split_inputs == 1
+
+
+def test_embed_packed_returns_one_vector_per_text(counter):
+    texts = ["short one.", "A much longer text. " * 40, "another."]
+    requests = []
+
+    def create(batch):
+        requests.append(batch)
+        return [[float(len(piece)), 1.0] for piece in batch]
+
+    packer = RequestPacker(max_inputs=2, max_input_tokens=50, counter=counter)
+    vectors = embed_packed(texts, create, packer)
+    assert len(vectors) == len(texts)
+    assert all(len(batch) <= 2 for batch in requests)
+    assert vectors[0] == [10.0, 1.0]
+    assert np.isclose(np.linalg.norm(vectors[1]), 1.0)
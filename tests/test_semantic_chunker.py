@@ -0,0 +1,80 @@
+import re
+
+import pytest
+
+from backends import hashed_embedding
+from conftest import SAMPLE_DOCUMENTS
+from semantic_chunker import iter_sentences, semantic_chunks, split_sentences, stream_semantic_chunks
+
+TEXT = " ".join(SAMPLE_DOCUMENTS.values())
+
+
+def embed(texts):
+    return [hashed_embedding(text).tolist() for text in texts]
+
+
+def original_chunks(text, similarity_threshold=0.7, min_chunk_size=200):
+    """split_into_semantic_chunks as process_documents.py had it: two embeddings
+    and a pure-Python cosine per sentence."""
+
+    def similarity(a, b):
+        first, second = embed([a])[0], embed([b])[0]
+        dot = sum(x * y for x, y in zip(first, second))
+        norms = sum(x * x for x in first) ** 0.5 * sum(y * y for y in second) ** 0.5
+        return dot / norms if norms else 0
+
+    sentences = [s.strip() for s in re.split(r"[.!?]+", text) if s.strip()]
+    if not sentences:
+        return []
+    chunks = []
+    current = [sentences[0]]
+    for sentence in sentences[1:]:
+        comparison = " ".join(current[-3:]) if len(current) >= 3 else " ".join(current)
+        score = similarity(comparison, sentence)
+        if score >= similarity_threshold and len(" ".join(current)) < 2000:
+            current.append(sentence)
+        elif len(" ".join(current)) >= min_chunk_size:
+            chunks.append(" ".join(current))
+            current = [sentence]
+        else:
+            current.append(sentence)
+    chunks.append(" ".join(current))
+    return chunks
+
+
+@pytest.mark.parametrize("threshold, min_chunk_size", [(0.1, 50), (0.2, 100), (0.3, 200), (0.7, 200)])
+def test_chunks_match_the_original_algorithm(threshold, min_chunk_size):
+    expected = original_chunks(TEXT, threshold, min_chunk_size)
+    chunks = semantic_chunks(TEXT, embed, threshold, min_chunk_size, verbose=False)
+    assert [chunk["content"] for chunk in chunks] == expected
+    assert [chunk["metadata"]["chunk_index"] for chunk in chunks] == list(range(len(expected)))
+
+
+def test_boundaries_are_exercised():
+    # A threshold that keeps everything in one chunk would make the comparison above vacuous
+    assert len(original_chunks(TEXT, 0.2, 100)) > 2
+
+
+@pytest.mark.parametrize("batch_sentences", [1, 2, 5, 1000])
+def test_streaming_matches_a_single_pass(batch_sentences):
+    whole = semantic_chunks(TEXT, embed, 0.2, 100, verbose=False)
+    sentences = iter_sentences(TEXT.split("\n"))
+    streamed = list(stream_semantic_chunks(sentences, embed, 0.2, 100, batch_sentences, verbose=False))
+    assert streamed == whole
+
+
+def test_iter_sentences_matches_split_sentences():
+    blocks = ["First line. Second", "half of it! Third?", "", "No end", "Last one."]
+    assert list(iter_sentences(blocks)) == split_sentences("\n".join(blocks))
+
+
+def test_each_distinct_text_is_embedded_once():
+    calls = []
+
+    def counting_embed(texts):
+        calls.append(list(texts))
+        return embed(texts)
+
+    semantic_chunks(TEXT, counting_embed, verbose=False)
+    assert len(calls) == 1
+    assert len(calls[0]) == len(set(calls[0]))
@@ -0,0 +1,110 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from conftest import SAMPLE_DOCUMENTS, stored_rows, write_documents
+from watch import InotifyWatcher, PollingWatcher, debounced_changes
+
+DEBOUNCE = 0.1
+
+
+class ScriptedWatcher:
+    """Reports preset changes, each ``delay`` seconds after the previous one."""
+
+    def __init__(self, events):
+        self.events = [(delay, {Path(name) for name in names}) for delay, names in events]
+        self.seen = []
+
+    def wait(self, timeout=None):
+        if not self.events:
+            assert timeout is not None, "no more changes scripted"
+            time.sleep(timeout)
+            return set()
+        delay, changed = self.events[0]
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            self.events[0] = (delay - timeout, changed)
+            return set()
+        time.sleep(delay)
+        self.events.pop(0)
+        self.seen.append(time.perf_counter())
+        return changed
+
+
+def test_a_burst_of_changes_is_yielded_once():
+    watcher = ScriptedWatcher([(0, ["a.md"]), (0.03, ["b.md"]), (0.03, ["a.md", "c.md"]), (0.3, ["d.md"])])
+    changes = debounced_changes(watcher, DEBOUNCE)
+
+    changed, last_change = next(changes)
+    yielded = time.perf_counter()
+    assert changed == {Path("a.md"), Path("b.md"), Path("c.md")}
+    # Timed from the last change of the burst, not the first
+    assert last_change == pytest.approx(watcher.seen[2], abs=0.01)
+    assert DEBOUNCE <= yielded - last_change < DEBOUNCE + 0.05
+
+    changed, last_change = next(changes)
+    assert changed == {Path("d.md")}
+    assert last_change == pytest.approx(watcher.seen[3], abs=0.01)
+
+
+def wait_for(watcher, expected):
+    changed = set()
+    deadline = time.monotonic() + 2
+    while changed != expected and time.monotonic() < deadline:
+        changed |= watcher.wait(0.2)
+    return changed
+
+
+@pytest.fixture(params=["polling", "inotify"])
+def watcher(request, tmp_path):
+    directory = tmp_path / "data"
+    directory.mkdir()
+    if request.param == "polling":
+        watcher = PollingWatcher(directory, interval=0.02)
+    else:
+        try:
+            watcher = InotifyWatcher(directory)
+        except OSError as e:
+            pytest.skip(f"inotify unavailable: {e}")
+    yield watcher
+    watcher.close()
+
+
+def test_watcher_reports_creates_edits_and_deletes(watcher):
+    path = watcher.directory / "notes.md"
+    path.write_text("first", encoding="utf-8")
+    assert wait_for(watcher, {path}) == {path}
+
+    path.write_text("second version", encoding="utf-8")
+    assert wait_for(watcher, {path}) == {path}
+
+    nested = watcher.directory / "more" / "plan.txt"
+    nested.parent.mkdir()
+    nested.write_text("nested", encoding="utf-8")
+    assert wait_for(watcher, {nested}) == {nested}
+
+    path.unlink()
+    assert wait_for(watcher, {path}) == {path}
+
+
+def test_watcher_ignores_hidden_and_lock_files(watcher):
+    (watcher.directory / ".draft.md").write_text("hidden", encoding="utf-8")
+    (watcher.directory / "~$resume.docx").write_bytes(b"lock")
+    (watcher.directory / "image.png").write_bytes(b"png")
+    assert watcher.wait(0.2) == set()
+
+
+def test_an_edit_reaches_the_table(local_backend, ingest, tmp_path):
+    data = write_documents(tmp_path / "data")
+    ingest(data)
+    watcher = PollingWatcher(data, interval=0.02)
+    path = data / "skills.txt"
+    path.write_text(SAMPLE_DOCUMENTS["skills.txt"].replace("Grafana", "Prometheus"), encoding="utf-8")
+
+    changed, _ = next(debounced_changes(watcher, DEBOUNCE))
+    assert changed == {path}
+    ingest(data, only=changed, swap=True)
+    contents = [row["content"] for row in stored_rows(local_backend).values()]
+    assert any("Prometheus" in content for content in contents)
+    assert not any("Grafana" in content for content in contents)